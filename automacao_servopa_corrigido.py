@@ -1,21 +1,27 @@
 import os
+import json
 import logging
 import time
 import shutil
 import re
+import sqlite3
+import threading
 from datetime import datetime
 from collections import defaultdict
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.firefox.service import Service
 from selenium.webdriver.firefox.options import Options
+from selenium.webdriver.firefox.firefox_profile import FirefoxProfile
 from selenium.common.exceptions import (
     WebDriverException,
     TimeoutException,
     NoSuchElementException,
+    StaleElementReferenceException,
     ElementClickInterceptedException,
     InvalidSessionIdException,
 )
+from urllib3.exceptions import MaxRetryError
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
@@ -24,7 +30,16 @@ from locators import (
     ServopaGroupLocators,
     ServopaLanceLocators,
 )
-from pdf_parser import extract_canonical_cota, parse_cota_from_filename, verificar_e_corrigir_nomes_pdf
+from pdf_parser import extract_canonical_cota, verificar_e_corrigir_nomes_pdf, IndicePdfsLance
+from monitor_downloads import MonitorPastaDownload, inotify_disponivel
+import servopa_http
+import rastreamento
+from fila_cotas import FilaCotas
+from cache_grupos import CacheBuscaGrupos
+from cache_cotas import CacheCotas
+from indice_lances import IndiceGlobalLances
+from organizador_pdfs import OrganizadorPdfs
+from diario_execucao import DiarioExecucao, ESTADOS_CONCLUIDOS, ESTADO_POR_STATUS, chave_cota
 
 class CaptchaDetectedException(Exception):
     """Exceção customizada para quando um CAPTCHA é detectado."""
@@ -37,7 +52,7 @@ class InvalidCredentialsException(Exception):
 def setup_logging():
     """Configura o sistema de logging para o projeto com handlers separados."""
     # Formatter padrão para ambos os handlers
-    log_formatter = logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
+    log_formatter = logging.Formatter("%(asctime)s - %(levelname)s - [%(threadName)s] %(message)s")
 
     # Handler para o log geral (INFO e acima)
     general_handler = logging.FileHandler("automacao.log", mode="a", encoding="utf-8")
@@ -66,10 +81,19 @@ def _get_normalized_path(env_var):
         return os.path.normpath(path)
     return None
 
+def _get_bool(env_var, default=False):
+    value = os.getenv(env_var)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "sim", "yes")
+
 CPF_CNPJ = os.getenv("CPF_CNPJ")
 SENHA = os.getenv("SENHA")
 SERVOPA_URL = os.getenv("SERVOPA_URL")
 SERVOPA_LANCES_URL = os.getenv("SERVOPA_LANCES_URL", "https://www.consorcioservopa.com.br/vendas/lances")
+SERVOPA_BUSCAR_URL = os.getenv("SERVOPA_BUSCAR_URL", "https://www.consorcioservopa.com.br/vendas/buscar")
+# Navegação rápida: abre a tela de busca direto pela URL e só usa o menu se o acesso direto falhar
+NAVEGACAO_DIRETA = _get_bool("NAVEGACAO_DIRETA", True)
 ERROS_FILE = os.getenv("ERROS_FILE", "erros_lances.txt")
 LANCE_LIVRE_PERCENTUAL = os.getenv("LANCE_LIVRE_PERCENTUAL", "40")
 LANCE_LIVRE_DESCONTAR_CARTA = os.getenv("LANCE_LIVRE_DESCONTAR_CARTA", "30")
@@ -77,47 +101,349 @@ GECKODRIVER_PATH = _get_normalized_path("GECKODRIVER_PATH")
 FIREFOX_PROFILE_PATH = _get_normalized_path("FIREFOX_PROFILE_PATH")
 DOWNLOAD_DIR = _get_normalized_path("DOWNLOAD_DIR")
 FIREFOX_BINARY_PATH = _get_normalized_path("FIREFOX_BINARY_PATH")
+# Quantidade de navegadores (sessões independentes) processando cotas em paralelo
+MAX_NAVEGADORES = max(1, int(os.getenv("MAX_NAVEGADORES", "1")))
+# Intervalo entre os logins de cada navegador, para não disparar o CAPTCHA do portal
+INTERVALO_LOGIN_NAVEGADORES = float(os.getenv("INTERVALO_LOGIN_NAVEGADORES", "3"))
+# Detecção de downloads: 'auto' usa eventos do sistema (inotify) quando disponível; 'polling' força a verificação periódica
+MONITOR_DOWNLOADS = os.getenv("MONITOR_DOWNLOADS", "auto").strip().lower()
+# Após o Registrar, segundos em que só o PDF encerra a espera (um modal visto nesse intervalo é ignorado)
+PRIORIDADE_PDF_REGISTRO = float(os.getenv("PRIORIDADE_PDF_REGISTRO", "1.5"))
+# Após o Simular, segundos que o input de protocolo anterior (lance já feito) ainda tem para aparecer
+# depois que o Registrar ficou visível; só então o Registrar é clicado
+ESPERA_PROTOCOLO_ANTERIOR = float(os.getenv("ESPERA_PROTOCOLO_ANTERIOR", "1.5"))
+# Prontidão de página: tempo máximo de espera, período sem mutações no DOM e tolerância ao '.pace-active' travado
+PRONTIDAO_TIMEOUT = float(os.getenv("PRONTIDAO_TIMEOUT", "10"))
+PRONTIDAO_SILENCIO_MS = int(os.getenv("PRONTIDAO_SILENCIO_MS", "150"))
+PACE_TOLERANCIA = float(os.getenv("PACE_TOLERANCIA", "1.5"))
+# Perfil enxuto do navegador: sem janela, sem imagens/fontes/rastreadores e carregamento 'eager'
+FIREFOX_HEADLESS = _get_bool("FIREFOX_HEADLESS", False)
+BLOQUEAR_RECURSOS = _get_bool("BLOQUEAR_RECURSOS", False)
+PAGE_LOAD_STRATEGY = os.getenv("PAGE_LOAD_STRATEGY", "normal").strip().lower()
+# Reaproveitamento da sessão autenticada entre execuções (cookies salvos após o login)
+REUTILIZAR_SESSAO = _get_bool("REUTILIZAR_SESSAO", True)
+SESSION_COOKIES_FILE = os.getenv("SESSION_COOKIES_FILE", "sessao_servopa.json")
+SESSAO_VERIFICACAO_TIMEOUT = float(os.getenv("SESSAO_VERIFICACAO_TIMEOUT", "3"))
+# Caminho rápido por HTTP (servopa_http.py) com os cookies do navegador; o navegador fica como fallback
+HTTP_RAPIDO = _get_bool("HTTP_RAPIDO", False)
+# Busca uma vez por grupo e reaproveita a tabela de resultados para as demais cotas dele
+BUSCA_POR_GRUPO = _get_bool("BUSCA_POR_GRUPO", False)
+# Spans de latência por etapa (rastreamento.py): um JSONL e um Chrome Trace por execução
+RASTREAMENTO = _get_bool("RASTREAMENTO", True)
+TRACE_DIR = os.getenv("TRACE_DIR", "traces")
+# Diário por consultor (diario_execucao.py) para retomar execuções interrompidas, e limite de
+# navegadores recriados por sessão quando o Firefox/geckodriver cai no meio da execução
+DIARIO_EXECUCAO = _get_bool("DIARIO_EXECUCAO", True)
+ARQUIVO_DIARIO = os.getenv("ARQUIVO_DIARIO", ".diario_execucao.jsonl")
+MAX_REINICIOS_NAVEGADOR = int(os.getenv("MAX_REINICIOS_NAVEGADOR", "3"))
+
+def _get_limites_por_categoria(key, default):
+    """Lê 'Categoria=N,Categoria=N' (categorias do relatório de erros) em um dict."""
+    limites = {}
+    for item in os.getenv(key, default).split(","):
+        categoria, _, valor = item.partition("=")
+        if categoria.strip() and valor.strip().isdigit():
+            limites[categoria.strip()] = int(valor)
+    return limites
+
+# Retentativa automática de erros críticos transitórios: limite por categoria, espera
+# exponencial (base * 2^(n-1), até o máximo) e categorias que pedem um navegador novo
+RETENTATIVAS_CRITICAS = _get_limites_por_categoria(
+    "RETENTATIVAS_CRITICAS",
+    "TimeoutException=2,Erro de Clique=2,StaleElementReferenceException=2,WebDriverException=1",
+)
+RETENTATIVA_ESPERA_BASE = float(os.getenv("RETENTATIVA_ESPERA_BASE", "5"))
+RETENTATIVA_ESPERA_MAX = float(os.getenv("RETENTATIVA_ESPERA_MAX", "60"))
+RETENTATIVA_NOVO_NAVEGADOR = {
+    c.strip() for c in os.getenv("RETENTATIVA_NOVO_NAVEGADOR", "WebDriverException").split(",") if c.strip()
+}
+
+# Cache persistente do status observado de cada cota (cache_cotas.py): cotas sabidamente
+# inelegíveis são puladas na pré-verificação enquanto a observação estiver válida (dias por
+# categoria do relatório; nunca de antes da última assembleia, se DIA_ASSEMBLEIA for informado)
+CACHE_COTAS = _get_bool("CACHE_COTAS", True)
+ARQUIVO_CACHE_COTAS = os.getenv("ARQUIVO_CACHE_COTAS", os.path.join("Lances", ".cache_cotas.sqlite3"))
+CACHE_COTAS_VALIDADE = _get_limites_por_categoria(
+    "CACHE_COTAS_VALIDADE",
+    "Extrato Cancelado=180,Cota Contemplada=180,Lance Fidelidade=30,Cota Não Ativa=7",
+)
+DIA_ASSEMBLEIA = int(os.getenv("DIA_ASSEMBLEIA", "0")) or None
+
+# Índice de todos os Lances/* (indice_lances.py): cotas com PDF na pasta de outro consultor não recebem outro lance
+INDICE_GLOBAL_LANCES = _get_bool("INDICE_GLOBAL_LANCES", True)
+
+# Processos que leem os PDFs na verificação de nomes (0 = um por CPU; 1 = sem paralelismo)
+PROCESSOS_PDF = max(0, int(os.getenv("PROCESSOS_PDF", "0")))
+# Cache do que foi extraído de cada PDF (Lances/<consultor>/.cache_extracao.sqlite3, ver cache_extracao.py);
+# com CACHE_EXTRACAO_HASH o conteúdo (SHA-1) também precisa bater, além de inode/tamanho/mtime
+CACHE_EXTRACAO_PDF = _get_bool("CACHE_EXTRACAO_PDF", True)
+CACHE_EXTRACAO_HASH = _get_bool("CACHE_EXTRACAO_HASH", False)
+# Organizador em segundo plano (organizador_pdfs.py, requer inotify): arquiva cada PDF que chega em
+# Lances/<consultor> durante a execução, deixando a verificação final sem trabalho
+ORGANIZADOR_PDFS = _get_bool("ORGANIZADOR_PDFS", True)
+
+# Trechos das mensagens do WebDriver quando o navegador morreu (comparados em minúsculas)
+_MENSAGENS_SESSAO_PERDIDA = (
+    "invalid session id",
+    "browsing context has been discarded",
+    "failed to decode response from marionette",
+    "tried to run command without establishing a connection",
+    "session deleted",
+)
 
-def get_driver():
-    """Configura e retorna uma instância do WebDriver do Firefox."""
+def get_driver(download_dir=None, copiar_perfil=False):
+    """Configura e retorna uma instância do WebDriver do Firefox.
+
+    download_dir: pasta exclusiva de downloads desta sessão (padrão: DOWNLOAD_DIR).
+    copiar_perfil: usa uma cópia temporária do FIREFOX_PROFILE_PATH em vez do original.
+        O Firefox trava o perfil em uso, então só o primeiro navegador pode abri-lo diretamente.
+    """
     logging.info("Configurando instância do WebDriver...")
     if not all([GECKODRIVER_PATH, DOWNLOAD_DIR, FIREFOX_BINARY_PATH]):
         raise ValueError("Variáveis de ambiente essenciais (GECKODRIVER_PATH, DOWNLOAD_DIR, FIREFOX_BINARY_PATH) não definidas no .env")
+    download_dir = download_dir or DOWNLOAD_DIR
+    os.makedirs(download_dir, exist_ok=True)
 
     options = Options()
     options.binary_location = FIREFOX_BINARY_PATH
-    if FIREFOX_PROFILE_PATH:
+    options.page_load_strategy = PAGE_LOAD_STRATEGY
+    if FIREFOX_HEADLESS:
+        logging.info("Iniciando o Firefox em modo headless (sem janela).")
+        options.add_argument("-headless")
+    if FIREFOX_PROFILE_PATH and copiar_perfil:
+        logging.info(f"Usando uma cópia do perfil do Firefox: {FIREFOX_PROFILE_PATH}")
+        options.profile = FirefoxProfile(FIREFOX_PROFILE_PATH)
+    elif FIREFOX_PROFILE_PATH:
         logging.info(f"Usando perfil do Firefox: {FIREFOX_PROFILE_PATH}")
         options.add_argument("-profile")
         options.add_argument(FIREFOX_PROFILE_PATH)
 
     options.set_preference("browser.download.folderList", 2)
-    options.set_preference("browser.download.dir", os.path.abspath(DOWNLOAD_DIR))
+    options.set_preference("browser.download.dir", os.path.abspath(download_dir))
     options.set_preference("browser.download.useDownloadDir", True)
     options.set_preference("browser.helperApps.neverAsk.saveToDisk", "application/pdf")
     options.set_preference("pdfjs.disabled", True)
     options.set_preference("network.cookie.sameSite.laxByDefault", False)
     options.set_preference("network.cookie.sameSite.noneRequiresSecure", False)
+    if BLOQUEAR_RECURSOS:
+        # Imagens e fontes web não influenciam o fluxo; o CSS é mantido porque a
+        # visibilidade dos campos (Lance Livre x Fixo) depende dele.
+        logging.info("Bloqueando imagens, fontes web e rastreadores de terceiros.")
+        options.set_preference("permissions.default.image", 2)
+        options.set_preference("browser.display.use_document_fonts", 0)
+        options.set_preference("gfx.downloadable_fonts.enabled", False)
+        options.set_preference("privacy.trackingprotection.enabled", True)
+        options.set_preference("privacy.trackingprotection.socialtracking.enabled", True)
+        options.set_preference("privacy.trackingprotection.cryptomining.enabled", True)
+        options.set_preference("privacy.trackingprotection.fingerprinting.enabled", True)
+        options.set_preference("media.autoplay.default", 5)
 
     service = Service(GECKODRIVER_PATH)
     try:
         driver = webdriver.Firefox(service=service, options=options)
         logging.info("WebDriver do Firefox iniciado com sucesso.")
-        return driver
+        return rastreamento.instrumentar_driver(driver)
     except WebDriverException as e:
         logging.error(f"Falha ao iniciar o WebDriver: {e}")
         raise
 
 # --- Funções de Apoio Robustas ---
 
+# Instala (uma vez por documento) contadores de XHR/fetch pendentes e um MutationObserver,
+# e responde se a página está pronta. arguments[0]: silêncio mínimo do DOM em ms;
+# arguments[1]: remover o '.pace-active' (o Pace do portal às vezes fica preso em loading infinito).
+_JS_PAGINA_PRONTA = """
+const silencioMs = arguments[0];
+const removerPace = arguments[1];
+if (!window.__servopaProntidao) {
+    const st = {pendentes: 0, ultimaMutacao: Date.now()};
+    const concluir = () => { st.pendentes = Math.max(0, st.pendentes - 1); st.ultimaMutacao = Date.now(); };
+    const send = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function() {
+        st.pendentes++;
+        this.addEventListener('loadend', concluir);
+        return send.apply(this, arguments);
+    };
+    if (window.fetch) {
+        const fetchOriginal = window.fetch;
+        window.fetch = function() {
+            st.pendentes++;
+            return fetchOriginal.apply(this, arguments).finally(concluir);
+        };
+    }
+    new MutationObserver(() => { st.ultimaMutacao = Date.now(); })
+        .observe(document.documentElement, {childList: true, subtree: true, attributes: true, characterData: true});
+    window.__servopaProntidao = st;
+}
+if (removerPace) {
+    document.querySelector('.pace-active')?.remove();
+}
+const st = window.__servopaProntidao;
+const jqPendentes = (window.jQuery && window.jQuery.active) || 0;
+return document.readyState !== 'loading'
+    && !document.querySelector('.pace-active')
+    && st.pendentes + jqPendentes === 0
+    && (Date.now() - st.ultimaMutacao) >= silencioMs;
+"""
+
+def aguardar_pagina_pronta(driver, timeout=None, silencio_ms=None):
+    """Aguarda a página ficar pronta por sinais reais, retornando assim que todos forem verdadeiros.
+
+    Sinais: document.readyState, ausência do '.pace-active', nenhuma requisição XHR/fetch/jQuery
+    pendente e um período de silêncio do DOM (MutationObserver). Se o '.pace-active' persistir
+    além de PACE_TOLERANCIA segundos, ele é removido, como antes.
+    Retorna True se a página ficou pronta; False se o tempo esgotou (não lança exceção).
+    """
+    timeout = PRONTIDAO_TIMEOUT if timeout is None else timeout
+    silencio_ms = PRONTIDAO_SILENCIO_MS if silencio_ms is None else silencio_ms
+    inicio = time.monotonic()
+    while True:
+        decorrido = time.monotonic() - inicio
+        try:
+            if driver.execute_script(_JS_PAGINA_PRONTA, silencio_ms, decorrido >= PACE_TOLERANCIA):
+                return True
+        except InvalidSessionIdException:
+            raise
+        except WebDriverException:
+            # Navegação em andamento pode invalidar o contexto do script; tenta de novo no próximo ciclo
+            pass
+        if decorrido >= timeout:
+            logging.warning(f"Página não sinalizou prontidão em {timeout}s; prosseguindo.")
+            return False
+        time.sleep(0.05)
+
 def remover_loading(driver):
-    """Remove o overlay 'pace-active' de forma direta e aguarda um instante."""
+    """Aguarda a página ficar pronta, removendo o overlay 'pace-active' se ele travar."""
     try:
-        logging.info("Removendo tela de loading ('pace-active')...")
-        driver.execute_script("document.querySelector('.pace-active')?.remove();")
-        time.sleep(0.4)  # Pequena pausa para a UI atualizar
+        logging.info("Aguardando página pronta (loading 'pace-active', requisições e DOM)...")
+        aguardar_pagina_pronta(driver)
+    except InvalidSessionIdException:
+        raise
     except Exception as e:
-        logging.warning(f"Não foi possível remover o loading via JS: {e}")
+        logging.warning(f"Não foi possível verificar a prontidão da página via JS: {e}")
+
+# --- Leituras do DOM em um único round trip (execute_script) ---
+
+# Funções JS comuns: localizar(by, valor) aceita os mesmos (By, valor) de locators.py
+_JS_FUNCOES_DOM = """
+const localizar = (by, valor) => {
+    if (by === 'xpath') {
+        return document.evaluate(valor, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+    }
+    if (by === 'css selector') return document.querySelector(valor);
+    if (by === 'id') return document.getElementById(valor);
+    if (by === 'class name') return document.getElementsByClassName(valor)[0] || null;
+    return null;
+};
+const visivel = (el) => !!el && !!(el.offsetWidth || el.offsetHeight || el.getClientRects().length);
+const texto = (el) => el ? (el.innerText || el.textContent || '').replace(/\\s+/g, ' ').trim() : '';
+"""
+
+# Snapshot da tabela de resultados: células, status e alvo do onclick de cada linha clicável
+_JS_TABELA_RESULTADOS = _JS_FUNCOES_DOM + """
+const [by, valor, seletorLinha, colStatus] = arguments;
+const tbody = localizar(by, valor);
+if (!tbody) return null;
+const linhas = Array.from(tbody.querySelectorAll(seletorLinha)).map((tr, indice) => {
+    const celulas = Array.from(tr.querySelectorAll('td')).map(texto);
+    return {
+        indice: indice,
+        celulas: celulas,
+        status: celulas.length > colStatus ? celulas[colStatus].toUpperCase() : '',
+        onclick: tr.getAttribute('onclick') || '',
+    };
+});
+return {linhas: linhas};
+"""
+
+_JS_CLICAR_LINHA_RESULTADO = _JS_FUNCOES_DOM + """
+const [by, valor, seletorLinha, indice] = arguments;
+const tbody = localizar(by, valor);
+const linha = tbody ? tbody.querySelectorAll(seletorLinha)[indice] : null;
+if (!linha) return false;
+linha.click();
+return true;
+"""
+
+# Snapshot do Extrato: texto do header e visibilidade dos blocos de cancelado/normal/contemplado
+_JS_SNAPSHOT_EXTRATO = _JS_FUNCOES_DOM + """
+const [header, cancelado, normal, contemplado] = arguments[0].map(([by, valor]) => localizar(by, valor));
+return {
+    header: header ? texto(header) : null,
+    cancelado: visivel(cancelado),
+    normal: visivel(normal),
+    contemplado: visivel(contemplado),
+};
+"""
+
+# Snapshot da página de lances; null enquanto tab-switcher e botão Simular não existirem
+_JS_SNAPSHOT_LANCES = _JS_FUNCOES_DOM + """
+const [fidelidade, ativo] = arguments[0].map(([by, valor]) => localizar(by, valor));
+if (!document.querySelector('.tab-switcher') || !document.getElementById('btn_simular')) return null;
+return {
+    fidelidade: visivel(fidelidade),
+    tab_ativo_visivel: visivel(ativo),
+    tab_ativo: visivel(ativo) ? texto(ativo) : '',
+    data_lance: visivel(ativo) ? (ativo.getAttribute('data-lance') || '') : '',
+};
+"""
+
+_JS_TEXTO_VISIVEL = _JS_FUNCOES_DOM + """
+const el = localizar(arguments[0], arguments[1]);
+return visivel(el) ? texto(el) : null;
+"""
+
+def _aguardar_snapshot(driver, leitor, condicao=bool, timeout=10):
+    """Relê um snapshot do DOM (1 round trip por leitura) até `condicao` ser verdadeira.
+
+    Retorna o último snapshot lido, mesmo que o tempo tenha esgotado.
+    """
+    limite = time.monotonic() + timeout
+    while True:
+        snapshot = leitor(driver)
+        if (snapshot and condicao(snapshot)) or time.monotonic() >= limite:
+            return snapshot
+        time.sleep(0.1)
+
+@rastreamento.etapa("resultados")
+def ler_tabela_resultados(driver, timeout=15):
+    """Retorna as linhas da tabela de resultados da busca: [{indice, celulas, status, onclick}, ...]."""
+    snapshot = _aguardar_snapshot(
+        driver,
+        lambda d: d.execute_script(
+            _JS_TABELA_RESULTADOS, *ServopaGroupLocators.RESULT_BODY,
+            ServopaGroupLocators.RESULT_ROW_CSS, ServopaGroupLocators.RESULT_STATUS_COL,
+        ),
+        timeout=timeout,
+    )
+    if snapshot is None:
+        raise TimeoutException("Tabela de resultados da busca não apareceu.")
+    return snapshot['linhas']
+
+def clicar_linha_resultado(driver, indice):
+    """Clica (via JS) na linha `indice` da tabela de resultados."""
+    return driver.execute_script(
+        _JS_CLICAR_LINHA_RESULTADO, *ServopaGroupLocators.RESULT_BODY,
+        ServopaGroupLocators.RESULT_ROW_CSS, indice,
+    )
+
+def ler_snapshot_extrato(driver):
+    return driver.execute_script(_JS_SNAPSHOT_EXTRATO, [
+        list(ServopaLanceLocators.EXTRATO_HEADER_ANY),
+        list(ServopaLanceLocators.EXTRATO_CANCELADO_HEADER),
+        list(ServopaLanceLocators.EXTRATO_HEADER_NORMAL),
+        list(ServopaLanceLocators.LANCE_CONTEMPLADO_ERROR),
+    ])
+
+def ler_snapshot_lances(driver):
+    return driver.execute_script(_JS_SNAPSHOT_LANCES, [
+        list(ServopaLanceLocators.LANCE_FIDELIDADE_TAB),
+        list(ServopaLanceLocators.LANCE_ACTIVE_TAB),
+    ])
+
+def ler_texto_visivel(driver, by, value, timeout=10):
+    """Retorna o texto do elemento assim que ele estiver visível (1 round trip por leitura), ou None."""
+    return _aguardar_snapshot(driver, lambda d: d.execute_script(_JS_TEXTO_VISIVEL, by, value), timeout=timeout)
 
 def save_debug_artifacts(driver, base_dir, basename):
     """Salva screenshot (.png) e HTML (.html) para depuração inesperada."""
@@ -147,54 +473,196 @@ def check_for_captcha(driver):
     except TimeoutException:
         pass
 
-def aguardar_download_concluir(download_path, timeout=90):
+def pasta_download_navegador(indice):
+    """Retorna a subpasta de downloads exclusiva do navegador de número `indice`."""
+    return os.path.join(DOWNLOAD_DIR, f"navegador-{indice}")
+
+def recolher_downloads_orfaos(download_path):
+    """Move PDFs que sobraram na pasta da sessão para DOWNLOAD_DIR/orfaos, para não serem atribuídos à cota errada."""
+    orfaos_path = os.path.join(DOWNLOAD_DIR, "orfaos")
+    try:
+        sobras = [f for f in os.listdir(download_path) if os.path.isfile(os.path.join(download_path, f))]
+    except FileNotFoundError:
+        return 0
+    for nome in sobras:
+        try:
+            os.makedirs(orfaos_path, exist_ok=True)
+            destino = os.path.join(orfaos_path, f"{datetime.now().strftime('%Y%m%d%H%M%S')}-{nome}")
+            shutil.move(os.path.join(download_path, nome), destino)
+            logging.warning(f"Download órfão '{nome}' movido para: {destino}")
+        except Exception as e:
+            logging.error(f"Não foi possível mover o download órfão '{nome}': {e}")
+    return len(sobras)
+
+def _listar_pdfs_novos(download_path, ignorar=()):
+    """Lista os PDFs finalizados da pasta que não estavam presentes antes (ordem de chegada).
+
+    Um PDF com o '.part' correspondente ainda está sendo gravado pelo Firefox e é ignorado.
+    """
+    nomes = set(os.listdir(download_path))
+    novos = [
+        f for f in nomes
+        if f.lower().endswith(".pdf") and f not in ignorar and f"{f}.part" not in nomes
+    ]
+    def _mtime(nome):
+        try:
+            return os.path.getmtime(os.path.join(download_path, nome))
+        except OSError:
+            return 0
+    return sorted(novos, key=_mtime)
+
+def _usar_monitor_eventos():
+    return MONITOR_DOWNLOADS != "polling" and inotify_disponivel()
+
+def aguardar_download_concluir(download_path, timeout=90, ignorar=()):
+    """Aguarda a conclusão do download de um arquivo PDF.
+
+    Com inotify disponível, retorna assim que o Firefox finaliza o arquivo; caso contrário
+    (ou se o monitor falhar), usa a verificação por polling com estabilidade do tamanho.
+    ignorar: nomes presentes na pasta antes do clique que gerou o download; nunca são reivindicados.
+    """
+    if _usar_monitor_eventos():
+        try:
+            return _aguardar_download_eventos(download_path, timeout, ignorar)
+        except OSError as e:
+            logging.warning(f"Monitor de eventos indisponível ({e}); usando verificação por polling.")
+    return _aguardar_download_polling(download_path, timeout, ignorar)
+
+def _aguardar_download_eventos(download_path, timeout=90, ignorar=()):
+    """Aguarda o download via inotify: retorna no instante em que o '.part' vira '.pdf'."""
+    logging.info(f"Monitorando pasta de downloads (eventos): {download_path}")
+    with MonitorPastaDownload(download_path, ignorar) as monitor:
+        pdf_file = monitor.proximo_pdf(timeout)
+    if not pdf_file:
+        raise TimeoutException("Nenhum arquivo PDF apareceu na pasta de downloads.")
+    logging.info(f"Download do '{pdf_file}' concluído (arquivo finalizado pelo navegador).")
+    return pdf_file
+
+def _aguardar_download_polling(download_path, timeout=90, ignorar=()):
     """Aguarda a conclusão do download de um arquivo PDF, verificando a estabilidade do tamanho."""
     logging.info(f"Monitorando pasta de downloads: {download_path}")
     start_time = time.time()
     time.sleep(2) # Espera inicial para o arquivo .part ser criado
     while time.time() - start_time < timeout:
-        files = [f for f in os.listdir(download_path) if f.endswith(".pdf") and not f.endswith(".part")]
+        files = _listar_pdfs_novos(download_path, ignorar)
         if files:
-            pdf_file = files[0]
-            file_path = os.path.join(download_path, pdf_file)
-            logging.info(f"Arquivo PDF '{pdf_file}' encontrado. Verificando estabilidade...")
-            last_size = -1
-            stable_count = 0
-            stable_threshold = 3
-            while time.time() - start_time < timeout:
-                try:
-                    current_size = os.path.getsize(file_path)
-                    if current_size == last_size and current_size > 0:
-                        stable_count += 1
-                        if stable_count >= stable_threshold:
-                            logging.info(f"Download do '{pdf_file}' concluído e estável.")
-                            return pdf_file
-                    else:
-                        stable_count = 0
-                    last_size = current_size
-                except FileNotFoundError:
-                    time.sleep(1)
-                    continue
-                time.sleep(1)
-            raise TimeoutException(f"Tempo esgotado esperando a estabilização do arquivo '{pdf_file}'.")
+            if len(files) > 1:
+                logging.warning(f"Mais de um PDF novo na pasta ({files}); reivindicando o mais antigo.")
+            return _aguardar_estabilidade(download_path, files[0], start_time, timeout)
         time.sleep(1)
     raise TimeoutException("Nenhum arquivo PDF apareceu na pasta de downloads.")
 
-def aguardar_pdf_aparecer(download_path, timeout=4):
-    """Verifica rapidamente se algum PDF apareceu na pasta de downloads.
+def _aguardar_estabilidade(download_path, pdf_file, start_time, timeout):
+    """Aguarda o tamanho do arquivo ficar estável (3 leituras iguais, 1s entre elas)."""
+    file_path = os.path.join(download_path, pdf_file)
+    logging.info(f"Arquivo PDF '{pdf_file}' encontrado. Verificando estabilidade...")
+    last_size = -1
+    stable_count = 0
+    stable_threshold = 3
+    while time.time() - start_time < timeout:
+        try:
+            current_size = os.path.getsize(file_path)
+            if current_size == last_size and current_size > 0:
+                stable_count += 1
+                if stable_count >= stable_threshold:
+                    logging.info(f"Download do '{pdf_file}' concluído e estável.")
+                    return pdf_file
+            else:
+                stable_count = 0
+            last_size = current_size
+        except FileNotFoundError:
+            time.sleep(1)
+            continue
+        time.sleep(1)
+    raise TimeoutException(f"Tempo esgotado esperando a estabilização do arquivo '{pdf_file}'.")
+
+# Texto do modal (SweetAlert) de bloqueio após o Registrar; null enquanto não houver modal VISÍVEL.
+# O SweetAlert v1 deixa o '.sweet-alert' oculto na página o tempo todo, e um toast (aviso de
+# sucesso) também casa com os seletores: nenhum dos dois é bloqueio.
+_JS_MODAL_REGISTRO = _JS_FUNCOES_DOM + """
+const [[by, valor], [byMensagem, valorMensagem]] = arguments[0];
+const candidatos = by === 'css selector' ? Array.from(document.querySelectorAll(valor)) : [localizar(by, valor)];
+const container = candidatos.find((el) => visivel(el)
+    && !el.matches('.swal2-toast, .swal2-toast-shown') && !el.querySelector('.swal2-toast'));
+if (!container) return null;
+const mensagem = (byMensagem === 'css selector' && container.querySelector(valorMensagem))
+    || localizar(byMensagem, valorMensagem);
+return texto(mensagem);
+"""
+
+def _ler_modal_registro(driver):
+    """Texto do modal de bloqueio visível, ou None. Erros de script durante a navegação contam como 'sem modal'."""
+    try:
+        return driver.execute_script(_JS_MODAL_REGISTRO, [
+            list(ServopaLanceLocators.MODAL_CONTAINER),
+            list(ServopaLanceLocators.MODAL_TEXT),
+        ])
+    except InvalidSessionIdException:
+        raise
+    except WebDriverException as e:
+        if _sessao_perdida(e):
+            raise
+        return None
+
+def _download_em_andamento(download_path):
+    """True se o Firefox ainda está gravando algum arquivo ('.part') na pasta."""
+    try:
+        return any(nome.endswith(".part") for nome in os.listdir(download_path))
+    except OSError:
+        return False
+
+@rastreamento.etapa("aguardar_download")
+def aguardar_resultado_registro(driver, download_path, ignorar=(), timeout=90):
+    """Após o Registrar, observa ao mesmo tempo a pasta de downloads e o DOM.
 
-    Retorna o nome do arquivo (string) se encontrado dentro do timeout; caso contrário, None.
-    Não verifica estabilidade do tamanho, apenas presença.
+    Retorna ('pdf', nome_do_arquivo) ou ('modal', texto_do_modal), o que acontecer primeiro.
+    Com inotify, o PDF é entregue no instante em que o navegador o finaliza; sem ele, a pasta
+    é verificada a cada ciclo e o PDF encontrado passa pela verificação de estabilidade.
+    O PDF tem prioridade: nos primeiros PRIORIDADE_PDF_REGISTRO segundos, ou enquanto houver
+    um download em andamento, um modal não encerra a espera, e a pasta é conferida mais uma
+    vez antes de retornar 'modal'.
     """
-    logging.info(f"Verificação rápida por PDF (até {timeout}s) em: {download_path}")
-    start = time.time()
-    while time.time() - start < timeout:
-        files = [f for f in os.listdir(download_path) if f.endswith('.pdf') and not f.endswith('.part')]
+    logging.info(f"Aguardando resultado do Registrar (PDF em {download_path} ou modal na página)...")
+    monitor = None
+    if _usar_monitor_eventos():
+        try:
+            monitor = MonitorPastaDownload(download_path, ignorar)
+        except OSError as e:
+            logging.warning(f"Monitor de eventos indisponível ({e}); usando verificação por polling.")
+    start_time = time.time()
+
+    def _pdf_pronto(espera):
+        if monitor:
+            pdf_file = monitor.proximo_pdf(timeout=espera)
+            if pdf_file:
+                logging.info(f"Download do '{pdf_file}' concluído (arquivo finalizado pelo navegador).")
+            return pdf_file
+        files = _listar_pdfs_novos(download_path, ignorar)
         if files:
-            logging.info(f"PDF detectado rapidamente: {files[0]}")
-            return files[0]
-        time.sleep(0.3)
-    return None
+            return _aguardar_estabilidade(download_path, files[0], start_time, timeout)
+        return None
+
+    try:
+        while True:
+            pdf_file = _pdf_pronto(0.25)
+            if pdf_file:
+                return 'pdf', pdf_file
+
+            modal_text = _ler_modal_registro(driver)
+            if (modal_text is not None and time.time() - start_time >= PRIORIDADE_PDF_REGISTRO
+                    and not _download_em_andamento(download_path)):
+                pdf_file = _pdf_pronto(0)
+                if pdf_file:
+                    return 'pdf', pdf_file
+                return 'modal', modal_text
+
+            if time.time() - start_time >= timeout:
+                raise TimeoutException("Nenhum PDF apareceu na pasta de downloads e nenhum modal foi exibido após o Registrar.")
+            if not monitor:
+                time.sleep(0.25)
+    finally:
+        if monitor:
+            monitor.fechar()
 
 def sanitizar_nome_arquivo(nome):
     """Remove caracteres inválidos de um nome de arquivo."""
@@ -218,57 +686,96 @@ def click_element(driver, by, value, timeout=10):
         logging.error(f"Falha crítica ao clicar no elemento {value} via JavaScript: {e}")
         return False
 
-def click_first_available(driver, locators, timeout_each=6):
-    """Tenta clicar no primeiro seletor que funcionar, com logs detalhados.
+def aguardar_primeiro_disponivel(driver, locators, timeout=6, condicao=EC.element_to_be_clickable):
+    """Aguarda QUALQUER um dos locators satisfazer `condicao`, verificando todos a cada ciclo.
 
-    locators: lista de tuplas (By, value)
+    Em vez de esgotar o timeout de um seletor antes de tentar o próximo, todos os candidatos
+    disputam a mesma janela de tempo e vence o primeiro que aparecer.
+    Retorna (locator, elemento) do vencedor, ou (None, None) se o tempo esgotar.
     """
-    for (by, value) in locators:
-        logging.info(f"Tentando clicar no controle: by={by}, value={value}")
-        try:
-            element = WebDriverWait(driver, timeout_each).until(EC.element_to_be_clickable((by, value)))
+    condicoes = [(locator, condicao(locator)) for locator in locators]
+
+    def _algum_disponivel(d):
+        for locator, cond in condicoes:
             try:
-                driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", element)
-            except Exception:
-                pass
+                element = cond(d)
+            except (NoSuchElementException, StaleElementReferenceException):
+                element = False
+            if element:
+                return locator, element
+        return False
+
+    try:
+        return WebDriverWait(driver, timeout, poll_frequency=0.1).until(_algum_disponivel)
+    except TimeoutException:
+        return None, None
+
+def click_first_available(driver, locators, timeout=6):
+    """Clica no primeiro seletor que ficar clicável dentre os fornecidos, com logs detalhados.
+
+    locators: lista de tuplas (By, value), todas aguardadas em paralelo dentro de `timeout`.
+    Se o clique no vencedor falhar, os demais seguem na disputa pelo tempo restante.
+    """
+    candidatos = list(locators)
+    limite = time.monotonic() + timeout
+    logging.info(f"Tentando clicar em um dos controles: {[value for _, value in candidatos]}")
+    while candidatos:
+        locator, element = aguardar_primeiro_disponivel(driver, candidatos, timeout=max(0, limite - time.monotonic()))
+        if locator is None:
+            logging.info(f"Nenhum controle ficou clicável a tempo: {[value for _, value in candidatos]}")
+            break
+        by, value = locator
+        logging.info(f"Controle disponível: by={by}, value={value}")
+        try:
+            driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", element)
+        except Exception:
+            pass
+        try:
+            driver.execute_script("arguments[0].click();", element)
+            aguardar_pagina_pronta(driver, timeout=2)
+            return True
+        except Exception as e_js:
+            logging.warning(f"Clique via JS falhou para {value}: {e_js}")
             try:
-                driver.execute_script("arguments[0].click();", element)
-                time.sleep(0.2)
+                element.click()
+                aguardar_pagina_pronta(driver, timeout=2)
                 return True
-            except Exception as e_js:
-                logging.warning(f"Clique via JS falhou para {value}: {e_js}")
-                try:
-                    element.click()
-                    time.sleep(0.2)
-                    return True
-                except Exception as e_native:
-                    logging.warning(f"Clique nativo falhou para {value}: {e_native}")
-        except TimeoutException:
-            logging.info(f"Controle não encontrado a tempo: {value}")
-        except Exception as e:
-            logging.warning(f"Falha ao preparar clique em {value}: {e}")
+            except Exception as e_native:
+                logging.warning(f"Clique nativo falhou para {value}: {e_native}")
+        candidatos.remove(locator)
     logging.error("Nenhum seletor de clique funcionou dentre os fornecidos.")
     return False
 
-def find_first_present(driver, locators, timeout_each=5):
+def find_first_present(driver, locators, timeout=5):
     """Retorna o primeiro elemento PRESENTE no DOM dentre os locators informados, ou None.
 
     Observação: Alguns campos podem estar fora da viewport ou demorarem para ficar visíveis,
     por isso detectamos por presença e rolamos até eles antes de interagir.
     """
-    for locator in locators:
-        try:
-            el = WebDriverWait(driver, timeout_each).until(EC.presence_of_element_located(locator))
-            return el
-        except Exception:
-            continue
-    return None
-def type_text_and_verify(driver, by, value, text, timeout=10, retries=3, delay=0.2, is_password=False):
+    _, element = aguardar_primeiro_disponivel(driver, locators, timeout, condicao=EC.presence_of_element_located)
+    return element
+
+def _valor_aplicado(element, text, is_password):
+    """Confere o value do campo; para senha, aceita apenas comprimento>0."""
+    current = element.get_attribute("value") or ""
+    return (is_password and len(current) > 0) or (not is_password and current.strip() == str(text))
+
+def _aguardar_valor_aplicado(driver, element, text, is_password, verify_timeout):
+    """Aguarda (sem pausa fixa) o valor digitado aparecer no campo."""
+    try:
+        WebDriverWait(driver, verify_timeout, poll_frequency=0.05).until(
+            lambda d: _valor_aplicado(element, text, is_password)
+        )
+        return True
+    except TimeoutException:
+        return False
+
+def type_text_and_verify(driver, by, value, text, timeout=10, retries=3, verify_timeout=1.0, is_password=False):
     """Preenche um campo de texto e verifica se o valor foi realmente aplicado.
 
     Estratégia:
     - clear + click + send_keys
-    - validação por get_attribute('value'); para senha, aceita apenas comprimento>0
+    - validação por get_attribute('value') até verify_timeout; para senha, aceita apenas comprimento>0
     - fallback: set via JavaScript e revalida
     """
     last_error = None
@@ -290,18 +797,13 @@ def type_text_and_verify(driver, by, value, text, timeout=10, retries=3, delay=0
             except Exception:
                 pass
             element.send_keys(text)
-            time.sleep(delay)
-
-            current = element.get_attribute("value") or ""
-            if (is_password and len(current) > 0) or (not is_password and current.strip() == str(text)):
+            if _aguardar_valor_aplicado(driver, element, text, is_password, verify_timeout):
                 return True
 
             # Fallback por JavaScript
             try:
                 driver.execute_script("arguments[0].value = arguments[1];", element, text)
-                time.sleep(delay)
-                current = element.get_attribute("value") or ""
-                if (is_password and len(current) > 0) or (not is_password and current.strip() == str(text)):
+                if _aguardar_valor_aplicado(driver, element, text, is_password, verify_timeout):
                     return True
             except Exception as js_e:
                 last_error = js_e
@@ -314,8 +816,87 @@ def type_text_and_verify(driver, by, value, text, timeout=10, retries=3, delay=0
 
 # --- Funções de Lógica de Negócio ---
 
-def login(driver):
-    """Realiza o login no sistema, com verificações proativas."""
+def arquivo_cookies_navegador(indice):
+    """Arquivo de cookies do navegador N. Cada navegador mantém sua própria sessão no portal,
+    pois o portal guarda no servidor a cota em andamento de cada sessão."""
+    base, ext = os.path.splitext(SESSION_COOKIES_FILE)
+    return f"{base}.navegador-{indice}{ext or '.json'}"
+
+def salvar_cookies_sessao(driver, arquivo):
+    """Grava os cookies da sessão autenticada em `arquivo` (escrita atômica, legível só pelo usuário)."""
+    try:
+        cookies = driver.get_cookies()
+        pasta = os.path.dirname(os.path.abspath(arquivo))
+        os.makedirs(pasta, exist_ok=True)
+        temporario = f"{arquivo}.tmp"
+        with open(temporario, "w", encoding="utf-8") as f:
+            json.dump({"salvo_em": time.time(), "url": SERVOPA_URL, "cookies": cookies}, f)
+        if os.name == "posix":
+            os.chmod(temporario, 0o600)
+        os.replace(temporario, arquivo)
+        logging.info(f"Cookies da sessão salvos em '{arquivo}' ({len(cookies)} cookies).")
+    except (OSError, WebDriverException) as e:
+        logging.warning(f"Não foi possível salvar os cookies da sessão: {e}")
+
+def _carregar_cookies_sessao(arquivo):
+    """Lê os cookies salvos, descartando os expirados. Retorna [] se o arquivo não servir."""
+    try:
+        with open(arquivo, encoding="utf-8") as f:
+            dados = json.load(f)
+    except FileNotFoundError:
+        return []
+    except (OSError, ValueError) as e:
+        logging.warning(f"Arquivo de cookies '{arquivo}' ilegível: {e}")
+        return []
+    if dados.get("url") != SERVOPA_URL:
+        logging.info("Cookies salvos pertencem a outra URL do portal; ignorando.")
+        return []
+    agora = time.time()
+    return [c for c in dados.get("cookies", []) if not c.get("expiry") or c["expiry"] > agora]
+
+def restaurar_sessao(driver, arquivo):
+    """Tenta reaproveitar uma sessão salva: injeta os cookies e confirma o login por uma
+    página autenticada. Retorna True se a sessão continua válida."""
+    cookies = _carregar_cookies_sessao(arquivo)
+    if not cookies:
+        return False
+    logging.info(f"Restaurando sessão salva ({len(cookies)} cookies) de '{arquivo}'...")
+    # O navegador só aceita cookies do domínio da página aberta
+    driver.get(SERVOPA_URL)
+    for cookie in cookies:
+        try:
+            driver.add_cookie(cookie)
+        except WebDriverException as e:
+            logging.debug(f"Cookie '{cookie.get('name')}' recusado: {e}")
+    driver.get(SERVOPA_BUSCAR_URL)
+    remover_loading(driver)
+    if find_element(driver, *ServopaLocators.LOGOUT_BUTTON, timeout=SESSAO_VERIFICACAO_TIMEOUT):
+        logging.info("Sessão salva ainda válida. Login por formulário dispensado.")
+        return True
+    logging.info("Sessão salva expirou. Será feito o login por formulário.")
+    driver.delete_all_cookies()
+    try:
+        os.remove(arquivo)
+    except OSError:
+        pass
+    return False
+
+@rastreamento.etapa("login")
+def login(driver, arquivo_cookies=None):
+    """Realiza o login no sistema, com verificações proativas.
+
+    arquivo_cookies: se informado (e REUTILIZAR_SESSAO ativo), tenta primeiro restaurar a
+    sessão salva nesse arquivo e, após um login por formulário bem-sucedido, salva os cookies nele.
+    """
+    if arquivo_cookies and REUTILIZAR_SESSAO:
+        try:
+            if restaurar_sessao(driver, arquivo_cookies):
+                return True
+        except InvalidSessionIdException:
+            raise
+        except WebDriverException as e:
+            logging.warning(f"Falha ao restaurar a sessão salva: {e}. Seguindo com o login por formulário.")
+
     logging.info(f"Acessando URL de login: {SERVOPA_URL}")
     driver.get(SERVOPA_URL)
     remover_loading(driver)
@@ -346,6 +927,8 @@ def login(driver):
         try:
             WebDriverWait(driver, 10).until(EC.visibility_of_element_located(ServopaLocators.LOGOUT_BUTTON))
             logging.info("DEBUG LOGIN: Botão de Logout visível. Login bem-sucedido.")
+            if arquivo_cookies and REUTILIZAR_SESSAO:
+                salvar_cookies_sessao(driver, arquivo_cookies)
         except TimeoutException:
             logging.warning("DEBUG LOGIN: Botão de Logout NÃO visível após login. Possível falha ou redirecionamento inesperado.")
 
@@ -360,21 +943,67 @@ def login(driver):
         check_for_captcha(driver)
         raise e
 
-def _navegar_e_buscar_cota(driver, cota_info):
-    """Navega via menus até a tela de busca e preenche os dados da cota."""
-    grupo, cota, digito = cota_info['grupo'], cota_info['cota'], cota_info['digito']
-    logging.info(f"Navegando via menu para a busca da cota {grupo}/{cota}-{digito}")
+# Estado de navegação por sessão (driver.session_id):
+#   'modo': 'direto' ou 'menu', o caminho que funcionou nesta sessão (None enquanto desconhecido)
+#   'na_busca': True se a tela de busca acabou de ser carregada e ainda não foi usada
+_ESTADO_NAVEGACAO = {}
+
+def _estado_navegacao(driver):
+    return _ESTADO_NAVEGACAO.setdefault(driver.session_id, {'modo': None, 'na_busca': False})
 
+def _navegar_via_menu(driver):
+    """Abre a tela de busca pelos menus 'Ferramentas Admin' > 'Buscar'."""
     # Clica no menu "Ferramentas Admin" - seletor robusto do script antigo
     if not click_element(driver, By.XPATH, "//a[contains(., 'Ferramentas Admin')]"):
         raise Exception("Falha ao clicar no menu 'Ferramentas Admin'")
     remover_loading(driver)
 
     # Clica no submenu "Buscar" - seletor robusto do script antigo
-    if not click_element(driver, By.XPATH, "//a[@href='https://www.consorcioservopa.com.br/vendas/buscar']"):
+    if not click_element(driver, By.XPATH, f"//a[@href='{SERVOPA_BUSCAR_URL}']"):
         raise Exception("Falha ao clicar no submenu 'Buscar'")
     remover_loading(driver)
 
+def ir_para_busca(driver):
+    """Abre a tela de busca de cotas pelo caminho mais rápido que funciona nesta sessão.
+
+    Com NAVEGACAO_DIRETA, tenta driver.get na URL de busca; se o formulário não aparecer,
+    usa o menu. O caminho que funcionou fica memorizado para a sessão.
+    """
+    estado = _estado_navegacao(driver)
+    if NAVEGACAO_DIRETA and estado['modo'] != 'menu':
+        try:
+            driver.get(SERVOPA_BUSCAR_URL)
+            remover_loading(driver)
+            if find_element(driver, *ServopaGroupLocators.GROUP_INPUT, timeout=5):
+                estado['modo'] = 'direto'
+                estado['na_busca'] = True
+                return True
+            logging.warning("Acesso direto à URL de busca não exibiu o formulário; usando o menu.")
+        except InvalidSessionIdException:
+            raise
+        except WebDriverException as e:
+            logging.warning(f"Acesso direto à URL de busca falhou ({e}); usando o menu.")
+        # Só passa a usar o menu de vez se o acesso direto nunca funcionou nesta sessão
+        if estado['modo'] is None:
+            estado['modo'] = 'menu'
+            logging.info("Navegação direta desativada para esta sessão; a busca seguirá pelo menu.")
+
+    _navegar_via_menu(driver)
+    estado['na_busca'] = True
+    return True
+
+@rastreamento.etapa("busca")
+def _navegar_e_buscar_cota(driver, cota_info):
+    """Abre a tela de busca (direto pela URL ou via menus) e preenche os dados da cota."""
+    grupo, cota, digito = cota_info['grupo'], cota_info['cota'], cota_info['digito']
+    estado = _estado_navegacao(driver)
+    if estado['na_busca']:
+        logging.info(f"Tela de busca já carregada para a cota {grupo}/{cota}-{digito}")
+    else:
+        logging.info(f"Navegando para a busca da cota {grupo}/{cota}-{digito}")
+        ir_para_busca(driver)
+    estado['na_busca'] = False
+
     # Preenche o formulário de busca
     logging.info(f"Preenchendo busca para Grupo: {grupo}, Cota: {cota}, Dígito: {digito}")
     find_element(driver, *ServopaGroupLocators.GROUP_INPUT).send_keys(grupo)
@@ -389,98 +1018,229 @@ def _navegar_e_buscar_cota(driver, cota_info):
     logging.info("Busca realizada. Aguardando resultados...")
     return True
 
-def run_automation_for_cota(driver, cota_info, consultor):
-    """Orquestra o fluxo completo para uma única cota."""
-    grupo, cota, digito = cota_info['grupo'], cota_info['cota'], cota_info['digito']
-    logging.info(f"--- INICIANDO COTA {cota_info['original']} ---")
+# Tabelas de resultados por grupo da execução atual (ver cache_grupos.py); limpo a cada main()
+_CACHE_GRUPOS = CacheBuscaGrupos()
+
+@rastreamento.etapa("busca_grupo")
+def _buscar_grupo(driver, grupo):
+    """Busca só pelo grupo e lê a tabela inteira: [{cota, digito, status, alvo}, ...].
+
+    Retorna None se a tabela vier vazia, sem as colunas de cota/dígito ou com algo que não
+    seja número nelas (índices RESULT_COTA_COL/RESULT_DIGITO_COL fora do layout real).
+    """
+    estado = _estado_navegacao(driver)
+    if not estado['na_busca']:
+        ir_para_busca(driver)
+    estado['na_busca'] = False
+
+    logging.info(f"Buscando todas as cotas do grupo {grupo} (busca por grupo)...")
+    find_element(driver, *ServopaGroupLocators.GROUP_INPUT).send_keys(grupo)
+    if not click_element(driver, *ServopaGroupLocators.SEARCH_GROUP_BUTTON):
+        raise Exception("Falha ao clicar no botão de busca.")
+    remover_loading(driver)
+
+    colunas = max(ServopaGroupLocators.RESULT_COTA_COL, ServopaGroupLocators.RESULT_DIGITO_COL,
+                  ServopaGroupLocators.RESULT_STATUS_COL)
     try:
-        _navegar_e_buscar_cota(driver, cota_info)
-
-        logging.info("Procurando pela tabela de resultados...")
-        result_body = WebDriverWait(driver, 15).until(EC.presence_of_element_located((By.XPATH, "//tbody")))
-        rows = result_body.find_elements(By.XPATH, ".//tr[@onclick]")
-        logging.info(f"{len(rows)} linha(s) de resultado encontradas.")
-        if not rows:
-            return 'ERRO_BENIGNO', "Cota não encontrada na busca."
-
-        cota_ativa_encontrada = False
-        for i, row in enumerate(rows):
-            logging.info(f"Verificando linha {i+1}...")
-            cells = row.find_elements(By.TAG_NAME, "td")
-            if len(cells) >= 8:
-                status_text = cells[7].text.strip().upper()
-                logging.info(f"Status encontrado: '{status_text}'")
-                if status_text == "ATIVO":
-                    logging.info(f"Cota ATIVA encontrada. Clicando na linha...")
-                    driver.execute_script("arguments[0].click();", row)
-                    cota_ativa_encontrada = True
-                    break
-        
-        if not cota_ativa_encontrada:
-            return 'ERRO_BENIGNO', "Nenhuma cota com status 'ATIVO' foi encontrada."
+        linhas = ler_tabela_resultados(driver)
+    except TimeoutException:
+        return None
+    if not linhas or any(len(linha['celulas']) <= colunas for linha in linhas):
+        return None
+    for linha in linhas:
+        cota = linha['celulas'][ServopaGroupLocators.RESULT_COTA_COL].strip()
+        digito = linha['celulas'][ServopaGroupLocators.RESULT_DIGITO_COL].strip()
+        if not re.fullmatch(r"[\d.,]+", cota) or not re.fullmatch(r"\d", digito):
+            logging.warning(f"Tabela do grupo {grupo} com cota/dígito não numéricos ('{cota}', '{digito}'); "
+                            f"confira RESULT_COTA_COL e RESULT_DIGITO_COL em locators.py.")
+            return None
+    url_base = driver.current_url
+    return [
+        {
+            'cota': linha['celulas'][ServopaGroupLocators.RESULT_COTA_COL],
+            'digito': linha['celulas'][ServopaGroupLocators.RESULT_DIGITO_COL],
+            'status': linha['status'],
+            'alvo': servopa_http.url_do_onclick(linha['onclick'], url_base),
+        }
+        for linha in linhas
+    ]
+
+def _alvo_pela_tabela_do_grupo(driver, cota_info):
+    """Consulta a tabela em cache do grupo da cota (buscando o grupo na primeira vez).
+
+    Retorna a URL do Extrato da linha ATIVA da cota, ('ERRO_BENIGNO', mensagem) quando a
+    tabela já descarta a cota, ou None para seguir pela busca individual.
+    """
+    tabela = _CACHE_GRUPOS.tabela(cota_info['grupo'], lambda grupo: _buscar_grupo(driver, grupo))
+    if tabela is None:
+        return None
+    linhas = tabela.linhas_da_cota(cota_info['cota'], cota_info['digito'])
+    linha_ativa = next((linha for linha in linhas if linha['status'] == "ATIVO"), None)
+    if linha_ativa is None:
+        # Descartada sem abrir nada: o navegador não precisa voltar à tela de busca
+        cota_info['sem_navegacao'] = True
+        if not linhas:
+            return 'ERRO_BENIGNO', "Cota não encontrada na busca do grupo."
+        return 'ERRO_BENIGNO', "Nenhuma cota com status 'ATIVO' foi encontrada."
+    return linha_ativa['alvo']
+
+@rastreamento.etapa("mover_pdf")
+def _salvar_pdf_lance(download_dir, pdf_filename, nome_cliente, cota_info, consultor):
+    """Move o PDF baixado para Lances/<consultor> com o nome padrão do lance."""
+    nome_cliente_sanitizado = sanitizar_nome_arquivo(nome_cliente)
+    novo_nome = f"LANCE- {nome_cliente_sanitizado} {cota_info['grupo']}.{cota_info['cota']}-{cota_info['digito']}.pdf"
+    caminho_destino = os.path.join("Lances", consultor, novo_nome)
+    shutil.move(os.path.join(download_dir, pdf_filename), caminho_destino)
+    logging.info(f"PDF salvo como: {caminho_destino}")
+    return caminho_destino
+
+@rastreamento.etapa("http")
+def _tentar_caminho_http(driver, cota_info, consultor, download_dir):
+    """Processa a cota por HTTP com os cookies do navegador.
+
+    Retorna (status, mensagem), ou None se a cota deve seguir pelo navegador.
+    """
+    if not servopa_http.disponivel():
+        logging.warning("HTTP_RAPIDO ativo, mas o pacote 'requests' não está instalado; usando só o navegador.")
+        return None
+    try:
+        sessao = servopa_http.sessao_do_navegador(driver, SERVOPA_BUSCAR_URL, SERVOPA_LANCES_URL)
+        cookies = driver.get_cookies()
+        cookies_navegador = {c['name']: c['value'] for c in cookies}
+        sessao.atualizar_cookies(cookies)
+        resultado = sessao.processar_cota(cota_info, download_dir, LANCE_LIVRE_PERCENTUAL, LANCE_LIVRE_DESCONTAR_CARTA)
+    except servopa_http.FallbackNavegador as e:
+        logging.info(f"Caminho HTTP não aplicável ({e}). Seguindo pelo navegador.")
+        return None
+    # Fora o fallback, a cota não volta ao navegador: se algo falhar daqui em diante (cookies,
+    # gravação do PDF), a retentativa não pode reenviar um Registrar que já pode ter sido aceito
+    cota_info['registrado'] = True
 
-        remover_loading(driver)
-        logging.info("Página da cota carregada. Verificando status (rápido pelo header)...")
-        # Verificação rápida do header do Extrato (1 leitura)
-        try:
-            header_el = WebDriverWait(driver, 3).until(
-                EC.presence_of_element_located(ServopaLanceLocators.EXTRATO_HEADER_ANY)
-            )
-            header_txt = (header_el.text or header_el.get_attribute('textContent') or '').strip().upper()
-            if 'EXTRATO - CANCELADO' in header_txt:
-                return 'ERRO_BENIGNO', "Extrato da cota está cancelado."
-            if header_txt == 'EXTRATO':
-                pass  # ok, segue
+    # O portal pode renovar o cookie de sessão nas respostas; o navegador precisa do valor novo
+    for cookie in sessao.cookies_para_navegador():
+        if cookies_navegador.get(cookie['name']) != cookie['value']:
+            try:
+                driver.add_cookie(cookie)
+            except WebDriverException as e:
+                logging.warning(f"Não foi possível atualizar o cookie '{cookie['name']}' no navegador: {e}")
+
+    logging.info(f"Cota processada via HTTP: {resultado['status']} - {resultado['mensagem']}")
+    if resultado['status'] == 'SUCESSO':
+        cota_info['nome_cliente'] = resultado['nome_cliente']
+        _salvar_pdf_lance(download_dir, resultado['pdf'], resultado['nome_cliente'], cota_info, consultor)
+    return resultado['status'], resultado['mensagem']
+
+def run_automation_for_cota(driver, cota_info, consultor, download_dir=None):
+    """Orquestra o fluxo completo para uma única cota.
+
+    download_dir: pasta de downloads da sessão do `driver` (padrão: DOWNLOAD_DIR).
+    """
+    rastreamento.definir_cota(cota_info['original'])
+    try:
+        with rastreamento.span("cota") as registro:
+            status, mensagem = _fluxo_cota(driver, cota_info, consultor, download_dir)
+            registro['status'] = status
+        return status, mensagem
+    finally:
+        rastreamento.definir_cota(None)
+
+def _fluxo_cota(driver, cota_info, consultor, download_dir=None):
+    download_dir = download_dir or DOWNLOAD_DIR
+    logging.info(f"--- INICIANDO COTA {cota_info['original']} ---")
+    try:
+        if HTTP_RAPIDO:
+            resultado_http = _tentar_caminho_http(driver, cota_info, consultor, download_dir)
+            if resultado_http:
+                return resultado_http
+
+        alvo_extrato = _alvo_pela_tabela_do_grupo(driver, cota_info) if BUSCA_POR_GRUPO else None
+        if isinstance(alvo_extrato, tuple):
+            return alvo_extrato
+
+        if not alvo_extrato:
+            _navegar_e_buscar_cota(driver, cota_info)
+
+            logging.info("Procurando pela tabela de resultados...")
+            linhas = ler_tabela_resultados(driver)
+            logging.info(f"{len(linhas)} linha(s) de resultado encontradas.")
+            if not linhas:
+                return 'ERRO_BENIGNO', "Cota não encontrada na busca."
+
+            linha_ativa = None
+            for linha in linhas:
+                logging.info(f"Verificando linha {linha['indice']+1}...")
+                if len(linha['celulas']) > ServopaGroupLocators.RESULT_STATUS_COL:
+                    logging.info(f"Status encontrado: '{linha['status']}'")
+                    if linha['status'] == "ATIVO":
+                        linha_ativa = linha
+                        break
+
+            if not linha_ativa:
+                return 'ERRO_BENIGNO', "Nenhuma cota com status 'ATIVO' foi encontrada."
+
+        with rastreamento.span("extrato"):
+            if alvo_extrato:
+                logging.info("Cota ATIVA na tabela do grupo. Abrindo o Extrato pela URL da linha...")
+                _estado_navegacao(driver)['na_busca'] = False
+                driver.get(alvo_extrato)
             else:
-                logging.warning(f"Header de Extrato inesperado: '{header_txt}'. Aplicando verificação de fallback...")
-                # Fallback para os seletores antigos se o texto estiver diferente/oculto
-                if find_element(driver, *ServopaLanceLocators.EXTRATO_CANCELADO_HEADER, timeout=2):
-                    return 'ERRO_BENIGNO', "Extrato da cota está cancelado."
-                if not find_element(driver, *ServopaLanceLocators.EXTRATO_HEADER_NORMAL, timeout=3):
-                    save_debug_artifacts(driver, os.path.join("Lances", consultor), f"ERRO-{cota_info['original'].replace(',','-')}-extrato")
-                    return 'ERRO_CRITICO', "Página de Extrato não carregou como esperado."
-        except TimeoutException:
-            logging.warning("Header de Extrato não encontrado rapidamente; aplicando verificação de fallback...")
-            if find_element(driver, *ServopaLanceLocators.EXTRATO_CANCELADO_HEADER, timeout=2):
+                logging.info(f"Cota ATIVA encontrada. Clicando na linha...")
+                if not clicar_linha_resultado(driver, linha_ativa['indice']):
+                    raise Exception("Falha ao clicar na linha da cota ATIVA (linha não encontrada no DOM).")
+
+            remover_loading(driver)
+            logging.info("Página da cota carregada. Verificando status (snapshot único do Extrato)...")
+            extrato = _aguardar_snapshot(
+                driver, ler_snapshot_extrato,
+                # O header da tela anterior pode estar na página por um instante; espera o do Extrato
+                lambda e: 'EXTRATO' in (e['header'] or '').upper() or e['cancelado'] or e['normal'],
+                timeout=5,
+            ) or {}
+            header_txt = (extrato.get('header') or '').upper()
+            if alvo_extrato and 'EXTRATO' not in header_txt and not extrato.get('normal'):
+                # A URL guardada não abriu o Extrato: o grupo volta para a busca individual e a
+                # cota é retentada (TimeoutException) por esse caminho
+                _CACHE_GRUPOS.desativar(cota_info['grupo'])
+                raise TimeoutException(f"Extrato não abriu pela URL da tabela do grupo {cota_info['grupo']}.")
+            if 'EXTRATO - CANCELADO' in header_txt or extrato.get('cancelado'):
                 return 'ERRO_BENIGNO', "Extrato da cota está cancelado."
-            if not find_element(driver, *ServopaLanceLocators.EXTRATO_HEADER_NORMAL, timeout=3):
+            if header_txt != 'EXTRATO' and not extrato.get('normal'):
+                logging.warning(f"Header de Extrato inesperado: '{header_txt}'.")
                 save_debug_artifacts(driver, os.path.join("Lances", consultor), f"ERRO-{cota_info['original'].replace(',','-')}-extrato")
                 return 'ERRO_CRITICO', "Página de Extrato não carregou como esperado."
-        # 3) Estado contemplado impede lance
-        if find_element(driver, *ServopaLanceLocators.LANCE_CONTEMPLADO_ERROR, timeout=3):
-            return 'ERRO_BENIGNO', "Cota já está contemplada."
+            # 3) Estado contemplado impede lance (lido no mesmo snapshot, com a página já pronta)
+            if extrato.get('contemplado'):
+                return 'ERRO_BENIGNO', "Cota já está contemplada."
         
-        logging.info("Abrindo a página de lances diretamente pela URL (go to)...")
-        try:
-            driver.get(SERVOPA_LANCES_URL)
-        except WebDriverException as nav_e:
-            logging.error(f"Falha ao navegar para a página de lances: {nav_e}")
-            return 'ERRO_CRITICO', f"Navegação para página de lances falhou: {nav_e}"
-
-        remover_loading(driver)
-        check_for_captcha(driver)
-        try:
-            # Aguarda indicadores principais da tela de lances
-            WebDriverWait(driver, 12).until(
-                EC.presence_of_element_located((By.CLASS_NAME, "tab-switcher"))
-            )
-            WebDriverWait(driver, 12).until(
-                EC.presence_of_element_located((By.ID, "btn_simular"))
-            )
-        except TimeoutException:
-            save_debug_artifacts(driver, os.path.join("Lances", consultor), f"ERRO-{cota_info['original'].replace(',','-')}-lances-load")
-            return 'ERRO_CRITICO', "Página de lances não carregou corretamente (tab-switcher ausente)."
-
-        if find_element(driver, *ServopaLanceLocators.LANCE_FIDELIDADE_TAB, timeout=2):
+        with rastreamento.span("pagina_lances"):
+            logging.info("Abrindo a página de lances diretamente pela URL (go to)...")
+            try:
+                driver.get(SERVOPA_LANCES_URL)
+            except WebDriverException as nav_e:
+                logging.error(f"Falha ao navegar para a página de lances: {nav_e}")
+                return 'ERRO_CRITICO', f"Navegação para página de lances falhou: {nav_e}"
+
+            remover_loading(driver)
+            check_for_captcha(driver)
+            # Aguarda indicadores principais da tela de lances e lê abas/tipo no mesmo snapshot
+            lances = _aguardar_snapshot(driver, ler_snapshot_lances, timeout=12)
+            if not lances:
+                save_debug_artifacts(driver, os.path.join("Lances", consultor), f"ERRO-{cota_info['original'].replace(',','-')}-lances-load")
+                return 'ERRO_CRITICO', "Página de lances não carregou corretamente (tab-switcher ausente)."
+
+        if lances['fidelidade']:
+            cota_info['tipo_lance'] = 'fidelidade'
             return 'ERRO_BENIGNO', "A cota possui Lance Fidelidade e não pode ser processada."
 
         # Detecta tipo pelo TAB ativo, evitando confundir campos ocultos
         logging.info("Determinando tipo de lance pelo tab ativo...")
-        tab_ativo = find_element(driver, *ServopaLanceLocators.LANCE_ACTIVE_TAB, timeout=6)
-        tipo_tab = (tab_ativo.text or tab_ativo.get_attribute('textContent') or '').strip().upper() if tab_ativo else ''
-        data_lance = tab_ativo.get_attribute('data-lance').upper() if (tab_ativo and tab_ativo.get_attribute('data-lance')) else ''
+        if not lances['tab_ativo_visivel']:
+            lances = _aguardar_snapshot(driver, ler_snapshot_lances, lambda l: l['tab_ativo_visivel'], timeout=6) or lances
+        tipo_tab = (lances['tab_ativo'] or '').upper()
+        data_lance = (lances['data_lance'] or '').upper()
 
         is_livre = (data_lance == 'L') or ('LIVRE' in tipo_tab)
+        cota_info['tipo_lance'] = 'L' if is_livre else 'F'
         if is_livre:
             logging.info("TAB ativo indica Lance Livre. Preenchendo percentual (40) e descontar carta (30)...")
             # Preencher Percentual (usar inputs VISÍVEIS)
@@ -502,84 +1262,88 @@ def run_automation_for_cota(driver, cota_info, consultor):
         else:
             logging.info("TAB ativo indica Lance Fixo. Prosseguindo sem preencher campos.")
         
-        logging.info("Simulando lance...")
-        simular_locators = [
-            ServopaLanceLocators.SIMULAR_BUTTON,
-            (By.XPATH, "//a[@id='btn_simular']"),
-            (By.XPATH, "//a[contains(normalize-space(.), 'Simular Lance')]")
-        ]
-        # Tenta clique robusto em 'Simular'
-        if not click_first_available(driver, simular_locators, timeout_each=10):
-            save_debug_artifacts(driver, os.path.join("Lances", consultor), f"ERRO-{cota_info['original'].replace(',','-')}-simular")
-            raise Exception("Falha ao acionar 'Simular Lance' (nenhum seletor funcionou).")
-
-        # Aguarda recarregamento ou mudanças após simular
-        time.sleep(0.5)
-        remover_loading(driver)
-        try:
-            # Espera por algum sinal de mudança de tela: presença de 'Registrar' ou do input de protocolo
-            WebDriverWait(driver, 12).until(
-                lambda d: find_element(d, *ServopaLanceLocators.REGISTRAR_LINK, timeout=1)
-                or find_element(d, *ServopaLanceLocators.REGISTRAR_BUTTON, timeout=1)
-                or find_element(d, *ServopaLanceLocators.PROTOCOLO_ANTERIOR_INPUT, timeout=1)
+        with rastreamento.span("simular"):
+            logging.info("Simulando lance...")
+            simular_locators = [
+                ServopaLanceLocators.SIMULAR_BUTTON,
+                (By.XPATH, "//a[@id='btn_simular']"),
+                (By.XPATH, "//a[contains(normalize-space(.), 'Simular Lance')]")
+            ]
+            # Tenta clique robusto em 'Simular'
+            if not click_first_available(driver, simular_locators, timeout=10):
+                save_debug_artifacts(driver, os.path.join("Lances", consultor), f"ERRO-{cota_info['original'].replace(',','-')}-simular")
+                raise Exception("Falha ao acionar 'Simular Lance' (nenhum seletor funcionou).")
+
+            # Aguarda recarregamento ou mudanças após simular
+            remover_loading(driver)
+            # Tenta múltiplos seletores para maior robustez
+            registrar_locators = [
+                ServopaLanceLocators.REGISTRAR_BUTTON,
+                ServopaLanceLocators.REGISTRAR_LINK,
+                ServopaLanceLocators.REGISTRAR_ABSOLUTE,
+            ]
+            # Espera por algum sinal de mudança de tela: 'Registrar' ou o input de protocolo, o que vier primeiro
+            sinal, _ = aguardar_primeiro_disponivel(
+                driver,
+                [ServopaLanceLocators.PROTOCOLO_ANTERIOR_INPUT] + registrar_locators,
+                timeout=12,
+                condicao=EC.visibility_of_element_located,
             )
-        except Exception:
-            logging.info("Após 'Simular', sinais de mudança não apareceram a tempo; prosseguindo com verificações padrão.")
-        if find_element(driver, *ServopaLanceLocators.PROTOCOLO_ANTERIOR_INPUT, timeout=3):
-            return 'ERRO_BENIGNO', "Lance já realizado (protocolo anterior encontrado)."
-        
-        logging.info("Registrando lance e aguardando download...")
-        # Tenta múltiplos seletores para maior robustez
-        registrar_locators = [
-            ServopaLanceLocators.REGISTRAR_BUTTON,
-            ServopaLanceLocators.REGISTRAR_LINK,
-            ServopaLanceLocators.REGISTRAR_ABSOLUTE,
-        ]
-        # Aguarda um curto período para o botão/ancora ficar habilitado após a simulação
-        try:
-            WebDriverWait(driver, 8).until(lambda d: any(
-                WebDriverWait(d, 1).until(EC.element_to_be_clickable(loc),)
-                for loc in registrar_locators
-            ))
-        except Exception:
-            logging.info("Registrar ainda não clicável após simulação; tentaremos mesmo assim com fallbacks.")
-        if not click_first_available(driver, registrar_locators, timeout_each=8):
-            save_debug_artifacts(driver, os.path.join("Lances", consultor), f"ERRO-{cota_info['original'].replace(',','-')}-registrar")
-            raise Exception("Falha ao acionar o comando 'Registrar' (nenhum seletor funcionou).")
-
-        # Prioriza velocidade: tenta detectar PDF rapidamente; se não, checa modal; se não, espera completo
-        quick_pdf = aguardar_pdf_aparecer(DOWNLOAD_DIR, timeout=4)
-        if not quick_pdf:
-            # Modal de bloqueio de assembleia (erro esperado)
-            try:
-                WebDriverWait(driver, 3).until(EC.presence_of_element_located(ServopaLanceLocators.MODAL_CONTAINER))
-                modal_text_el = find_element(driver, *ServopaLanceLocators.MODAL_TEXT, timeout=2)
-                modal_text = (modal_text_el.text if modal_text_el else '').strip()
-                logging.info(f"Modal detectado após Registrar. Mensagem: {modal_text}")
-                # Fecha o modal
+            if sinal is None:
+                logging.info("Após 'Simular', sinais de mudança não apareceram a tempo; prosseguindo com verificações padrão.")
+            # O protocolo anterior tem prioridade mesmo que o Registrar também esteja na tela. Se o
+            # Registrar venceu a disputa, o input de protocolo ainda pode surgir logo depois: espera a
+            # página assentar e dá a ele uma janela curta antes de liberar o clique (evita lance duplicado).
+            if sinal != ServopaLanceLocators.PROTOCOLO_ANTERIOR_INPUT:
+                aguardar_pagina_pronta(driver, timeout=3)
                 try:
-                    ok_clicked = click_first_available(driver, [
-                        ServopaLanceLocators.MODAL_OK_BUTTON,
-                        ServopaLanceLocators.MODAL_OK_BUTTON_BY_TEXT
-                    ], timeout_each=2)
-                    if not ok_clicked:
-                        logging.info("Não foi possível clicar no OK do modal via seletores padrão.")
-                except Exception:
+                    WebDriverWait(driver, ESPERA_PROTOCOLO_ANTERIOR, poll_frequency=0.1).until(
+                        EC.visibility_of_element_located(ServopaLanceLocators.PROTOCOLO_ANTERIOR_INPUT)
+                    )
+                    sinal = ServopaLanceLocators.PROTOCOLO_ANTERIOR_INPUT
+                except TimeoutException:
                     pass
-                return 'ERRO_BENIGNO', f"Bloqueio de assembleia / modal após Registrar: {modal_text}"
-            except TimeoutException:
+            if sinal == ServopaLanceLocators.PROTOCOLO_ANTERIOR_INPUT:
+                return 'ERRO_BENIGNO', "Lance já realizado (protocolo anterior encontrado)."
+        
+        with rastreamento.span("registrar"):
+            logging.info("Registrando lance e aguardando download...")
+            # Tudo o que já estava na pasta antes do Registrar pertence a outra cota e nunca é reivindicado
+            arquivos_anteriores = set(os.listdir(download_dir))
+            if not click_first_available(driver, registrar_locators, timeout=8):
+                save_debug_artifacts(driver, os.path.join("Lances", consultor), f"ERRO-{cota_info['original'].replace(',','-')}-registrar")
+                raise Exception("Falha ao acionar o comando 'Registrar' (nenhum seletor funcionou).")
+            # Daqui em diante o lance pode ter sido registrado: a cota não é mais retentada
+            cota_info['registrado'] = True
+
+        # Um único observador: PDF na pasta (sucesso) ou modal de bloqueio de assembleia (erro esperado)
+        resultado, valor = aguardar_resultado_registro(driver, download_dir, ignorar=arquivos_anteriores)
+        if resultado == 'modal':
+            modal_text = valor
+            logging.info(f"Modal detectado após Registrar. Mensagem: {modal_text}")
+            # Fecha o modal
+            try:
+                ok_clicked = click_first_available(driver, [
+                    ServopaLanceLocators.MODAL_OK_BUTTON,
+                    ServopaLanceLocators.MODAL_OK_BUTTON_BY_TEXT
+                ], timeout=2)
+                if not ok_clicked:
+                    logging.info("Não foi possível clicar no OK do modal via seletores padrão.")
+            except Exception:
                 pass
-
-        # Se quick_pdf apareceu ou não houve modal, aguarda a conclusão normal do download
-        pdf_filename = aguardar_download_concluir(DOWNLOAD_DIR)
-        nome_cliente = find_element(driver, *ServopaLanceLocators.NOME_CLIENTE_TEXT).text.strip()
-        nome_cliente_sanitizado = sanitizar_nome_arquivo(nome_cliente)
-        novo_nome = f"LANCE- {nome_cliente_sanitizado} {grupo}.{cota}-{digito}.pdf"
-        caminho_destino = os.path.join("Lances", consultor, novo_nome)
-        shutil.move(os.path.join(DOWNLOAD_DIR, pdf_filename), caminho_destino)
-        logging.info(f"PDF salvo como: {caminho_destino}")
+            return 'ERRO_BENIGNO', f"Bloqueio de assembleia / modal após Registrar: {modal_text}"
+
+        pdf_filename = valor
+        nome_cliente = ler_texto_visivel(driver, *ServopaLanceLocators.NOME_CLIENTE_TEXT)
+        if not nome_cliente:
+            raise Exception("Nome do consorciado não ficou visível na página após o download.")
+        cota_info['nome_cliente'] = nome_cliente
+        _salvar_pdf_lance(download_dir, pdf_filename, nome_cliente, cota_info, consultor)
         return 'SUCESSO', "Lance registrado e PDF salvo com sucesso."
     except Exception as e:
+        if _sessao_perdida(e):
+            # O navegador morreu: quem trata é o worker (recria a sessão e devolve a cota à fila)
+            raise
         error_message = f"{type(e).__name__}: {e}"
         logging.error(f"Erro inesperado no fluxo da cota {cota_info['original']}: {error_message}", exc_info=True)
         save_debug_artifacts(driver, os.path.join("Lances", consultor), f"ERRO-{cota_info['original'].replace(',','-')}")
@@ -615,6 +1379,8 @@ def _classificar_benigno(mensagem: str) -> str:
         return 'Cota Não Existe'
     if 'nenhuma cota com status' in m or 'não ativa' in m:
         return 'Cota Não Ativa'
+    if 'contemplada' in m:
+        return 'Cota Contemplada'
     if 'protocolo anterior' in m:
         return 'Requer Protocolo'
     if 'fidelidade' in m:
@@ -687,31 +1453,319 @@ def _escrever_relatorio_erros(consultor: str, linhas_invalidas_idx, buckets_beni
     except Exception as e:
         logging.error(f"Falha ao gravar relatório de erros em '{arquivo_saida}': {e}")
 
-def executar_verificacao_nomes(consultor):
-    """Ponto de entrada para a verificação de nomes de arquivos a partir da GUI."""
+def executar_verificacao_nomes(consultor, reconstruir_cache=False):
+    """Ponto de entrada para a verificação de nomes de arquivos a partir da GUI.
+
+    reconstruir_cache: descarta o cache de extração da pasta e relê todos os PDFs.
+    """
     if not consultor:
         logging.error("Nome do consultor não fornecido para verificação.")
         return None
     logging.info(f"Disparando verificação de nomes para o consultor: {consultor}")
     consultor_path = os.path.join("Lances", consultor)
-    return verificar_e_corrigir_nomes_pdf(consultor_path)
+    return verificar_e_corrigir_nomes_pdf(
+        consultor_path, processos=PROCESSOS_PDF, usar_cache=CACHE_EXTRACAO_PDF,
+        reconstruir_cache=reconstruir_cache, verificar_conteudo=CACHE_EXTRACAO_HASH,
+    )
+
+
+def _iniciar_sessao(stop_flag, download_dir=None, max_tentativas_login=3, arquivo_cookies=None, copiar_perfil=False):
+    """Abre um navegador e realiza o login, com retentativas. Retorna o driver logado ou None.
+
+    arquivo_cookies: sessão salva a reaproveitar (ver `login`).
+    copiar_perfil: repassado a `get_driver`.
+    """
+    driver = None
+    for tentativa in range(1, max_tentativas_login + 1):
+        if stop_flag.is_set():
+            logging.warning("Parada solicitada pelo usuário antes de iniciar o login.")
+            return None
+
+        try:
+            logging.info(f"--- Tentativa de Login #{tentativa}/{max_tentativas_login} ---")
+            driver = get_driver(download_dir, copiar_perfil=copiar_perfil)
+            login(driver, arquivo_cookies)
+            logging.info("Login bem-sucedido. Prosseguindo com a automação.")
+            return driver
+        except InvalidCredentialsException as e:
+            logging.warning(f"Credenciais inválidas (tentativa {tentativa}/{max_tentativas_login}). Repetindo login...")
+            if driver:
+                try:
+                    driver.quit()
+                except Exception:
+                    pass
+            time.sleep(2)
+        except CaptchaDetectedException as e:
+            logging.warning(f"{e} - Tentativa {tentativa} falhou. Reiniciando o navegador em 5 segundos...")
+            if driver:
+                driver.quit()
+            time.sleep(5)
+        except Exception as e:
+            logging.critical(f"Erro fatal inesperado durante a configuração ou login: {e}", exc_info=True)
+            if driver:
+                driver.quit()
+            # Interrompe as tentativas em caso de erro grave não relacionado a CAPTCHA
+            break
+    return None
+
+def _retornar_pagina_inicial(driver):
+    """Volta a um estado limpo após um erro: a tela de busca (caminho rápido) ou a página inicial."""
+    if NAVEGACAO_DIRETA:
+        try:
+            ir_para_busca(driver)
+            logging.info("Retorno à tela de busca realizado com sucesso.")
+            return
+        except InvalidSessionIdException:
+            raise
+        except Exception as nav_e:
+            logging.warning(f"Retorno rápido à tela de busca falhou: {nav_e}. Tentando pela página inicial...")
+    try:
+        click_element(driver, *ServopaLocators.HOME_LOGO_LINK)
+        remover_loading(driver)
+        # Confirma que voltou para um estado conhecido
+        WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.XPATH, "//a[contains(., 'Ferramentas Admin')] ")))
+        logging.info("Retorno à página inicial realizado com sucesso.")
+    except Exception as nav_e:
+        logging.error(f"Falha crítica ao tentar retornar à página inicial: {nav_e}. A automação pode se tornar instável.")
+
+def _registrar_resultado(resultados, cota_info, status, mensagem):
+    """Contabiliza o resultado de uma cota no resumo e nos buckets compartilhados entre os navegadores."""
+    with resultados['lock']:
+        if status == 'SUCESSO':
+            resultados['summary']['sucesso'] += 1
+        elif status == 'ERRO_BENIGNO':
+            resultados['summary']['benigno'] += 1
+            categoria = _classificar_benigno(mensagem)
+            resultados['buckets_benignos'][categoria].append(cota_info['original'])
+        else:  # ERRO_CRITICO
+            resultados['summary']['critico'] += 1
+            categoria = _classificar_critico(mensagem)
+            resultados['buckets_criticos'][categoria].append(cota_info['original'])
+        if resultados.get('diario'):
+            resultados['diario'].registrar(cota_info, ESTADO_POR_STATUS[status], mensagem)
+    if resultados.get('cache_cotas') and status != 'ERRO_CRITICO':
+        try:
+            categoria = _classificar_benigno(mensagem) if status == 'ERRO_BENIGNO' else 'Sucesso'
+            resultados['cache_cotas'].registrar(cota_info, status, categoria, mensagem)
+        except sqlite3.Error as e:
+            logging.warning(f"Falha ao gravar a cota {cota_info['original']} no cache de cotas: {e}")
+
+def _sessao_perdida(erro):
+    """True se o erro indica que o navegador/geckodriver morreu e a sessão não serve mais."""
+    if isinstance(erro, (InvalidSessionIdException, ConnectionError, MaxRetryError)):
+        return True
+    if isinstance(erro, WebDriverException):
+        mensagem = (erro.msg or str(erro)).lower()
+        return any(trecho in mensagem for trecho in _MENSAGENS_SESSAO_PERDIDA)
+    return False
+
+def _encerrar_driver(driver):
+    """Fecha o navegador e descarta o estado associado à sessão."""
+    _ESTADO_NAVEGACAO.pop(driver.session_id, None)
+    servopa_http.descartar_sessao(driver)
+    try:
+        driver.quit()
+    except InvalidSessionIdException:
+        logging.warning("A sessão do driver já estava inválida ao tentar sair.")
+    except Exception:
+        pass
+
+def _planejar_retentativa(cota_info, mensagem):
+    """Decide se um ERRO_CRITICO volta para a fila.
 
+    Retorna (categoria, espera_em_segundos, novo_navegador) ou None quando a categoria não é
+    retentável, o limite dela em RETENTATIVAS_CRITICAS acabou ou o Registrar já foi enviado.
+    """
+    if cota_info.get('registrado'):
+        return None
+    categoria = _classificar_critico(mensagem)
+    feitas = cota_info.setdefault('retentativas', {})
+    if feitas.get(categoria, 0) >= RETENTATIVAS_CRITICAS.get(categoria, 0):
+        return None
+    feitas[categoria] = feitas.get(categoria, 0) + 1
+    total = sum(feitas.values())
+    espera = min(RETENTATIVA_ESPERA_MAX, RETENTATIVA_ESPERA_BASE * 2 ** (total - 1))
+    return categoria, espera, categoria in RETENTATIVA_NOVO_NAVEGADOR
+
+def _worker_navegador(indice, fila, consultor, stop_flag, resultados):
+    """Executa uma sessão de navegador que consome cotas da fila compartilhada até ela esvaziar.
+
+    Erros críticos transitórios (ver _planejar_retentativa) voltam para o fim da fila com
+    espera exponencial; só o resultado final da cota entra no resumo e no relatório.
+    Se o navegador morrer no meio de uma cota, ela volta para a fila e um navegador novo
+    é aberto (com novo login), até MAX_REINICIOS_NAVEGADOR vezes.
+    """
+    # Escalona os logins para não abrir todas as sessões no mesmo instante
+    espera = INTERVALO_LOGIN_NAVEGADORES * (indice - 1)
+    while espera > 0 and not stop_flag.is_set():
+        time.sleep(min(0.5, espera))
+        espera -= 0.5
+
+    download_dir = pasta_download_navegador(indice)
+    os.makedirs(download_dir, exist_ok=True)
+    recolher_downloads_orfaos(download_dir)
+    diario = resultados.get('diario')
+
+    driver = None
+    reinicios = 0
+    sessao_contada = False
+    cota_info = None  # cota obtida da fila e ainda sem resultado final
+    try:
+        while not stop_flag.is_set():
+            if driver is None:
+                driver = _iniciar_sessao(
+                    stop_flag, download_dir,
+                    arquivo_cookies=arquivo_cookies_navegador(indice),
+                    # Só o navegador 1, na primeira sessão, abre o perfil original: os demais o
+                    # encontrariam travado, e após uma queda o Firefox morto pode ainda segurar a trava
+                    copiar_perfil=indice > 1 or reinicios > 0,
+                )
+                if driver is None:
+                    logging.error(f"Navegador {indice} não conseguiu iniciar a sessão. Suas cotas ficam para os demais navegadores.")
+                    return
+                if not sessao_contada:
+                    sessao_contada = True
+                    with resultados['lock']:
+                        resultados['sessoes_iniciadas'] += 1
+
+            cota_info = fila.obter(stop_flag)
+            if cota_info is None:
+                break
 
-def main(consultor, cotas_input, stop_flag):
+            try:
+                if diario:
+                    diario.registrar(cota_info, 'em_andamento')
+                status, mensagem = run_automation_for_cota(driver, cota_info, consultor, download_dir)
+                logging.info(f"Resultado para {cota_info['original']}: {status} - {mensagem}")
+                retentativa = _planejar_retentativa(cota_info, mensagem) if status == 'ERRO_CRITICO' else None
+                if retentativa:
+                    categoria, espera, novo_navegador = retentativa
+                    logging.warning(
+                        f"Cota {cota_info['original']} volta para a fila em {espera:.0f}s "
+                        f"({categoria}, retentativa {cota_info['retentativas'][categoria]}/{RETENTATIVAS_CRITICAS[categoria]})."
+                    )
+                    with resultados['lock']:
+                        resultados['summary']['retentativas'] += 1
+                    if diario:
+                        diario.registrar(cota_info, 'fila', mensagem)
+                    fila.reagendar(cota_info, espera)
+                else:
+                    novo_navegador = False
+                    _registrar_resultado(resultados, cota_info, status, mensagem)
+                    fila.concluir()
+                sem_navegacao = cota_info.pop('sem_navegacao', False)
+                cota_info = None
+
+                if novo_navegador:
+                    logging.info(f"Navegador {indice} será recriado antes da próxima cota.")
+                    _encerrar_driver(driver)
+                    driver = None
+                elif status != 'SUCESSO' and not sem_navegacao:
+                    logging.warning(f"Status não foi SUCESSO ({status}). Retornando à página inicial para garantir um estado limpo.")
+                    _retornar_pagina_inicial(driver)
+            except Exception as e:
+                if not _sessao_perdida(e):
+                    raise
+                reinicios += 1
+                logging.error(f"Sessão do navegador {indice} perdida: {e}. Reinício {reinicios}/{MAX_REINICIOS_NAVEGADOR}.")
+                _encerrar_driver(driver)
+                driver = None
+                if cota_info is not None:
+                    cota_info['sessoes_perdidas'] = cota_info.get('sessoes_perdidas', 0) + 1
+                    if cota_info['sessoes_perdidas'] >= 2 or cota_info.get('registrado'):
+                        # A mesma cota derrubou o navegador duas vezes (ou o Registrar já foi enviado): não insiste
+                        _registrar_resultado(resultados, cota_info, 'ERRO_CRITICO', f"Sessão do navegador perdida: {e}")
+                        fila.concluir()
+                    else:
+                        logging.info(f"Cota {cota_info['original']} devolvida à fila.")
+                        if diario:
+                            diario.registrar(cota_info, 'fila')
+                        fila.devolver(cota_info)
+                    cota_info = None
+                if reinicios > MAX_REINICIOS_NAVEGADOR:
+                    logging.error(f"Navegador {indice} atingiu o limite de reinícios e será encerrado.")
+                    return
+        if stop_flag.is_set():
+            logging.info("Parada solicitada pelo usuário. Encerrando o processamento de cotas.")
+    except Exception as e:
+        logging.error(f"Erro crítico no navegador {indice}: {e}", exc_info=True)
+        if cota_info is not None:
+            # Resolve a cota para que os demais navegadores não esperem por ela
+            _registrar_resultado(resultados, cota_info, 'ERRO_CRITICO', f"{type(e).__name__}: {e}")
+            fila.concluir()
+    finally:
+        if driver is not None:
+            _encerrar_driver(driver)
+
+
+def _registrar_latencias(etapas):
+    """Escreve no log a tabela de latência por etapa (p50/p95 em segundos)."""
+    if not etapas:
+        return
+    logging.info("--- LATÊNCIA POR ETAPA (segundos) ---")
+    for nome, e in sorted(etapas.items(), key=lambda item: -item[1]['p50'] * item[1]['n']):
+        logging.info(f"{nome:<18} n={e['n']:<4} p50={e['p50']:.2f} p95={e['p95']:.2f} comandos WebDriver (média)={e['comandos']:.1f}")
+
+
+def _somar_organizador(summary, contadores):
+    """Soma ao resumo o que o organizador de PDFs arquivou, pôs em quarentena ou não conseguiu ler."""
+    summary['pdfs_renomeados'] += contadores['renomeado']
+    summary['pdfs_conflitos'] += contadores['conflito']
+    summary['pdfs_erros'] += contadores['erro']
+
+
+def indice_pdfs_consultor(consultor):
+    """Índice (IndicePdfsLance) dos PDFs de lance já salvos em Lances/<consultor>; vazio se a pasta não existe."""
+    try:
+        return IndicePdfsLance.da_pasta(os.path.join("Lances", consultor))
+    except FileNotFoundError:
+        return IndicePdfsLance()
+
+_INDICE_GLOBAL = None
+_INDICE_GLOBAL_LOCK = threading.Lock()
+
+def indice_global_lances():
+    """Índice global de lances do processo (criado na primeira chamada), ou None se desativado."""
+    global _INDICE_GLOBAL
+    if not INDICE_GLOBAL_LANCES:
+        return None
+    with _INDICE_GLOBAL_LOCK:
+        if _INDICE_GLOBAL is None:
+            _INDICE_GLOBAL = IndiceGlobalLances("Lances")
+        return _INDICE_GLOBAL
+
+def caminho_diario(consultor):
+    """Arquivo do diário de execução do consultor."""
+    return os.path.join("Lances", consultor, ARQUIVO_DIARIO)
+
+def execucao_interrompida(consultor):
+    """Execução interrompida do consultor que pode ser retomada (ver DiarioExecucao), ou None."""
+    if not DIARIO_EXECUCAO:
+        return None
+    return DiarioExecucao(caminho_diario(consultor)).execucao_interrompida()
+
+def main(consultor, cotas_input, stop_flag, num_navegadores=None, ignorar_cache_cotas=False):
       """
       Função principal que orquestra a automação com retentativas de login e relatório.
+
+      num_navegadores: quantidade de sessões paralelas (padrão: MAX_NAVEGADORES do .env).
+      ignorar_cache_cotas: processa também as cotas que o cache de cotas daria como inelegíveis.
       """
       summary = {
           "total_cotas": 0, "cotas_puladas": 0, "cotas_a_processar": 0,
-          "sucesso": 0, "benigno": 0, "critico": 0
+          "sucesso": 0, "benigno": 0, "critico": 0,
+          "cotas_em_outra_pasta": 0, "cotas_retomadas": 0, "cotas_cache": 0, "pendentes": 0, "retentativas": 0,
+          "pdfs_renomeados": 0, "pdfs_conflitos": 0, "pdfs_erros": 0
       }
 
       # Garante que a pasta do consultor e de downloads existam
       os.makedirs(os.path.join("Lances", consultor), exist_ok=True)
       os.makedirs(DOWNLOAD_DIR, exist_ok=True)
+      _CACHE_GRUPOS.limpar()
 
       cotas, linhas_invalidas, linhas_invalidas_idx = parse_lances_from_string(cotas_input)
       summary['total_cotas'] = len(cotas)
+      _CACHE_GRUPOS.registrar_cotas(cotas)
       if not cotas:
           logging.error("Nenhuma cota válida para processar.")
           # Flush aqui se não houver cotas para processar
@@ -723,154 +1777,238 @@ def main(consultor, cotas_input, stop_flag):
       consultor_path = os.path.join("Lances", consultor)
       cotas_a_processar = []
       try:
-          existing_pdfs = [f for f in os.listdir(consultor_path) if f.lower().endswith('.pdf') and f.upper().startswith("LANCE")]
-          logging.info(f"Encontrados {len(existing_pdfs)} PDFs na pasta do consultor.")
-          # Cache para evitar parsing repetido do mesmo nome de arquivo
-          filename_cota_cache = {name: parse_cota_from_filename(name) for name in existing_pdfs}
+          # Índice por cota normalizada: uma varredura da pasta e consulta O(1) por cota
+          indice_pdfs = IndicePdfsLance.da_pasta(consultor_path)
+          logging.info(f"Encontrados {indice_pdfs.total_pdfs} PDFs na pasta do consultor.")
       except FileNotFoundError:
-          existing_pdfs = []
-          filename_cota_cache = {}
+          indice_pdfs = IndicePdfsLance()
           logging.warning(f"Pasta do consultor '{consultor_path}' não encontrada. Todas as cotas serão processadas como novas.")
 
+      # Lances de outros consultores: o índice global só varre as pastas que mudaram
+      indice_global = indice_global_lances()
+      if indice_global:
+          try:
+              indice_global.atualizar()
+          except OSError as e:
+              logging.warning(f"Índice global de lances indisponível ({e}); só a pasta do consultor será conferida.")
+              indice_global = None
+
       for cota_info in cotas:
-          cota_tuple = (cota_info['grupo'], cota_info['cota'], cota_info['digito'])
-          cota_encontrada = False
-          for pdf_name, pdf_cota_tuple in filename_cota_cache.items():
-              if pdf_cota_tuple and cota_tuple == pdf_cota_tuple:
-                  logging.info(f"[PULANDO] Cota {cota_info['original']} já existe no arquivo: {pdf_name}")
-                  summary['cotas_puladas'] += 1
-                  cota_encontrada = True
-                  break
-          if not cota_encontrada:
+          pdfs_da_cota = indice_pdfs.arquivos(cota_info['grupo'], cota_info['cota'], cota_info['digito'])
+          em_outras_pastas = []
+          if not pdfs_da_cota and indice_global:
+              em_outras_pastas = [
+                  (outro, nome) for outro, nome in
+                  indice_global.localizar(cota_info['grupo'], cota_info['cota'], cota_info['digito'])
+                  if outro != consultor
+              ]
+          if pdfs_da_cota:
+              logging.info(f"[PULANDO] Cota {cota_info['original']} já existe no arquivo: {pdfs_da_cota[0]}")
+              summary['cotas_puladas'] += 1
+          elif em_outras_pastas:
+              outro, nome = em_outras_pastas[0]
+              logging.warning(f"[PULANDO] Cota {cota_info['original']} já tem lance na pasta de outro consultor: "
+                              f"{indice_global.caminho(outro, nome)}")
+              summary['cotas_puladas'] += 1
+              summary['cotas_em_outra_pasta'] += 1
+          else:
               logging.info(f"[OK] Cota {cota_info['original']} é nova e será processada.")
               cotas_a_processar.append(cota_info)
 
+      # Buckets de erros para o relatório final
+      buckets_benignos = defaultdict(list)
+      buckets_criticos = defaultdict(list)
+      resultados = {
+          'lock': threading.Lock(),
+          'summary': summary,
+          'buckets_benignos': buckets_benignos,
+          'buckets_criticos': buckets_criticos,
+          'sessoes_iniciadas': 0,
+          'diario': None,
+          'cache_cotas': None,
+      }
+
+      # --- RETOMADA DE EXECUÇÃO INTERROMPIDA ---
+      # Cotas que já terminaram em sucesso/benigno na execução anterior não são refeitas;
+      # seus resultados entram no resumo e no relatório desta execução.
+      diario = DiarioExecucao(caminho_diario(consultor)) if DIARIO_EXECUCAO else None
+      anterior = diario.execucao_interrompida() if diario else None
+      if anterior:
+          logging.info(f"Retomando a execução interrompida iniciada em {datetime.fromtimestamp(anterior['inicio']):%d/%m/%Y %H:%M:%S}.")
+          pendentes_retomada = []
+          for cota_info in cotas_a_processar:
+              estado, mensagem = anterior['estados'].get(chave_cota(cota_info), (None, None))
+              if estado not in ESTADOS_CONCLUIDOS:
+                  pendentes_retomada.append(cota_info)
+                  continue
+              logging.info(f"[RETOMADA] Cota {cota_info['original']} já concluída ({estado}) na execução interrompida.")
+              summary['cotas_retomadas'] += 1
+              if estado == 'sucesso':
+                  summary['sucesso'] += 1
+              else:
+                  summary['benigno'] += 1
+                  buckets_benignos[_classificar_benigno(mensagem or '')].append(cota_info['original'])
+          cotas_a_processar = pendentes_retomada
+
+      # --- COTAS SABIDAMENTE INELEGÍVEIS (cache de cotas) ---
+      # Cancelada, contemplada, Fidelidade ou não ATIVA numa execução recente: entra no
+      # relatório com a categoria observada, sem abrir o navegador.
+      cache_cotas = None
+      if CACHE_COTAS:
+          try:
+              cache_cotas = CacheCotas(ARQUIVO_CACHE_COTAS, CACHE_COTAS_VALIDADE, DIA_ASSEMBLEIA)
+          except sqlite3.Error as e:
+              logging.warning(f"Cache de cotas '{ARQUIVO_CACHE_COTAS}' indisponível: {e}")
+      if cache_cotas and ignorar_cache_cotas:
+          logging.info("Cache de cotas ignorado nesta execução: todas as cotas serão processadas.")
+      elif cache_cotas:
+          elegiveis = []
+          for cota_info in cotas_a_processar:
+              registro = cache_cotas.conhecida_inelegivel(cota_info)
+              if not registro:
+                  elegiveis.append(cota_info)
+                  continue
+              logging.info(f"[CACHE] Cota {cota_info['original']} pulada: {registro['categoria']} "
+                           f"(observado em {datetime.fromtimestamp(registro['observado_em']):%d/%m/%Y %H:%M}).")
+              summary['cotas_cache'] += 1
+              summary['benigno'] += 1
+              buckets_benignos[registro['categoria']].append(cota_info['original'])
+          cotas_a_processar = elegiveis
+      resultados['cache_cotas'] = cache_cotas
+
       summary['cotas_a_processar'] = len(cotas_a_processar)
       logging.info(f"--- PRÉ-VERIFICAÇÃO FINALIZADA ---")
-      logging.info(f"Resumo: {summary['total_cotas']} recebidas, {summary['cotas_puladas']} já existentes, {len(cotas_a_processar)} a processar.")
+      logging.info(f"Resumo: {summary['total_cotas']} recebidas, {summary['cotas_puladas']} já existentes "
+                   f"({summary['cotas_em_outra_pasta']} em pastas de outros consultores), "
+                   f"{summary['cotas_retomadas']} retomadas, {summary['cotas_cache']} inelegíveis pelo cache, "
+                   f"{len(cotas_a_processar)} a processar.")
       # Flush aqui após o resumo da pré-verificação
       logging.getLogger().handlers[2].flush() # Força o flush dos logs para a GUI
 
       if not cotas_a_processar:
           logging.info("Nenhuma nova cota para processar após a pré-verificação.")
+          if anterior:
+              # Tudo o que faltava já estava concluído: a execução interrompida está encerrada
+              diario.iniciar(cotas_input, [], anterior)
+              diario.finalizar()
+              diario.fechar()
+          if cache_cotas:
+              cache_cotas.fechar()
           # Este flush é redundante se o de cima funcionar, mas inofensivo.
           logging.getLogger().handlers[2].flush() # Força o flush dos logs para a GUI
           return summary
 
-      driver = None
-      # Buckets de erros para o relatório final
-      buckets_benignos = defaultdict(list)
-      buckets_criticos = defaultdict(list)
-      login_sucesso = False
-      max_tentativas_login = 3
+      if diario:
+          diario.iniciar(cotas_input, cotas_a_processar, anterior)
+          resultados['diario'] = diario
 
-      for tentativa in range(1, max_tentativas_login + 1):
-          if stop_flag.is_set():
-              logging.warning("Parada solicitada pelo usuário antes de iniciar o login.")
-              return summary
+      fila = FilaCotas(cotas_a_processar) # Enfileira apenas a lista filtrada
 
-          try:
-              logging.info(f"--- Tentativa de Login #{tentativa}/{max_tentativas_login} ---")
-              driver = get_driver()
-              login(driver)
-              login_sucesso = True
-              logging.info("Login bem-sucedido. Prosseguindo com a automação.")
-              break  # Sai do loop de tentativas se o login for bem-sucedido
-          except InvalidCredentialsException as e:
-              logging.warning(f"Credenciais inválidas (tentativa {tentativa}/{max_tentativas_login}). Repetindo login...")
-              if driver:
-                  try:
-                      driver.quit()
-                  except Exception:
-                      pass
-              time.sleep(2)
-          except CaptchaDetectedException as e:
-              logging.warning(f"{e} - Tentativa {tentativa} falhou. Reiniciando o navegador em 5 segundos...")
-              if driver:
-                  driver.quit()
-              time.sleep(5)
-          except Exception as e:
-              logging.critical(f"Erro fatal inesperado durante a configuração ou login: {e}", exc_info=True)
-              if driver:
-                  driver.quit()
-              # Interrompe as tentativas em caso de erro grave não relacionado a CAPTCHA
-              break
-
-      if not login_sucesso:
-          logging.critical("="*60)
-          logging.critical("ERRO CRÍTICO: A automação não pôde iniciar após múltiplas tentativas.")
-          logging.critical("Um CAPTCHA pode estar bloqueando o acesso ou ocorreu um erro de configuração.")
-          logging.critical("Por favor, verifique sua conexão e as configurações no arquivo .env.")
-          logging.critical("Se o problema for CAPTCHA, resolva-o manualmente no perfil do Firefox.")
-          logging.critical("="*60)
-          summary['critico'] = len(cotas_a_processar) # Marca todas como falha se o login falhar
-          return summary
+      num_navegadores = max(1, min(num_navegadores or MAX_NAVEGADORES, len(cotas_a_processar)))
+      logging.info(f"Iniciando {num_navegadores} navegador(es) para processar {len(cotas_a_processar)} cota(s).")
 
       # Lógica de automação principal
+      organizador = None
       try:
-          for cota_info in cotas_a_processar: # Iterar sobre a lista filtrada
+          if RASTREAMENTO:
+              rastreamento.iniciar_execucao(TRACE_DIR, consultor)
+          if ORGANIZADOR_PDFS:
+              organizador = OrganizadorPdfs(consultor_path, usar_cache=CACHE_EXTRACAO_PDF,
+                                            verificar_conteudo=CACHE_EXTRACAO_HASH)
+              if not organizador.iniciar():
+                  organizador = None
+          workers = [
+              threading.Thread(
+                  target=_worker_navegador,
+                  name=f"Navegador-{i}",
+                  args=(i, fila, consultor, stop_flag, resultados),
+                  daemon=True,
+              )
+              for i in range(1, num_navegadores + 1)
+          ]
+          for worker in workers:
+              worker.start()
+          for worker in workers:
+              worker.join()
+
+          if resultados['sessoes_iniciadas'] == 0:
               if stop_flag.is_set():
-                  logging.info("Parada solicitada pelo usuário. Encerrando o processamento de cotas.")
-                  break
-
-              status, mensagem = run_automation_for_cota(driver, cota_info, consultor)
-              logging.info(f"Resultado para {cota_info['original']}: {status} - {mensagem}")
+                  summary['pendentes'] = len(cotas_a_processar)
+                  return summary
+              logging.critical("="*60)
+              logging.critical("ERRO CRÍTICO: A automação não pôde iniciar após múltiplas tentativas.")
+              logging.critical("Um CAPTCHA pode estar bloqueando o acesso ou ocorreu um erro de configuração.")
+              logging.critical("Por favor, verifique sua conexão e as configurações no arquivo .env.")
+              logging.critical("Se o problema for CAPTCHA, resolva-o manualmente no perfil do Firefox.")
+              logging.critical("="*60)
+              summary['pendentes'] = len(cotas_a_processar) # Ficam no diário para a próxima execução
+              return summary
 
-              if status == 'SUCESSO':
-                  summary['sucesso'] += 1
-              elif status == 'ERRO_BENIGNO':
-                  summary['benigno'] += 1
-                  categoria = _classificar_benigno(mensagem)
-                  buckets_benignos[categoria].append(cota_info['original'])
-              else:  # ERRO_CRITICO
-                  summary['critico'] += 1
-                  categoria = _classificar_critico(mensagem)
-                  buckets_criticos[categoria].append(cota_info['original'])
-
-              if status != 'SUCESSO':
-                  logging.warning(f"Status não foi SUCESSO ({status}). Retornando à página inicial para garantir um estado limpo.")
-                  try:
-                      click_element(driver, *ServopaLocators.HOME_LOGO_LINK)
-                      remover_loading(driver)
-                      # Confirma que voltou para um estado conhecido
-                      WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.XPATH, "//a[contains(., 'Ferramentas Admin')] ")))
-                      logging.info("Retorno à página inicial realizado com sucesso.")
-                  except Exception as nav_e:
-                      logging.error(f"Falha crítica ao tentar retornar à página inicial: {nav_e}. A automação pode se tornar instável.")
-
-          # Verificação automática final de nomes
+          # Cotas que sobraram na fila: parada do usuário ou todos os navegadores caíram.
+          # Não são erros das cotas; ficam pendentes no diário para retomar na próxima execução.
+          if fila.pendentes():
+              summary['pendentes'] = fila.pendentes()
+              if not stop_flag.is_set():
+                  logging.error(f"Todos os navegadores foram encerrados com {summary['pendentes']} cota(s) ainda na fila.")
+              if diario:
+                  logging.warning(f"{summary['pendentes']} cota(s) pendente(s) ficam no diário e serão retomadas na próxima execução.")
+
+          if BUSCA_POR_GRUPO:
+              logging.info(f"Busca por grupo: {_CACHE_GRUPOS.buscas} busca(s) de grupo, "
+                           f"{_CACHE_GRUPOS.acertos} cota(s) atendida(s) pela tabela em cache.")
+
+          # Verificação automática final de nomes (com o organizador ativo, só confere o cache)
+          if organizador:
+              _somar_organizador(summary, organizador.parar())
+              organizador = None
           logging.info("--- VERIFICAÇÃO AUTOMÁTICA DE NOMES DE ARQUIVOS ---")
-          verificar_e_corrigir_nomes_pdf(consultor_path) # Usar o consultor_path definido anteriormente
+          relatorio_nomes = verificar_e_corrigir_nomes_pdf(consultor_path, processos=PROCESSOS_PDF, usar_cache=CACHE_EXTRACAO_PDF,
+                                                           verificar_conteudo=CACHE_EXTRACAO_HASH) # Usar o consultor_path definido anteriormente
+          # Conflitos que o organizador pôs em quarentena e a verificação resolveu entram com sinal negativo
+          summary['pdfs_renomeados'] += relatorio_nomes['renamed']
+          summary['pdfs_conflitos'] += relatorio_nomes['conflicts']
+          summary['pdfs_erros'] += relatorio_nomes['errors']
 
-      except InvalidSessionIdException as e:
-          logging.error(f"Sessão do navegador perdida: {e}. A automação será encerrada.")
-          remaining_cotas = len(cotas_a_processar) - (summary['sucesso'] + summary['benigno'] + summary['critico'])
-          summary['critico'] += remaining_cotas
       except Exception as e:
           logging.error(f"Erro crítico na execução principal: {e}", exc_info=True)
-          remaining_cotas = len(cotas_a_processar) - (summary['sucesso'] + summary['benigno'] + summary['critico'])
-          summary['critico'] += remaining_cotas
+          processadas = (summary['sucesso'] + summary['benigno'] + summary['critico']
+                         - summary['cotas_retomadas'] - summary['cotas_cache'])
+          summary['pendentes'] = len(cotas_a_processar) - processadas
       finally:
-          if driver:
+          if organizador:
+              _somar_organizador(summary, organizador.parar())
+          if diario:
               try:
-                  driver.quit()
-              except InvalidSessionIdException:
-                  logging.warning("A sessão do driver já estava inválida ao tentar sair.")
-                  pass
+                  # Mesmo com parada solicitada: se nada ficou pendente, não há o que retomar
+                  if summary['pendentes'] == 0:
+                      diario.finalizar()
+              except Exception as e:
+                  logging.error(f"Falha ao finalizar o diário de execução: {e}")
+              finally:
+                  diario.fechar()
+          if cache_cotas:
+              cache_cotas.fechar()
           # Escreve o relatório final de erros
-          try:
-              _escrever_relatorio_erros(
-                  consultor=consultor,
-                  linhas_invalidas_idx=linhas_invalidas_idx,
-                  buckets_benignos=buckets_benignos,
-                  buckets_criticos=buckets_criticos,
-                  resumo_sucesso=summary['total_cotas'],
-                  arquivo_saida=ERROS_FILE,
-              )
-          except Exception as e:
-              logging.error(f"Falha ao gerar o relatório de erros: {e}")
+          if resultados['sessoes_iniciadas'] > 0:
+              try:
+                  _escrever_relatorio_erros(
+                      consultor=consultor,
+                      linhas_invalidas_idx=linhas_invalidas_idx,
+                      buckets_benignos=buckets_benignos,
+                      buckets_criticos=buckets_criticos,
+                      resumo_sucesso=summary['total_cotas'],
+                      arquivo_saida=ERROS_FILE,
+                  )
+              except Exception as e:
+                  logging.error(f"Falha ao gerar o relatório de erros: {e}")
+          if RASTREAMENTO:
+              try:
+                  summary['etapas'] = rastreamento.finalizar_execucao()
+                  _registrar_latencias(summary['etapas'])
+              except Exception as e:
+                  logging.error(f"Falha ao gravar o rastreamento de etapas: {e}")
           logging.info(f"Automação finalizada. Retornando resumo: {summary}")
-          return summary
+      return summary
 
 if __name__ == "__main__":
     # Exemplo de como testar a função main diretamente
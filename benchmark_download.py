@@ -0,0 +1,80 @@
+import os
+import sys
+import time
+import shutil
+import logging
+import tempfile
+import subprocess
+import statistics
+
+"""
+Benchmark da detecção de download concluído: polling (versão original) x eventos (inotify).
+
+Um processo "escritor" simula o Firefox: cria o 'arquivo.pdf' vazio, grava o conteúdo em
+'arquivo.pdf.part' em blocos e, ao final, renomeia o '.part' para '.pdf'. Medimos quanto
+tempo cada estratégia leva, a partir do rename, para devolver o nome do arquivo.
+
+Uso: python benchmark_download.py [repeticoes]
+"""
+
+# Variáveis mínimas para importar o módulo de automação fora da GUI
+os.environ.setdefault("DOWNLOAD_DIR", tempfile.gettempdir())
+
+import automacao_servopa_corrigido as automacao
+from monitor_downloads import inotify_disponivel
+
+
+def escritor(pasta, nome, atraso, blocos, intervalo):
+    """Simula o Firefox baixando um PDF. Imprime o instante (time.time) do rename final."""
+    time.sleep(atraso)
+    final = os.path.join(pasta, nome)
+    parcial = final + ".part"
+    open(final, "wb").close()
+    with open(parcial, "wb") as f:
+        f.write(b"%PDF-1.4\n")
+        for _ in range(blocos):
+            f.write(os.urandom(16 * 1024))
+            f.flush()
+            time.sleep(intervalo)
+    os.replace(parcial, final)
+    print(f"{time.time():.6f}", flush=True)
+
+
+def medir(estrategia, repeticoes):
+    latencias = []
+    for i in range(repeticoes):
+        pasta = tempfile.mkdtemp(prefix="bench-download-")
+        try:
+            proc = subprocess.Popen(
+                [sys.executable, __file__, "--escritor", pasta, f"lance-{i}.pdf", "0.3", "5", "0.05"],
+                stdout=subprocess.PIPE, text=True,
+            )
+            nome = estrategia(pasta, timeout=30, ignorar=())
+            retorno = time.time()
+            instante_rename = float(proc.communicate()[0].strip())
+            assert nome == f"lance-{i}.pdf", nome
+            latencias.append(retorno - instante_rename)
+        finally:
+            shutil.rmtree(pasta, ignore_errors=True)
+    return latencias
+
+
+def resumir(nome, latencias):
+    print(f"{nome:<10} n={len(latencias):<3} média={statistics.mean(latencias):7.3f}s  "
+          f"mediana={statistics.median(latencias):7.3f}s  máx={max(latencias):7.3f}s")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--escritor":
+        _, _, pasta, nome, atraso, blocos, intervalo = sys.argv
+        escritor(pasta, nome, float(atraso), int(blocos), float(intervalo))
+        sys.exit(0)
+
+    logging.disable(logging.CRITICAL)
+    repeticoes = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    print(f"Latência entre o rename '.part' -> '.pdf' e o retorno da função ({repeticoes} repetições):")
+    resumir("polling", medir(automacao._aguardar_download_polling, repeticoes))
+    if inotify_disponivel():
+        resumir("inotify", medir(automacao._aguardar_download_eventos, repeticoes))
+    else:
+        print("inotify indisponível neste sistema; apenas o polling foi medido.")
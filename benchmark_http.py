@@ -0,0 +1,148 @@
+import os
+import sys
+import time
+import shutil
+import logging
+import argparse
+import tempfile
+
+"""
+Verificação do caminho HTTP (servopa_http.py) contra o portal simulado, sem Firefox.
+
+Faz o login no mock com o `requests`, entrega os cookies a `SessaoHttpServopa` no formato
+de `driver.get_cookies()` e chama `processar_cota` diretamente para uma cota de cada
+cenário (Fixo, Livre, Fidelidade, protocolo anterior, Extrato cancelado, contemplada,
+inativa, inexistente, bloqueio de assembleia), conferindo status e mensagem, o PDF gravado
+e o formulário recebido pelo mock. Também confere que CAPTCHA e sessão sem login viram
+FallbackNavegador (a cota seguiria pelo navegador). Por fim mede a vazão em --cotas
+cotas de Lance Fixo.
+
+Sai com código 1 se algum cenário divergir.
+
+Uso: python benchmark_http.py [--cotas 50] [--atraso-paginas 0]
+"""
+
+import servopa_http
+from mock_servopa import ServopaMock, CPF_CNPJ_MOCK, SENHA_MOCK
+
+LANCE_LIVRE_PERCENTUAL = "40"
+LANCE_LIVRE_DESCONTAR_CARTA = "30"
+
+# (nome, dados da cota no mock, status esperado, trecho esperado da mensagem)
+CENARIOS = [
+    ("fixo", {}, "SUCESSO", "PDF salvo"),
+    ("livre", {"lance": "L"}, "SUCESSO", "PDF salvo"),
+    ("fidelidade", {"lance": "fidelidade"}, "ERRO_BENIGNO", "Lance Fidelidade"),
+    ("protocolo", {"protocolo": True}, "ERRO_BENIGNO", "protocolo anterior"),
+    ("cancelado", {"extrato": "cancelado"}, "ERRO_BENIGNO", "cancelado"),
+    ("contemplado", {"extrato": "contemplado"}, "ERRO_BENIGNO", "contemplada"),
+    ("inativa", {"status": "QUITADO"}, "ERRO_BENIGNO", "'ATIVO'"),
+    ("inexistente", {"status": "INEXISTENTE"}, "ERRO_BENIGNO", "não encontrada"),
+    ("bloqueio", {"bloqueio": "Grupo em período de assembleia."}, "ERRO_BENIGNO", "assembleia"),
+]
+
+
+def cookies_do_login(url):
+    """Faz o login no mock e devolve os cookies no formato de `driver.get_cookies()`."""
+    sessao = servopa_http.requests.Session()
+    sessao.post(f"{url}/login", data={"cpf_cnpj": CPF_CNPJ_MOCK, "senha": SENHA_MOCK})
+    cookies = [{"name": c.name, "value": c.value, "domain": c.domain, "path": c.path} for c in sessao.cookies]
+    sessao.close()
+    return cookies
+
+
+def nova_sessao(url, cookies):
+    return servopa_http.SessaoHttpServopa(cookies, f"{url}/vendas/buscar", f"{url}/vendas/lances")
+
+
+def processar(sessao, grupo, cota, digito, pasta):
+    cota_info = {"grupo": grupo, "cota": cota, "digito": digito, "original": f"{grupo},{cota},{digito}"}
+    return sessao.processar_cota(cota_info, pasta, LANCE_LIVRE_PERCENTUAL, LANCE_LIVRE_DESCONTAR_CARTA)
+
+
+def verificar_cenarios(mock, sessao, pasta):
+    """Confere cada cenário; devolve a lista de divergências."""
+    divergencias = []
+    for i, (nome, dados, status, trecho) in enumerate(CENARIOS, start=1):
+        grupo, cota, digito = "1564", str(900 + i), str(i % 10)
+        mock.adicionar_cota(grupo, cota, digito, nome=f"CLIENTE {nome.upper()}", **dados)
+        registros_antes = len(mock.registros)
+        resultado = processar(sessao, grupo, cota, digito, pasta)
+        problemas = []
+        if resultado["status"] != status or trecho not in resultado["mensagem"]:
+            problemas.append(f"esperado {status} com '{trecho}', obtido {resultado['status']}: {resultado['mensagem']}")
+        if status == "SUCESSO":
+            if not os.path.isfile(os.path.join(pasta, resultado["pdf"])):
+                problemas.append(f"PDF '{resultado['pdf']}' não foi gravado")
+            if resultado.get("nome_cliente") != f"CLIENTE {nome.upper()}":
+                problemas.append(f"nome do cliente '{resultado.get('nome_cliente')}'")
+            if len(mock.registros) != registros_antes + 1:
+                problemas.append("o mock não recebeu o Registrar")
+            elif dados.get("lance") == "L":
+                campos = mock.registros[-1][3]
+                if (campos.get("tx_lanliv"), campos.get("tx_lanliv_emb")) != (LANCE_LIVRE_PERCENTUAL, LANCE_LIVRE_DESCONTAR_CARTA):
+                    problemas.append(f"campos do Lance Livre enviados: {campos}")
+        elif nome != "bloqueio" and len(mock.registros) != registros_antes:
+            problemas.append("Registrar enviado para uma cota que não deveria receber lance")
+        print(f"  {nome:<12} {resultado['status']:<13} {'OK' if not problemas else 'DIVERGE'}")
+        divergencias += [f"{nome}: {p}" for p in problemas]
+    return divergencias
+
+
+def verificar_fallbacks(mock, url, sessao, pasta):
+    """CAPTCHA e sessão sem login precisam devolver a cota ao navegador, antes de qualquer Registrar."""
+    divergencias = []
+    casos = [
+        ("captcha", sessao, 1.0),
+        ("sem login", nova_sessao(url, []), 0.0),
+    ]
+    for nome, sessao_caso, prob_captcha in casos:
+        mock.prob_captcha = prob_captcha
+        registros_antes = len(mock.registros)
+        try:
+            resultado = processar(sessao_caso, "1564", "999", "9", pasta)
+            divergencias.append(f"{nome}: esperado FallbackNavegador, obtido {resultado['status']}")
+            print(f"  {nome:<12} {resultado['status']:<13} DIVERGE")
+        except servopa_http.FallbackNavegador as e:
+            print(f"  {nome:<12} {'fallback':<13} OK ({e})")
+        if len(mock.registros) != registros_antes:
+            divergencias.append(f"{nome}: Registrar enviado antes do fallback")
+        mock.prob_captcha = 0.0
+    return divergencias
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Verificação e vazão do caminho HTTP contra o portal simulado.")
+    parser.add_argument("--cotas", type=int, default=50, help="cotas de Lance Fixo na medição de vazão")
+    parser.add_argument("--atraso-paginas", type=float, default=0.0)
+    args = parser.parse_args()
+
+    if not servopa_http.disponivel():
+        sys.exit("O pacote 'requests' não está instalado (requirements.txt).")
+    logging.disable(logging.CRITICAL)
+    pasta = tempfile.mkdtemp(prefix="bench-http-")
+    with ServopaMock(atraso_paginas=args.atraso_paginas, num_imagens=0) as mock:
+        sessao = nova_sessao(mock.url, cookies_do_login(mock.url))
+        try:
+            print("Cenários (processar_cota direto no mock):")
+            divergencias = verificar_cenarios(mock, sessao, pasta)
+            divergencias += verificar_fallbacks(mock, mock.url, sessao, pasta)
+
+            inicio = time.perf_counter()
+            for i in range(args.cotas):
+                resultado = processar(sessao, "1565", str(100 + i), str(i % 10), pasta)
+                if resultado["status"] != "SUCESSO":
+                    divergencias.append(f"vazão, cota {100 + i}: {resultado['status']} - {resultado['mensagem']}")
+            decorrido = time.perf_counter() - inicio
+            if args.cotas:
+                print(f"Vazão: {args.cotas} cota(s) em {decorrido:.2f}s "
+                      f"({args.cotas / decorrido * 60:.0f} cotas/min, {decorrido / args.cotas * 1000:.1f} ms/cota)")
+        finally:
+            sessao.fechar()
+            shutil.rmtree(pasta, ignore_errors=True)
+
+    for divergencia in divergencias:
+        print(f"DIVERGE {divergencia}")
+    if divergencias:
+        sys.exit(1)
+    print("Caminho HTTP conforme em todos os cenários.")
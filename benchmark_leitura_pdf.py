@@ -0,0 +1,84 @@
+import os
+import sys
+import time
+import shutil
+import logging
+import argparse
+import tempfile
+
+"""
+Benchmark da leitura rápida dos PDFs (content stream da 1ª página) x leitura completa (pypdf).
+
+Para cada PDF do corpus mede `_extrair_info_pdf_rapido` e a leitura pelo pypdf
+(`_extrair_info_pdf(..., leitura_rapida=False)`) e informa:
+  - cobertura: quantos PDFs a leitura rápida resolveu sozinha;
+  - concordância: dos resolvidos, quantos deram o mesmo (nome, grupo, cota, dígito) do pypdf;
+  - tempo total de cada caminho e da combinação usada na verificação (rápida + pypdf nos demais).
+
+O corpus é o sintético de benchmark_pdfs.py ou uma pasta real (ex: Lances/<consultor>),
+que é a medida que importa para a concordância.
+
+Uso: python benchmark_leitura_pdf.py [--pdfs 500] [--paginas 3] [--pasta DIR]
+"""
+
+from benchmark_pdfs import gerar_corpus
+from pdf_parser import _extrair_info_pdf, _extrair_info_pdf_rapido
+
+
+def cronometrar(funcao, caminhos):
+    inicio = time.perf_counter()
+    resultados = [funcao(caminho) for caminho in caminhos]
+    return time.perf_counter() - inicio, resultados
+
+
+def medir(caminhos):
+    for caminho in caminhos:  # aquecimento: cache de páginas do SO, regexes e codecs
+        _extrair_info_pdf_rapido(caminho)
+        _extrair_info_pdf(caminho, leitura_rapida=False)
+    t_rapido, rapidos = cronometrar(_extrair_info_pdf_rapido, caminhos)
+    t_completo, completos = cronometrar(lambda c: _extrair_info_pdf(c, leitura_rapida=False), caminhos)
+    t_combinado, _ = cronometrar(lambda c: _extrair_info_pdf(c, leitura_rapida=True), caminhos)
+
+    resolvidos, concordantes, divergencias = 0, 0, []
+    for caminho, rapido, completo in zip(caminhos, rapidos, completos):
+        if rapido:
+            resolvidos += 1
+            if rapido == completo[:4]:
+                concordantes += 1
+            else:
+                divergencias.append((os.path.basename(caminho), rapido, completo[:4]))
+    return t_rapido, t_completo, t_combinado, resolvidos, concordantes, divergencias
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark da leitura rápida dos PDFs de lance.")
+    parser.add_argument("--pdfs", type=int, default=500)
+    parser.add_argument("--paginas", type=int, default=3)
+    parser.add_argument("--pasta", help="mede os PDFs desta pasta em vez de um corpus sintético")
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    pasta = args.pasta or tempfile.mkdtemp(prefix="bench-leitura-")
+    try:
+        if not args.pasta:
+            gerar_corpus(pasta, args.pdfs, args.paginas)
+            print(f"Corpus sintético: {args.pdfs} PDFs de {args.paginas} página(s)")
+        caminhos = [os.path.join(pasta, f) for f in sorted(os.listdir(pasta)) if f.lower().endswith(".pdf")]
+        if not caminhos:
+            sys.exit(f"Nenhum PDF em {pasta}")
+
+        t_rapido, t_completo, t_combinado, resolvidos, concordantes, divergencias = medir(caminhos)
+        total = len(caminhos)
+        print(f"leitura rápida:    {t_rapido:8.3f}s  ({t_rapido / total * 1000:.2f} ms/PDF)")
+        print(f"pypdf:             {t_completo:8.3f}s  ({t_completo / total * 1000:.2f} ms/PDF)")
+        print(f"rápida + pypdf:    {t_combinado:8.3f}s  ganho {t_completo / t_combinado:.1f}x")
+        print(f"cobertura:         {resolvidos}/{total} ({resolvidos / total:.1%})")
+        if resolvidos:
+            print(f"concordância:      {concordantes}/{resolvidos} ({concordantes / resolvidos:.1%})")
+        for nome, rapido, completo in divergencias[:10]:
+            print(f"  DIVERGE {nome}: rápida={rapido} pypdf={completo}")
+        if divergencias:
+            sys.exit(1)
+    finally:
+        if not args.pasta:
+            shutil.rmtree(pasta, ignore_errors=True)
@@ -0,0 +1,86 @@
+import os
+import sys
+import time
+import logging
+import tempfile
+import statistics
+
+"""
+Benchmark do carregamento de páginas: perfil padrão x perfil enxuto do navegador.
+
+Sobe o portal simulado (mock_servopa.py) e mede o tempo de driver.get() seguido de
+aguardar_pagina_pronta() nas páginas usadas pela automação, em cada perfil: a de login
+antes de logar (como a automação a vê) e, após o login, busca, Extrato e lances.
+Perfis:
+  - padrão: janela visível, carregamento 'normal', sem bloqueio de recursos;
+  - enxuto: FIREFOX_HEADLESS + BLOQUEAR_RECURSOS + PAGE_LOAD_STRATEGY=eager.
+
+Requer GECKODRIVER_PATH e FIREFOX_BINARY_PATH no .env (ou no ambiente).
+
+Uso: python benchmark_paginas.py [repeticoes]
+"""
+
+from mock_servopa import ServopaMock, CPF_CNPJ_MOCK, SENHA_MOCK
+
+os.environ.setdefault("DOWNLOAD_DIR", tempfile.gettempdir())
+
+import automacao_servopa_corrigido as automacao
+
+PERFIS = {
+    "padrão": {"FIREFOX_HEADLESS": False, "BLOQUEAR_RECURSOS": False, "PAGE_LOAD_STRATEGY": "normal"},
+    "enxuto": {"FIREFOX_HEADLESS": True, "BLOQUEAR_RECURSOS": True, "PAGE_LOAD_STRATEGY": "eager"},
+}
+
+
+def paginas(base):
+    """Páginas medidas, na ordem: a de login (sem sessão) e as que exigem login."""
+    return [
+        ("login", f"{base}/"),
+        ("busca", f"{base}/vendas/buscar"),
+        ("extrato", f"{base}/vendas/extrato?grupo=1234&plano=56&digito=7"),
+        ("lances", f"{base}/vendas/lances"),
+    ]
+
+
+def medir_perfil(mock, config, repeticoes):
+    for nome, valor in config.items():
+        setattr(automacao, nome, valor)
+    automacao.SERVOPA_URL = mock.url
+    automacao.CPF_CNPJ, automacao.SENHA = CPF_CNPJ_MOCK, SENHA_MOCK
+
+    tempos = {}
+
+    def cronometrar(pagina, url):
+        inicio = time.perf_counter()
+        driver.get(url)
+        automacao.aguardar_pagina_pronta(driver)
+        tempos.setdefault(pagina, []).append(time.perf_counter() - inicio)
+
+    (pagina_login, url_login), *paginas_logadas = paginas(mock.url)
+    driver = automacao.get_driver()
+    try:
+        # A tela de login só é vista sem sessão: medida antes de logar
+        for _ in range(repeticoes):
+            cronometrar(pagina_login, url_login)
+        automacao.login(driver)
+        for _ in range(repeticoes):
+            for pagina, url in paginas_logadas:
+                cronometrar(pagina, url)
+    finally:
+        driver.quit()
+    return tempos
+
+
+if __name__ == "__main__":
+    logging.disable(logging.CRITICAL)
+    repeticoes = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    with ServopaMock() as mock:
+        print(f"Portal simulado em {mock.url} ({mock.num_imagens} imagens por página, "
+              f"{mock.atraso_recursos:.2f}s de atraso por recurso); {repeticoes} repetições:")
+        resultados = {perfil: medir_perfil(mock, config, repeticoes) for perfil, config in PERFIS.items()}
+
+    print(f"{'página':<10}" + "".join(f"{perfil:>14}" for perfil in PERFIS) + f"{'ganho':>10}")
+    for pagina, _ in paginas(""):
+        medianas = [statistics.median(resultados[perfil][pagina]) for perfil in PERFIS]
+        ganho = medianas[0] / medianas[-1] if medianas[-1] else float("inf")
+        print(f"{pagina:<10}" + "".join(f"{m:>13.3f}s" for m in medianas) + f"{ganho:>9.1f}x")
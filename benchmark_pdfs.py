@@ -0,0 +1,128 @@
+import os
+import sys
+import time
+import zlib
+import random
+import shutil
+import logging
+import argparse
+import tempfile
+
+"""
+Benchmark da leitura dos PDFs na verificação de nomes: sequencial x processos x cache.
+
+Gera um corpus sintético de PDFs de lance (texto comprimido com FlateDecode, como os
+baixados do portal: "Consorciado <NOME> <grupo>.<cota>-<dígito>" na primeira página
+e páginas de texto de enchimento depois) e mede `verificar_e_corrigir_nomes_pdf` na
+pasta com 1 processo e com o número pedido (sem o cache de extração), e depois com o
+cache e o manifesto já preenchidos (verificação incremental), conferindo que os
+relatórios são iguais.
+
+Uso: python benchmark_pdfs.py [--pdfs 500] [--paginas 3] [--processos 0] [--pasta DIR]
+"""
+
+from pdf_parser import verificar_e_corrigir_nomes_pdf
+
+_NOMES = ["JOAO", "MARIA", "ANTONIO", "FRANCISCA", "CARLOS", "ADRIANA", "PAULO", "JULIANA",
+          "SILVA", "SANTOS", "OLIVEIRA", "SOUZA", "RODRIGUES", "FERREIRA", "ALVES", "PEREIRA"]
+
+
+def _conteudo_pagina(linhas):
+    comandos = ["BT", "/F1 10 Tf", "12 TL", "40 800 Td"]
+    for linha in linhas:
+        texto = linha.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+        comandos.append(f"({texto}) Tj T*")
+    comandos.append("ET")
+    return zlib.compress("\n".join(comandos).encode("latin-1"))
+
+
+def gerar_pdf_lance(caminho, nome, grupo, cota, digito, paginas=3, semente=0):
+    """Grava um PDF mínimo válido (xref correto) com os dados da cota na primeira página."""
+    aleatorio = random.Random(semente)
+    textos = [[
+        "Consorcio Servopa - Extrato",
+        "Consorciado",
+        f"{nome} {grupo}.{cota}-{digito}",
+        f"Grupo {grupo} Cota {cota} Digito {digito}",
+    ]]
+    for _ in range(paginas - 1):
+        textos.append([" ".join(aleatorio.choice(_NOMES) for _ in range(10)) + f" {aleatorio.randint(0, 99999):05d}"
+                       for _ in range(60)])
+
+    # Objetos: 1 catálogo, 2 páginas, 3 fonte, depois (página, conteúdo) para cada página
+    objetos = [None, None, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for linhas in textos:
+        num_pagina = len(objetos) + 1
+        kids.append(f"{num_pagina} 0 R")
+        stream = _conteudo_pagina(linhas)
+        objetos.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+                       f"/Resources << /Font << /F1 3 0 R >> >> /Contents {num_pagina + 1} 0 R >>".encode())
+        objetos.append(f"<< /Length {len(stream)} /Filter /FlateDecode >>\nstream\n".encode() + stream + b"\nendstream")
+    objetos[0] = b"<< /Type /Catalog /Pages 2 0 R >>"
+    objetos[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>".encode()
+
+    saida = bytearray(b"%PDF-1.4\n")
+    posicoes = []
+    for numero, corpo in enumerate(objetos, start=1):
+        posicoes.append(len(saida))
+        saida += f"{numero} 0 obj\n".encode() + corpo + b"\nendobj\n"
+    inicio_xref = len(saida)
+    saida += f"xref\n0 {len(objetos) + 1}\n0000000000 65535 f \n".encode()
+    saida += b"".join(f"{p:010d} 00000 n \n".encode() for p in posicoes)
+    saida += f"trailer\n<< /Size {len(objetos) + 1} /Root 1 0 R >>\nstartxref\n{inicio_xref}\n%%EOF\n".encode()
+    with open(caminho, "wb") as f:
+        f.write(saida)
+
+
+def gerar_corpus(pasta, quantidade, paginas):
+    """Cria `quantidade` PDFs já com o nome padrão (a verificação não renomeia nada)."""
+    aleatorio = random.Random(42)
+    for i in range(quantidade):
+        nome = " ".join(aleatorio.sample(_NOMES, 3))
+        grupo, cota, digito = f"{1000 + i % 900}", f"{i + 1:04d}", str(i % 10)
+        gerar_pdf_lance(os.path.join(pasta, f"LANCE- {nome} {grupo}.{cota}-{digito}.pdf"),
+                        nome, grupo, cota, digito, paginas, semente=i)
+
+
+def medir(pasta, processos, usar_cache=False):
+    inicio = time.perf_counter()
+    relatorio = verificar_e_corrigir_nomes_pdf(pasta, processos=processos, usar_cache=usar_cache)
+    for contador in ('skipped', 'cache_hits', 'cache_misses'):
+        relatorio.pop(contador)
+    return time.perf_counter() - inicio, relatorio
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark da leitura paralela dos PDFs de lance.")
+    parser.add_argument("--pdfs", type=int, default=500)
+    parser.add_argument("--paginas", type=int, default=3)
+    parser.add_argument("--processos", type=int, default=0, help="0 = um por CPU")
+    parser.add_argument("--pasta", help="usa/gera o corpus nesta pasta em vez de uma temporária")
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    pasta = args.pasta or tempfile.mkdtemp(prefix="bench-pdfs-")
+    os.makedirs(pasta, exist_ok=True)
+    try:
+        if not any(f.lower().endswith(".pdf") for f in os.listdir(pasta)):
+            inicio = time.perf_counter()
+            gerar_corpus(pasta, args.pdfs, args.paginas)
+            print(f"Corpus: {args.pdfs} PDFs de {args.paginas} página(s) em {pasta} "
+                  f"(gerado em {time.perf_counter() - inicio:.1f}s)")
+
+        t_seq, rel_seq = medir(pasta, 1)
+        t_par, rel_par = medir(pasta, args.processos)
+        medir(pasta, args.processos, usar_cache=True)  # preenche o cache e o manifesto
+        t_cache, rel_cache = medir(pasta, args.processos, usar_cache=True)
+        processos = args.processos or os.cpu_count()
+        print(f"sequencial:            {t_seq:8.2f}s  {rel_seq}")
+        print(f"{processos:>2} processo(s):        {t_par:8.2f}s  ({t_seq / t_par:.1f}x)")
+        print(f"incremental (cache):   {t_cache:8.2f}s  ({t_seq / t_cache:.1f}x)")
+        iguais = rel_seq == rel_par == rel_cache
+        print(f"relatórios {'iguais' if iguais else 'DIFERENTES'}")
+        if not iguais:
+            sys.exit(1)
+    finally:
+        if not args.pasta:
+            shutil.rmtree(pasta, ignore_errors=True)
@@ -0,0 +1,141 @@
+import os
+import sys
+import time
+import random
+import logging
+import argparse
+import tempfile
+import threading
+from collections import Counter
+
+"""
+Benchmark de ponta a ponta: executa `automacao_servopa_corrigido.main` contra o portal
+simulado (mock_servopa.py) e mede a vazão real da automação.
+
+Relata latência por cota e por etapa (média, p50, p95 e comandos WebDriver, a partir
+dos spans de rastreamento.py), cotas/minuto e taxa de erros, além dos eventos injetados
+pelo mock (CAPTCHA, bloqueio de assembleia, Pace preso). O trace completo da execução
+(JSONL e Chrome Trace) fica em traces/ na pasta de trabalho.
+Serve de linha de base para comparar cada otimização: rode antes e depois com a
+mesma --semente.
+
+Requer GECKODRIVER_PATH e FIREFOX_BINARY_PATH no .env (ou no ambiente). Tudo o que a
+automação grava (Lances/, downloads, logs, relatório) fica em uma pasta temporária.
+
+Uso: python benchmark_throughput.py --cotas 30 --navegadores 2 --atraso-paginas 0.2 --pace-ms 300
+"""
+
+_PASTA_TRABALHO = tempfile.mkdtemp(prefix="bench-throughput-")
+os.environ["DOWNLOAD_DIR"] = os.path.join(_PASTA_TRABALHO, "downloads")
+
+from mock_servopa import ServopaMock, CPF_CNPJ_MOCK, SENHA_MOCK
+
+import automacao_servopa_corrigido as automacao
+
+# Proporção dos cenários de cota (o restante é ATIVA de Lance Fixo)
+CENARIOS = [
+    ("livre", 0.15, {"lance": "L"}),
+    ("fidelidade", 0.05, {"lance": "fidelidade"}),
+    ("protocolo", 0.05, {"protocolo": True}),
+    ("cancelado", 0.05, {"extrato": "cancelado"}),
+    ("contemplado", 0.03, {"extrato": "contemplado"}),
+    ("inativa", 0.03, {"status": "QUITADO"}),
+]
+
+
+def gerar_cotas(mock, quantidade, semente):
+    """Cadastra `quantidade` cotas no mock com a mistura de CENARIOS e devolve a entrada da GUI."""
+    sorteio = random.Random(semente)
+    linhas, cenarios = [], Counter()
+    for i in range(1, quantidade + 1):
+        grupo, cota, digito = "1564", str(100 + i), str(i % 10)
+        roleta, acumulado, escolhido = sorteio.random(), 0.0, ("fixo", {})
+        for nome, proporcao, dados in CENARIOS:
+            acumulado += proporcao
+            if roleta < acumulado:
+                escolhido = (nome, dados)
+                break
+        mock.adicionar_cota(grupo, cota, digito, nome=f"CLIENTE BENCHMARK {i}", **escolhido[1])
+        cenarios[escolhido[0]] += 1
+        linhas.append(f"{grupo},{cota},{digito}")
+    return "\n".join(linhas), cenarios
+
+
+def configurar_automacao(mock, args):
+    automacao.SERVOPA_URL = f"{mock.url}/"
+    automacao.SERVOPA_BUSCAR_URL = f"{mock.url}/vendas/buscar"
+    automacao.SERVOPA_LANCES_URL = f"{mock.url}/vendas/lances"
+    automacao.CPF_CNPJ, automacao.SENHA = CPF_CNPJ_MOCK, SENHA_MOCK
+    automacao.REUTILIZAR_SESSAO = False
+    automacao.HTTP_RAPIDO = args.http
+    automacao.BUSCA_POR_GRUPO = args.busca_por_grupo
+    automacao.INTERVALO_LOGIN_NAVEGADORES = args.intervalo_login
+    automacao.RASTREAMENTO = True
+    if not args.janela:
+        automacao.FIREFOX_HEADLESS = True
+
+
+def relatorio(args, cenarios, summary, mock, duracao_total):
+    etapas = summary.get('etapas', {})
+    processadas = summary['sucesso'] + summary['benigno'] + summary['critico']
+    print()
+    print(f"Cotas: {args.cotas} ({', '.join(f'{k}={v}' for k, v in sorted(cenarios.items()))})")
+    print(f"Navegadores: {args.navegadores}  HTTP_RAPIDO: {args.http}  BUSCA_POR_GRUPO: {args.busca_por_grupo}  "
+          f"PAGE_LOAD_STRATEGY: {automacao.PAGE_LOAD_STRATEGY}  BLOQUEAR_RECURSOS: {automacao.BLOQUEAR_RECURSOS}")
+    print(f"Tempo total: {duracao_total:.1f}s  Vazão: {processadas / duracao_total * 60:.1f} cotas/min")
+    if 'cota' in etapas:
+        c = etapas['cota']
+        print(f"Latência por cota: média={c['media']:.2f}s  p50={c['p50']:.2f}s  p95={c['p95']:.2f}s")
+    erros = summary['benigno'] + summary['critico']
+    print(f"Resultados: SUCESSO={summary['sucesso']}  ERRO_BENIGNO={summary['benigno']}  "
+          f"ERRO_CRITICO={summary['critico']}  taxa de erro={erros / max(1, processadas):.1%}")
+    print(f"Eventos do mock: {mock.contadores}")
+    if mock.contadores['registros'] != summary['sucesso']:
+        print(f"ATENÇÃO: {mock.contadores['registros']} lances registrados no mock x {summary['sucesso']} sucessos.")
+
+    print()
+    print(f"{'etapa':<20}{'n':>6}{'média':>10}{'p50':>10}{'p95':>10}{'total':>10}{'comandos':>10}")
+    for nome, e in sorted(etapas.items(), key=lambda item: -item[1]['media'] * item[1]['n']):
+        print(f"{nome:<20}{e['n']:>6}{e['media']:>9.3f}s{e['p50']:>9.3f}s{e['p95']:>9.3f}s"
+              f"{e['media'] * e['n']:>9.1f}s{e['comandos']:>10.1f}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark de vazão da automação contra o portal simulado.")
+    parser.add_argument("--cotas", type=int, default=20)
+    parser.add_argument("--navegadores", type=int, default=1)
+    parser.add_argument("--http", action="store_true", help="ativa o HTTP_RAPIDO")
+    parser.add_argument("--busca-por-grupo", action="store_true", help="ativa o BUSCA_POR_GRUPO")
+    parser.add_argument("--janela", action="store_true", help="não força o modo headless")
+    parser.add_argument("--intervalo-login", type=float, default=0.5)
+    parser.add_argument("--atraso-paginas", type=float, default=0.2)
+    parser.add_argument("--atraso-recursos", type=float, default=0.1)
+    parser.add_argument("--pace-ms", type=int, default=300)
+    parser.add_argument("--prob-pace-preso", type=float, default=0.0)
+    parser.add_argument("--atraso-xhr", type=float, default=0.1)
+    parser.add_argument("--prob-captcha", type=float, default=0.0)
+    parser.add_argument("--prob-bloqueio", type=float, default=0.05)
+    parser.add_argument("--semente", type=int, default=42)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    os.chdir(_PASTA_TRABALHO)
+    automacao.setup_logging()
+    # Na saída só os avisos; o log completo fica em automacao.log na pasta de trabalho
+    logging.getLogger().handlers[2].setLevel(logging.WARNING)
+
+    with ServopaMock(
+        atraso_recursos=args.atraso_recursos, atraso_paginas=args.atraso_paginas,
+        pace_ms=args.pace_ms, prob_pace_preso=args.prob_pace_preso, atraso_xhr=args.atraso_xhr,
+        prob_captcha=args.prob_captcha, prob_bloqueio=args.prob_bloqueio, semente=args.semente,
+    ) as mock:
+        configurar_automacao(mock, args)
+        cotas_input, cenarios = gerar_cotas(mock, args.cotas, args.semente)
+        print(f"Portal simulado em {mock.url}; pasta de trabalho: {_PASTA_TRABALHO}")
+        inicio = time.perf_counter()
+        summary = automacao.main("Benchmark", cotas_input, threading.Event(), num_navegadores=args.navegadores)
+        duracao_total = time.perf_counter() - inicio
+        relatorio(args, cenarios, summary, mock, duracao_total)
+    sys.exit(0 if summary.get('critico', 0) == 0 else 1)
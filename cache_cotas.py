@@ -0,0 +1,101 @@
+import os
+import time
+import sqlite3
+import calendar
+import threading
+from datetime import datetime
+
+from pdf_parser import normalizar_chave_cota
+
+"""
+Cache persistente (SQLite) do que o portal já mostrou sobre cada cota.
+
+Cada resultado final de uma cota (SUCESSO ou ERRO_BENIGNO) grava, por (grupo, cota,
+dígito): status, categoria do relatório ('Extrato Cancelado', 'Cota Contemplada',
+'Lance Fidelidade', 'Cota Não Ativa', ...), mensagem, nome do consorciado, tipo de lance
+e o instante da observação.
+
+Na pré-verificação do `main()`, uma cota cuja última observação é de uma categoria com
+validade configurada (em dias) e ainda está dentro dela é pulada sem abrir o navegador.
+Se o dia da assembleia mensal for informado, nenhuma observação anterior à última
+assembleia é usada, pois é nela que o status das cotas muda.
+"""
+
+
+def ultima_assembleia(dia, agora=None):
+    """Timestamp (meia-noite) da assembleia mais recente no `dia` do mês, até `agora`."""
+    hoje = datetime.fromtimestamp(agora if agora is not None else time.time())
+    ano, mes = hoje.year, hoje.month
+    if hoje.day < min(dia, calendar.monthrange(ano, mes)[1]):
+        ano, mes = (ano, mes - 1) if mes > 1 else (ano - 1, 12)
+    return datetime(ano, mes, min(dia, calendar.monthrange(ano, mes)[1])).timestamp()
+
+
+class CacheCotas:
+    """Metadados das cotas em um arquivo SQLite (thread-safe; uma conexão compartilhada).
+
+    validade: {categoria: dias}; só categorias listadas fazem a cota ser pulada.
+    dia_assembleia: dia do mês da assembleia (None para usar só a validade).
+    """
+
+    def __init__(self, caminho, validade, dia_assembleia=None):
+        self.caminho = caminho
+        self.validade = validade
+        self.dia_assembleia = dia_assembleia
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(caminho)), exist_ok=True)
+        self._conexao = sqlite3.connect(caminho, check_same_thread=False)
+        with self._lock, self._conexao:
+            self._conexao.execute("PRAGMA journal_mode=WAL")
+            self._conexao.execute(
+                "CREATE TABLE IF NOT EXISTS cotas ("
+                " grupo TEXT NOT NULL, cota TEXT NOT NULL, digito TEXT NOT NULL,"
+                " status TEXT NOT NULL, categoria TEXT, mensagem TEXT,"
+                " nome_cliente TEXT, tipo_lance TEXT, observado_em REAL NOT NULL,"
+                " PRIMARY KEY (grupo, cota, digito))"
+            )
+
+    def registrar(self, cota_info, status, categoria, mensagem):
+        """Grava a observação mais recente da cota (nome/tipo de lance anteriores são mantidos se ausentes)."""
+        with self._lock, self._conexao:
+            self._conexao.execute(
+                "INSERT INTO cotas VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+                " ON CONFLICT (grupo, cota, digito) DO UPDATE SET"
+                " status = excluded.status, categoria = excluded.categoria, mensagem = excluded.mensagem,"
+                " nome_cliente = COALESCE(excluded.nome_cliente, cotas.nome_cliente),"
+                " tipo_lance = COALESCE(excluded.tipo_lance, cotas.tipo_lance),"
+                " observado_em = excluded.observado_em",
+                (*normalizar_chave_cota(cota_info['grupo'], cota_info['cota'], cota_info['digito']),
+                 status, categoria, mensagem, cota_info.get('nome_cliente'), cota_info.get('tipo_lance'),
+                 time.time()),
+            )
+
+    def consultar(self, cota_info):
+        """Última observação da cota como dict, ou None."""
+        with self._lock:
+            cursor = self._conexao.execute(
+                "SELECT * FROM cotas WHERE grupo = ? AND cota = ? AND digito = ?",
+                normalizar_chave_cota(cota_info['grupo'], cota_info['cota'], cota_info['digito']),
+            )
+            linha = cursor.fetchone()
+            colunas = [c[0] for c in cursor.description]
+        return dict(zip(colunas, linha)) if linha else None
+
+    def valida(self, registro, agora=None):
+        """True se a observação ainda permite pular a cota (categoria com validade, não expirada)."""
+        agora = agora if agora is not None else time.time()
+        dias = self.validade.get(registro['categoria'])
+        if not dias or agora - registro['observado_em'] > dias * 86400:
+            return False
+        if self.dia_assembleia and registro['observado_em'] < ultima_assembleia(self.dia_assembleia, agora):
+            return False
+        return True
+
+    def conhecida_inelegivel(self, cota_info):
+        """Observação válida que dispensa processar a cota, ou None."""
+        registro = self.consultar(cota_info)
+        return registro if registro and self.valida(registro) else None
+
+    def fechar(self):
+        with self._lock:
+            self._conexao.close()
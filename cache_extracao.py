@@ -0,0 +1,156 @@
+import os
+import hashlib
+import logging
+import sqlite3
+import threading
+
+"""
+Cache persistente (SQLite) do que foi extraído de cada PDF de lance.
+
+Fica ao lado dos PDFs, em `Lances/<consultor>/.cache_extracao.sqlite3`, e guarda o
+resultado de `_extrair_info_pdf` (nome, grupo, cota, dígito ou a mensagem de erro)
+pela identidade do arquivo: (inode, tamanho, mtime_ns). Renomear ou mover o PDF para
+a quarentena não muda essa identidade, então o arquivo não é lido de novo; regravá-lo
+muda o tamanho/mtime e a próxima verificação o lê outra vez.
+
+Com `verificar_conteudo`, o SHA-1 do arquivo também precisa bater (protege contra
+ferramentas que preservam o mtime ao reescrever o arquivo, ao custo de ler cada PDF).
+
+O arquivo guarda também a versão do extrator (`PRAGMA user_version`). Se ela não for a
+`versao_extrator` informada, o que foi gravado por outra versão da extração (resultados
+e erros) é descartado ao abrir o cache.
+
+O mesmo arquivo guarda o manifesto da última verificação de nomes: cada arquivo que
+estava com o nome certo, com a assinatura (inode, tamanho, mtime_ns) que tinha. Na
+verificação seguinte, um arquivo com o mesmo nome e a mesma assinatura é pulado sem
+nenhuma consulta.
+"""
+
+NOME_ARQUIVO = ".cache_extracao.sqlite3"
+
+# Commits em lote: uma pasta nova tem milhares de PDFs e cada commit custa um fsync
+_REGISTROS_POR_COMMIT = 200
+
+
+def hash_arquivo(caminho):
+    h = hashlib.sha1()
+    with open(caminho, "rb") as f:
+        for bloco in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(bloco)
+    return h.hexdigest()
+
+
+class CacheExtracaoPdf:
+    """Resultados de extração por identidade de arquivo, com contadores de acertos/falhas.
+
+    Uso: `chave = cache.chave(caminho)`; `cache.consultar(chave)` devolve a tupla de
+    `_extrair_info_pdf` ou None; após ler o PDF, `cache.registrar(chave, resultado)`.
+    """
+
+    def __init__(self, pasta, arquivo=None, verificar_conteudo=False, versao_extrator=0):
+        self.arquivo = arquivo or os.path.join(pasta, NOME_ARQUIVO)
+        self.verificar_conteudo = verificar_conteudo
+        self.acertos = 0
+        self.falhas = 0
+        self._vistas = set()
+        self._pendentes = 0
+        self._lock = threading.Lock()
+        self._conexao = sqlite3.connect(self.arquivo, check_same_thread=False)
+        with self._lock, self._conexao:
+            # TRUNCATE mantém o arquivo de journal: a pasta não muda de mtime a cada commit
+            # (o índice de lances e a contagem da GUI usam o mtime da pasta)
+            self._conexao.execute("PRAGMA journal_mode=TRUNCATE")
+            self._conexao.execute("PRAGMA synchronous=NORMAL")
+            self._conexao.execute(
+                "CREATE TABLE IF NOT EXISTS extracoes ("
+                " inode INTEGER NOT NULL, tamanho INTEGER NOT NULL, mtime_ns INTEGER NOT NULL,"
+                " sha1 TEXT, nome TEXT, grupo TEXT, cota TEXT, digito TEXT, erro TEXT,"
+                " PRIMARY KEY (inode, tamanho, mtime_ns))"
+            )
+            self._conexao.execute(
+                "CREATE TABLE IF NOT EXISTS verificados ("
+                " nome TEXT PRIMARY KEY, inode INTEGER NOT NULL, tamanho INTEGER NOT NULL, mtime_ns INTEGER NOT NULL)"
+            )
+            versao = self._conexao.execute("PRAGMA user_version").fetchone()[0]
+            if versao != versao_extrator:
+                logging.info(f"Cache de extração da versão {versao} do extrator (atual: {versao_extrator}); descartado.")
+                self._conexao.execute("DELETE FROM extracoes")
+                self._conexao.execute("DELETE FROM verificados")
+                self._conexao.execute(f"PRAGMA user_version = {int(versao_extrator)}")
+
+    def chave(self, caminho):
+        """Identidade atual do arquivo: (inode, tamanho, mtime_ns, sha1 ou None)."""
+        st = os.stat(caminho)
+        sha1 = hash_arquivo(caminho) if self.verificar_conteudo else None
+        return st.st_ino, st.st_size, st.st_mtime_ns, sha1
+
+    def consultar(self, chave):
+        """Resultado guardado para a chave (tupla de `_extrair_info_pdf`), ou None."""
+        inode, tamanho, mtime_ns, sha1 = chave
+        with self._lock:
+            self._vistas.add((inode, tamanho, mtime_ns))
+            linha = self._conexao.execute(
+                "SELECT sha1, nome, grupo, cota, digito, erro FROM extracoes"
+                " WHERE inode = ? AND tamanho = ? AND mtime_ns = ?",
+                (inode, tamanho, mtime_ns),
+            ).fetchone()
+            if linha is None or (self.verificar_conteudo and linha[0] != sha1):
+                self.falhas += 1
+                return None
+            self.acertos += 1
+        return linha[1:]
+
+    def registrar(self, chave, resultado):
+        inode, tamanho, mtime_ns, sha1 = chave
+        with self._lock:
+            self._vistas.add((inode, tamanho, mtime_ns))
+            self._conexao.execute(
+                "INSERT OR REPLACE INTO extracoes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (inode, tamanho, mtime_ns, sha1, *resultado),
+            )
+            self._pendentes += 1
+            if self._pendentes >= _REGISTROS_POR_COMMIT:
+                self._conexao.commit()
+                self._pendentes = 0
+
+    def verificados(self):
+        """Manifesto da última verificação: {nome: (inode, tamanho, mtime_ns)}."""
+        with self._lock:
+            return {nome: tuple(assinatura) for nome, *assinatura in self._conexao.execute("SELECT * FROM verificados")}
+
+    def marcar_verificados(self, itens):
+        """Substitui o manifesto por `itens` [(nome, (inode, tamanho, mtime_ns))]."""
+        with self._lock, self._conexao:
+            self._conexao.execute("DELETE FROM verificados")
+            self._conexao.executemany("INSERT INTO verificados VALUES (?, ?, ?, ?)",
+                                      ((nome, *assinatura) for nome, assinatura in itens))
+            self._pendentes = 0
+
+    def podar(self):
+        """Apaga as entradas de arquivos que não foram consultados nesta verificação (apagados/alterados).
+
+        Entradas de arquivos do manifesto (pulados sem consulta) são mantidas.
+        """
+        with self._lock, self._conexao:
+            self._conexao.execute("CREATE TEMP TABLE IF NOT EXISTS vistas (inode, tamanho, mtime_ns)")
+            self._conexao.execute("DELETE FROM vistas")
+            self._conexao.executemany("INSERT INTO vistas VALUES (?, ?, ?)", self._vistas)
+            apagadas = self._conexao.execute(
+                "DELETE FROM extracoes WHERE (inode, tamanho, mtime_ns) NOT IN"
+                " (SELECT inode, tamanho, mtime_ns FROM vistas"
+                "  UNION SELECT inode, tamanho, mtime_ns FROM verificados)"
+            ).rowcount
+            self._pendentes = 0
+        return apagadas
+
+    def invalidar(self):
+        """Esquece tudo: a próxima verificação relê todos os PDFs e reconstrói o cache."""
+        with self._lock, self._conexao:
+            self._conexao.execute("DELETE FROM extracoes")
+            self._conexao.execute("DELETE FROM verificados")
+            self._pendentes = 0
+
+    def fechar(self):
+        with self._lock:
+            self._conexao.commit()
+            self._conexao.close()
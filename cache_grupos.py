@@ -0,0 +1,106 @@
+import logging
+import threading
+
+from pdf_parser import normalizar_chave_cota
+
+"""
+Cache, em memória e por execução, da tabela de resultados da busca por grupo.
+
+As listas de cotas costumam trazer muitas cotas do mesmo grupo. Com a busca por
+grupo, o formulário é enviado uma única vez por grupo (só o campo Grupo preenchido)
+e a tabela de resultados é guardada aqui: cota, dígito, status e o alvo do clique de
+cada linha. As demais cotas do grupo abrem o Extrato direto pela URL da linha, e as
+que não aparecem na tabela são descartadas sem nenhuma busca.
+
+Cada grupo é buscado por um só navegador: os demais esperam o resultado no lock do
+grupo. Se a busca só por grupo não funcionar (tabela vazia, sem as colunas de
+cota/dígito ou com valores não numéricos nelas) ou se a tabela não trouxer nenhuma das
+cotas do grupo informadas na execução (colunas trocadas, resultados paginados), o grupo
+fica marcado como indisponível e suas cotas seguem pela busca individual.
+"""
+
+
+class TabelaGrupo:
+    """Linhas da busca de um grupo, indexadas pela chave normalizada (ver `normalizar_chave_cota`)."""
+
+    def __init__(self, grupo, linhas):
+        self.grupo = grupo
+        self.linhas = {}
+        for linha in linhas:
+            chave = normalizar_chave_cota(grupo, linha["cota"], linha["digito"])
+            self.linhas.setdefault(chave, []).append(linha)
+
+    def linhas_da_cota(self, cota, digito):
+        """Linhas da cota na tabela do grupo (lista vazia se ela não apareceu na busca)."""
+        return self.linhas.get(normalizar_chave_cota(self.grupo, cota, digito), [])
+
+    def __len__(self):
+        return sum(len(linhas) for linhas in self.linhas.values())
+
+
+class CacheBuscaGrupos:
+    """Tabelas de resultados por grupo, compartilhadas entre os navegadores da execução.
+
+    Cada linha guardada é um dict {cota, digito, status, alvo}, onde `alvo` é a URL
+    absoluta aberta pelo clique na linha (None se o onclick não for uma navegação simples).
+    """
+
+    def __init__(self):
+        self._tabelas = {}
+        self._locks = {}
+        self._esperadas = {}
+        self._lock = threading.Lock()
+        self.buscas = 0
+        self.acertos = 0
+
+    def limpar(self):
+        with self._lock:
+            self._tabelas.clear()
+            self._locks.clear()
+            self._esperadas.clear()
+            self.buscas = 0
+            self.acertos = 0
+
+    def registrar_cotas(self, cotas):
+        """Cotas da execução ({grupo, cota, digito, ...}): a tabela de um grupo só é aceita se trouxer ao menos uma delas."""
+        with self._lock:
+            for cota in cotas:
+                self._esperadas.setdefault(cota["grupo"], set()).add(normalizar_chave_cota(cota["grupo"], cota["cota"], cota["digito"]))
+
+    def _lock_do_grupo(self, grupo):
+        with self._lock:
+            return self._locks.setdefault(grupo, threading.Lock())
+
+    def tabela(self, grupo, buscar):
+        """Tabela do grupo, chamando `buscar(grupo)` na primeira vez.
+
+        `buscar` devolve a lista de linhas, ou None se a busca por grupo não é possível;
+        nesse caso (e enquanto o grupo estiver indisponível) retorna None. Se `buscar`
+        lançar exceção, nada é guardado e a próxima cota do grupo tenta de novo.
+        """
+        with self._lock_do_grupo(grupo):
+            with self._lock:
+                if grupo in self._tabelas:
+                    if self._tabelas[grupo] is not None:
+                        self.acertos += 1
+                    return self._tabelas[grupo]
+                esperadas = self._esperadas.get(grupo)
+            linhas = buscar(grupo)
+            tabela = TabelaGrupo(grupo, linhas) if linhas else None
+            if tabela is not None and esperadas and not any(chave in tabela.linhas for chave in esperadas):
+                logging.warning(f"A tabela do grupo {grupo} não traz nenhuma das cotas informadas "
+                                f"(colunas de cota/dígito ou paginação inesperadas); não será usada.")
+                tabela = None
+            with self._lock:
+                self.buscas += 1
+                self._tabelas[grupo] = tabela
+            if tabela is None:
+                logging.info(f"Busca por grupo indisponível para o grupo {grupo}; suas cotas serão buscadas uma a uma.")
+            else:
+                logging.info(f"Tabela do grupo {grupo} guardada em cache ({len(tabela)} linha(s)).")
+            return tabela
+
+    def desativar(self, grupo):
+        """Marca o grupo como indisponível: as próximas cotas dele usam a busca individual."""
+        with self._lock:
+            self._tabelas[grupo] = None
@@ -1,6 +1,7 @@
 import sys
 from pypdf import PdfReader
 import re
+from pdf_parser import ler_texto_pdf
 
 def extract_text_from_pdf(pdf_path):
     """Lê um arquivo PDF e imprime o texto extraído de todas as páginas."""
@@ -27,6 +28,14 @@ def extract_text_from_pdf(pdf_path):
         print(texto_limpo)
         print("-----------------------------------------------------")
 
+        # O robô lê página a página e para ao encontrar nome e cota (pdf_parser.ler_texto_pdf)
+        _, paginas_lidas, (nome, grupo, cota, digito) = ler_texto_pdf(PdfReader(pdf_path))
+        print(f"--- LEITURA DO ROBÔ: {paginas_lidas} de {len(reader.pages)} página(s) decodificada(s) ---")
+        if nome and grupo:
+            print(f"Nome: {nome} | Cota: {grupo}.{cota}-{digito}")
+        else:
+            print(f"Nome: {nome or 'NÃO ENCONTRADO'} | Cota: {f'{grupo}.{cota}-{digito}' if grupo else 'NÃO ENCONTRADA'}")
+
     except FileNotFoundError:
         print(f"ERRO: Arquivo não encontrado em '{pdf_path}'")
     except Exception as e:
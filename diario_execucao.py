@@ -0,0 +1,127 @@
+import os
+import json
+import time
+import uuid
+import logging
+import threading
+
+from pdf_parser import normalizar_chave_cota
+
+"""
+Diário (write-ahead) da execução de lances, para retomar execuções interrompidas.
+
+Cada consultor tem um arquivo JSONL append-only (`Lances/<consultor>/.diario_execucao.jsonl`).
+Antes de qualquer efeito, a automação registra o estado de cada cota:
+
+    fila -> em_andamento -> sucesso | benigno | critico
+
+Se a execução cair no meio (navegador perdido, GUI fechada, queda de energia), o diário
+fica sem o registro de 'fim'. Na próxima execução para o mesmo consultor, as cotas que
+já terminaram em 'sucesso' ou 'benigno' não são refeitas: seus resultados são copiados
+para o resumo e o relatório da nova execução. Cotas em 'fila', 'em_andamento' ou
+'critico' voltam a ser processadas.
+
+Cada linha é gravada com flush + fsync; uma última linha truncada (queda durante a
+escrita) é ignorada na leitura.
+"""
+
+ESTADOS_CONCLUIDOS = ('sucesso', 'benigno')
+ESTADOS_FINAIS = ('sucesso', 'benigno', 'critico')
+
+# Status da automação -> estado no diário
+ESTADO_POR_STATUS = {'SUCESSO': 'sucesso', 'ERRO_BENIGNO': 'benigno', 'ERRO_CRITICO': 'critico'}
+
+
+def chave_cota(cota_info):
+    """Chave estável da cota no diário (independe da formatação digitada na lista)."""
+    grupo, cota, digito = normalizar_chave_cota(cota_info['grupo'], cota_info['cota'], cota_info['digito'])
+    return f"{grupo}/{cota}-{digito}"
+
+
+class DiarioExecucao:
+    """Diário de uma execução (thread-safe)."""
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self.execucao_id = None
+        self._lock = threading.Lock()
+        self._arquivo = None
+
+    def _ler_registros(self):
+        try:
+            with open(self.caminho, encoding="utf-8") as f:
+                linhas = f.readlines()
+        except FileNotFoundError:
+            return []
+        registros = []
+        for numero, linha in enumerate(linhas, start=1):
+            try:
+                registros.append(json.loads(linha))
+            except ValueError:
+                if numero < len(linhas):
+                    logging.warning(f"Linha {numero} do diário '{self.caminho}' ilegível; ignorada.")
+        return registros
+
+    def execucao_interrompida(self):
+        """Retorna a última execução sem registro de 'fim', ou None.
+
+        Formato: {'id', 'inicio', 'entrada', 'cotas': [chaves], 'estados': {chave: (estado, mensagem)}}.
+        """
+        execucao = None
+        for registro in self._ler_registros():
+            evento = registro.get('evento')
+            if evento == 'inicio':
+                execucao = {
+                    'id': registro['execucao'], 'inicio': registro.get('ts'),
+                    'entrada': registro.get('entrada', ''), 'cotas': registro.get('cotas', []), 'estados': {},
+                }
+            elif evento == 'fim':
+                execucao = None
+            elif evento == 'cota' and execucao is not None:
+                execucao['estados'][registro['cota']] = (registro['estado'], registro.get('mensagem'))
+        return execucao
+
+    def _gravar(self, registro):
+        registro = {'ts': time.time(), 'execucao': self.execucao_id, **registro}
+        with self._lock:
+            self._arquivo.write(json.dumps(registro, ensure_ascii=False) + "\n")
+            self._arquivo.flush()
+            os.fsync(self._arquivo.fileno())
+
+    def iniciar(self, entrada, cotas, anterior=None):
+        """Abre uma nova execução com `cotas` (cota_info) na fila.
+
+        anterior: execução interrompida sendo retomada. Os estados concluídos dela são
+        copiados para esta execução, para que uma nova queda continue retomável.
+        Sem `anterior`, o diário é reiniciado (o histórico já concluído é descartado).
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(self.caminho)), exist_ok=True)
+        self._arquivo = open(self.caminho, "a" if anterior else "w", encoding="utf-8")
+        self.execucao_id = uuid.uuid4().hex[:12]
+        chaves = [chave_cota(c) for c in cotas]
+        herdados = {}
+        if anterior:
+            herdados = {k: v for k, v in anterior['estados'].items() if v[0] in ESTADOS_CONCLUIDOS}
+        self._gravar({
+            'evento': 'inicio', 'entrada': entrada, 'cotas': chaves + list(herdados),
+            'retomada_de': anterior['id'] if anterior else None,
+        })
+        for chave, (estado, mensagem) in herdados.items():
+            self._gravar({'evento': 'cota', 'cota': chave, 'estado': estado, 'mensagem': mensagem, 'herdado': True})
+        for chave in chaves:
+            self._gravar({'evento': 'cota', 'cota': chave, 'estado': 'fila'})
+        return self.execucao_id
+
+    def registrar(self, cota_info, estado, mensagem=None):
+        """Registra a transição de estado de uma cota."""
+        self._gravar({'evento': 'cota', 'cota': chave_cota(cota_info), 'estado': estado, 'mensagem': mensagem})
+
+    def finalizar(self):
+        """Marca a execução como concluída: nada a retomar."""
+        self._gravar({'evento': 'fim'})
+
+    def fechar(self):
+        with self._lock:
+            if self._arquivo is not None:
+                self._arquivo.close()
+                self._arquivo = None
@@ -0,0 +1,71 @@
+import time
+import heapq
+import itertools
+import threading
+
+"""
+Fila de cotas compartilhada entre os navegadores, com reagendamento.
+
+Diferente de `queue.Queue`, cada cota pode ser devolvida com um atraso (`reagendar`):
+ela só volta a ser entregue depois do instante `nao_antes`, sem bloquear as demais.
+A fila também conta as cotas em andamento, para que um navegador sem trabalho
+imediato espere por uma retentativa ainda possível em vez de encerrar cedo: `obter`
+só devolve None quando não há cota na fila nem em andamento (ou se houve parada).
+
+Toda cota entregue por `obter` deve ser resolvida com `concluir`, `reagendar` ou
+`devolver`.
+"""
+
+
+class FilaCotas:
+    """Fila thread-safe de cotas com atraso por item e contagem das cotas em andamento."""
+
+    def __init__(self, cotas=()):
+        self._heap = []
+        self._sequencia = itertools.count()
+        self._em_andamento = 0
+        self._condicao = threading.Condition()
+        for cota_info in cotas:
+            self._empilhar(cota_info, 0.0)
+
+    def _empilhar(self, cota_info, nao_antes):
+        heapq.heappush(self._heap, (nao_antes, next(self._sequencia), cota_info))
+
+    def obter(self, stop_flag=None, intervalo=0.5):
+        """Próxima cota pronta, esperando pelas reagendadas; None quando não resta trabalho."""
+        with self._condicao:
+            while not (stop_flag and stop_flag.is_set()):
+                if self._heap:
+                    espera = self._heap[0][0] - time.monotonic()
+                    if espera <= 0:
+                        _, _, cota_info = heapq.heappop(self._heap)
+                        self._em_andamento += 1
+                        return cota_info
+                elif self._em_andamento == 0:
+                    return None
+                else:
+                    espera = intervalo
+                self._condicao.wait(min(espera, intervalo))
+            return None
+
+    def concluir(self):
+        """A cota obtida terminou com resultado final."""
+        with self._condicao:
+            self._em_andamento -= 1
+            self._condicao.notify_all()
+
+    def reagendar(self, cota_info, atraso):
+        """Devolve a cota obtida ao fim da fila, liberada só depois de `atraso` segundos."""
+        with self._condicao:
+            self._em_andamento -= 1
+            self._empilhar(cota_info, time.monotonic() + atraso)
+            self._condicao.notify_all()
+
+    def devolver(self, cota_info):
+        """Devolve a cota obtida para ser processada de novo assim que possível."""
+        self.reagendar(cota_info, 0.0)
+
+    def pendentes(self):
+        """Quantidade de cotas ainda na fila (não conta as em andamento)."""
+        with self._condicao:
+            return len(self._heap)
@@ -0,0 +1,258 @@
+import os
+import json
+import logging
+import threading
+
+from pdf_parser import parse_cota_from_filename, normalizar_chave_cota
+from monitor_downloads import (
+    InotifyWatcher, inotify_disponivel,
+    IN_CLOSE_WRITE, IN_MOVED_TO, IN_MOVED_FROM, IN_CREATE, IN_DELETE, IN_ONLYDIR,
+    IN_Q_OVERFLOW, IN_IGNORED, IN_ISDIR,
+)
+
+"""
+Índice global dos PDFs de lance de todos os consultores (`Lances/*`).
+
+Mapeia cada cota normalizada (ver `normalizar_chave_cota`) para os arquivos que a
+contêm, em qualquer pasta de consultor, para que uma cota já registrada por outro
+consultor não receba um segundo lance.
+
+O índice é persistido em `Lances/.indice_lances.json` com o mtime de cada pasta. Em
+`atualizar` só as pastas cujo mtime mudou (arquivo criado, renomeado ou apagado) são
+varridas de novo. Com `iniciar_monitor` (Linux), uma thread aplica os eventos do
+inotify arquivo a arquivo, sem varrer nada. Subpastas dos consultores (ex: Conflitos)
+não entram no índice.
+"""
+
+_VERSAO = 1
+
+
+class IndiceGlobalLances:
+    """Índice thread-safe cota -> [(consultor, arquivo)] sobre as pastas de `raiz`."""
+
+    def __init__(self, raiz="Lances", arquivo=None):
+        self.raiz = raiz
+        self.arquivo = arquivo or os.path.join(raiz, ".indice_lances.json")
+        self._pastas = {}      # consultor -> {'mtime_ns': int, 'arquivos': set(nomes)}
+        self._por_chave = {}   # chave normalizada -> set((consultor, nome))
+        self._lock = threading.Lock()
+        self._alterado = False
+        self._monitor = None
+        self._parar = threading.Event()
+        self._carregar()
+
+    # --- Persistência ---
+
+    def _carregar(self):
+        try:
+            with open(self.arquivo, encoding="utf-8") as f:
+                dados = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logging.warning(f"Índice de lances '{self.arquivo}' ilegível ({e}); será refeito.")
+            return
+        if dados.get('versao') != _VERSAO:
+            return
+        for consultor, pasta in dados.get('pastas', {}).items():
+            self._definir_pasta(consultor, pasta['mtime_ns'], pasta['arquivos'])
+        self._alterado = False
+
+    def salvar(self):
+        """Grava o índice (arquivo temporário + os.replace) se ele mudou desde a última gravação.
+
+        A gravação inteira fica sob o lock: o monitor, a GUI e o `main()` podem salvar ao
+        mesmo tempo e dividem o mesmo arquivo temporário.
+        """
+        with self._lock:
+            if not self._alterado:
+                return
+            dados = {'versao': _VERSAO, 'pastas': {
+                consultor: {'mtime_ns': p['mtime_ns'], 'arquivos': sorted(p['arquivos'])}
+                for consultor, p in self._pastas.items()
+            }}
+            os.makedirs(os.path.dirname(os.path.abspath(self.arquivo)), exist_ok=True)
+            temporario = f"{self.arquivo}.tmp"
+            with open(temporario, "w", encoding="utf-8") as f:
+                json.dump(dados, f, ensure_ascii=False)
+            os.replace(temporario, self.arquivo)
+            self._alterado = False
+
+    # --- Manutenção (chamar com o lock) ---
+
+    def _adicionar_arquivo(self, consultor, nome):
+        pasta = self._pastas.setdefault(consultor, {'mtime_ns': None, 'arquivos': set()})
+        if not _eh_pdf_lance(nome) or nome in pasta['arquivos']:
+            return
+        pasta['arquivos'].add(nome)
+        cota = parse_cota_from_filename(nome)
+        if cota:
+            self._por_chave.setdefault(normalizar_chave_cota(*cota), set()).add((consultor, nome))
+        self._alterado = True
+
+    def _remover_arquivo(self, consultor, nome):
+        pasta = self._pastas.get(consultor)
+        if pasta is None or nome not in pasta['arquivos']:
+            return
+        pasta['arquivos'].discard(nome)
+        cota = parse_cota_from_filename(nome)
+        if cota:
+            chave = normalizar_chave_cota(*cota)
+            arquivos = self._por_chave.get(chave, set())
+            arquivos.discard((consultor, nome))
+            if not arquivos:
+                self._por_chave.pop(chave, None)
+        self._alterado = True
+
+    def _remover_pasta(self, consultor):
+        for nome in list(self._pastas.get(consultor, {}).get('arquivos', ())):
+            self._remover_arquivo(consultor, nome)
+        if self._pastas.pop(consultor, None) is not None:
+            self._alterado = True
+
+    def _definir_pasta(self, consultor, mtime_ns, arquivos):
+        self._remover_pasta(consultor)
+        for nome in arquivos:
+            self._adicionar_arquivo(consultor, nome)
+        self._pastas.setdefault(consultor, {'mtime_ns': None, 'arquivos': set()})['mtime_ns'] = mtime_ns
+        self._alterado = True
+
+    def _varrer_pasta(self, consultor):
+        caminho = os.path.join(self.raiz, consultor)
+        try:
+            mtime_ns = os.stat(caminho).st_mtime_ns
+            with os.scandir(caminho) as entradas:
+                arquivos = [e.name for e in entradas if _eh_pdf_lance(e.name) and e.is_file()]
+        except FileNotFoundError:
+            self._remover_pasta(consultor)
+            return
+        self._definir_pasta(consultor, mtime_ns, arquivos)
+
+    # --- API ---
+
+    def atualizar(self):
+        """Varre de novo só as pastas novas ou com mtime diferente do indexado. Retorna quantas varreu."""
+        try:
+            with os.scandir(self.raiz) as entradas:
+                atuais = {e.name: e.stat().st_mtime_ns for e in entradas if e.is_dir()}
+        except FileNotFoundError:
+            atuais = {}
+        varridas = 0
+        with self._lock:
+            for consultor in set(self._pastas) - set(atuais):
+                self._remover_pasta(consultor)
+            for consultor, mtime_ns in atuais.items():
+                if self._pastas.get(consultor, {}).get('mtime_ns') != mtime_ns:
+                    self._varrer_pasta(consultor)
+                    varridas += 1
+        try:
+            self.salvar()
+        except OSError as e:
+            logging.warning(f"Não foi possível gravar o índice de lances '{self.arquivo}': {e}")
+        return varridas
+
+    def localizar(self, grupo, cota, digito):
+        """[(consultor, arquivo)] que já contêm a cota, em ordem alfabética."""
+        with self._lock:
+            return sorted(self._por_chave.get(normalizar_chave_cota(grupo, cota, digito), ()))
+
+    def caminho(self, consultor, nome):
+        return os.path.join(self.raiz, consultor, nome)
+
+    # --- Monitor (inotify) ---
+
+    def iniciar_monitor(self):
+        """Mantém o índice atualizado por eventos do inotify. Retorna False se indisponível."""
+        if self._monitor is not None:
+            return True
+        if not inotify_disponivel():
+            return False
+        os.makedirs(self.raiz, exist_ok=True)
+        try:
+            watcher = InotifyWatcher()
+            watcher.adicionar(self.raiz, IN_CREATE | IN_DELETE | IN_MOVED_TO | IN_MOVED_FROM | IN_ONLYDIR)
+        except OSError as e:
+            logging.warning(f"Monitor do índice de lances indisponível: {e}")
+            return False
+        self._parar.clear()
+        self._monitor = threading.Thread(target=self._monitorar, args=(watcher,), name="IndiceLances", daemon=True)
+        self._monitor.start()
+        return True
+
+    def parar_monitor(self):
+        if self._monitor is not None:
+            self._parar.set()
+            self._monitor.join(timeout=2)
+            self._monitor = None
+
+    def _observar_pasta(self, watcher, consultor, pastas_wd):
+        try:
+            wd = watcher.adicionar(
+                os.path.join(self.raiz, consultor),
+                IN_CLOSE_WRITE | IN_CREATE | IN_DELETE | IN_MOVED_TO | IN_MOVED_FROM,
+            )
+        except OSError:
+            return
+        pastas_wd[wd] = consultor
+
+    def _monitorar(self, watcher):
+        pastas_wd = {}
+        try:
+            # Watches primeiro, varredura depois: nada que mude no meio fica de fora
+            with os.scandir(self.raiz) as entradas:
+                for entrada in entradas:
+                    if entrada.is_dir():
+                        self._observar_pasta(watcher, entrada.name, pastas_wd)
+            self.atualizar()
+            while not self._parar.is_set():
+                eventos = watcher.ler_eventos(0.5)
+                if not eventos:
+                    continue
+                tocadas = set()
+                for wd, mask, nome in eventos:
+                    if mask & IN_Q_OVERFLOW:
+                        logging.warning("Fila do inotify transbordou; conferindo as pastas de lances pelo mtime.")
+                        with self._lock:
+                            for pasta in self._pastas.values():
+                                pasta['mtime_ns'] = None
+                        self.atualizar()
+                    elif mask & IN_IGNORED:
+                        pastas_wd.pop(wd, None)
+                    elif wd not in pastas_wd:
+                        # Evento na raiz: pasta de consultor criada, renomeada ou apagada
+                        if not mask & IN_ISDIR:
+                            continue
+                        if mask & (IN_CREATE | IN_MOVED_TO):
+                            self._observar_pasta(watcher, nome, pastas_wd)
+                            with self._lock:
+                                self._varrer_pasta(nome)
+                        else:
+                            with self._lock:
+                                self._remover_pasta(nome)
+                    elif not mask & IN_ISDIR:
+                        consultor = pastas_wd[wd]
+                        tocadas.add(consultor)
+                        with self._lock:
+                            if mask & (IN_DELETE | IN_MOVED_FROM):
+                                self._remover_arquivo(consultor, nome)
+                            elif os.path.isfile(os.path.join(self.raiz, consultor, nome)):
+                                self._adicionar_arquivo(consultor, nome)
+                with self._lock:
+                    # Eventos aplicados: o mtime atual já está refletido no índice
+                    for consultor in tocadas:
+                        try:
+                            self._pastas[consultor]['mtime_ns'] = os.stat(os.path.join(self.raiz, consultor)).st_mtime_ns
+                        except (OSError, KeyError):
+                            pass
+                try:
+                    self.salvar()
+                except OSError as e:
+                    logging.warning(f"Não foi possível gravar o índice de lances '{self.arquivo}': {e}")
+        except Exception as e:
+            logging.error(f"Monitor do índice de lances encerrado: {e}", exc_info=True)
+        finally:
+            watcher.fechar()
+
+
+def _eh_pdf_lance(nome):
+    return nome.upper().startswith("LANCE") and nome.lower().endswith(".pdf")
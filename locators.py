@@ -54,6 +54,17 @@ class ServopaGroupLocators:
     # Mapeado de 'BTN_BUSCAR_ID' da versão anterior.
     SEARCH_GROUP_BUTTON = (By.ID, "btn_busca_usuario")
 
+    # Tabela de resultados da busca: linhas clicáveis (com onclick) dentro do primeiro <tbody>
+    RESULT_BODY = (By.XPATH, "//tbody")
+    RESULT_ROW_CSS = "tr[onclick]"
+    # Índice (0-based) da coluna de status ("ATIVO", ...) na linha de resultado
+    RESULT_STATUS_COL = 7
+    # Índices (0-based) das colunas de cota e dígito, lidas na busca só por grupo.
+    # CHUTE: conferidos apenas no portal simulado; se não baterem com o portal real, a busca
+    # por grupo se desativa sozinha (valores não numéricos ou nenhuma cota da lista na tabela)
+    RESULT_COTA_COL = 1
+    RESULT_DIGITO_COL = 2
+
 class ServopaLanceLocators:
     """Localizadores para a página de oferta de lances."""
     # --- Localizadores da lógica antiga, mais robustos ---
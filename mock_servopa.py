@@ -0,0 +1,451 @@
+import sys
+import time
+import html
+import json
+import uuid
+import random
+import threading
+import urllib.parse
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+"""
+Servidor local que imita o portal Servopa, para benchmarks sem tocar o portal real.
+
+As páginas reproduzem a estrutura esperada pelos localizadores de 'locators.py'
+(login, busca por cota ou só por grupo, tabela de resultados, Extrato e página de
+lances) e carregam recursos "pesados" (imagens e fontes web servidas com atraso) como o
+portal real. Busca, Simular e Registrar são formulários POST (com token de sessão); o
+Registrar devolve o PDF do lance, o modal de bloqueio de assembleia ou, após Simular, o
+protocolo anterior.
+
+Para exercitar os caminhos de espera e de erro, o mock pode injetar atraso nas páginas,
+o overlay '.pace-active' (inclusive preso), uma requisição XHR lenta após o carregamento,
+páginas de CAPTCHA e modais de bloqueio de assembleia, com probabilidades configuráveis.
+
+Uso: python mock_servopa.py [porta]
+"""
+
+CPF_CNPJ_MOCK = "00000000000"
+SENHA_MOCK = "senha-mock"
+
+_PNG_1X1 = bytes.fromhex(
+    "89504e470d0a1a0a0000000d4948445200000001000000010806000000"
+    "1f15c4890000000d49444154789c6360000002000100e221bc330000000049454e44ae426082"
+)
+
+_CSS = """
+@font-face { font-family: 'ServopaMock'; src: url('/static/fonte.woff2') format('woff2'); }
+body { font-family: 'ServopaMock', sans-serif; margin: 0; }
+aside#main-nav { float: left; width: 200px; }
+main { margin-left: 210px; }
+.submenu { display: none; }
+.submenu.aberto { display: block; }
+.pace { position: fixed; top: 0; left: 0; width: 100%; height: 3px; background: #c00; }
+.pace-inactive { display: none; }
+.hidden { display: none; }
+.galeria img { width: 120px; height: 80px; }
+"""
+
+
+class ServopaMock:
+    """Portal Servopa local (http.server), iniciado em uma thread.
+
+    porta: 0 escolhe uma porta livre.
+    atraso_recursos: segundos de atraso ao servir cada imagem/fonte.
+    num_imagens: imagens decorativas por página.
+    atraso_paginas: segundos de "processamento" do servidor antes de cada página HTML.
+    pace_ms: se > 0, as páginas exibem o '.pace-active' por esse tempo após carregar.
+    prob_pace_preso: probabilidade de o '.pace-active' nunca sair (loading infinito do portal).
+    atraso_xhr: se > 0, cada página dispara um fetch que o servidor responde após esse tempo.
+    prob_captcha: probabilidade de uma página HTML ser trocada pela tela de CAPTCHA.
+    prob_bloqueio: probabilidade de o Registrar exibir o modal de bloqueio de assembleia.
+    semente: semente do sorteio, para execuções reproduzíveis.
+    """
+
+    def __init__(self, porta=0, atraso_recursos=0.15, num_imagens=6, tamanho_imagem=20 * 1024,
+                 atraso_paginas=0.0, pace_ms=0, prob_pace_preso=0.0, atraso_xhr=0.0,
+                 prob_captcha=0.0, prob_bloqueio=0.0, semente=None):
+        self.atraso_recursos = atraso_recursos
+        self.num_imagens = num_imagens
+        self.tamanho_imagem = tamanho_imagem
+        self.atraso_paginas = atraso_paginas
+        self.pace_ms = pace_ms
+        self.prob_pace_preso = prob_pace_preso
+        self.atraso_xhr = atraso_xhr
+        self.prob_captcha = prob_captcha
+        self.prob_bloqueio = prob_bloqueio
+        self._sorteio = random.Random(semente)
+        # Quantas vezes cada evento aconteceu (páginas, captchas, bloqueios, pace preso, registros)
+        self.contadores = {"paginas": 0, "captchas": 0, "bloqueios": 0, "pace_preso": 0, "registros": 0}
+        # Cotas conhecidas: (grupo, cota, digito) -> dados. Cotas ausentes são geradas como ATIVAS de Lance Fixo.
+        self.cotas = {}
+        self.sessoes = {}
+        # Lances registrados: [(grupo, cota, digito, campos do formulário)]
+        self.registros = []
+        self._lock = threading.Lock()
+        self._servidor = ThreadingHTTPServer(("127.0.0.1", porta), _HandlerServopa)
+        self._servidor.daemon_threads = True
+        self._servidor.mock = self
+        self._thread = None
+
+    @property
+    def url(self):
+        host, porta = self._servidor.server_address[:2]
+        return f"http://{host}:{porta}"
+
+    def iniciar(self):
+        self._thread = threading.Thread(target=self._servidor.serve_forever, name="ServopaMock", daemon=True)
+        self._thread.start()
+        return self.url
+
+    def parar(self):
+        self._servidor.shutdown()
+        self._servidor.server_close()
+
+    def __enter__(self):
+        self.iniciar()
+        return self
+
+    def __exit__(self, *exc):
+        self.parar()
+
+    def adicionar_cota(self, grupo, cota, digito, nome="CLIENTE MOCK DA SILVA", status="ATIVO",
+                       extrato="normal", lance="F", protocolo=False, bloqueio=None):
+        """Cadastra uma cota no mock.
+
+        extrato: 'normal', 'cancelado' ou 'contemplado'.
+        lance: 'F' (Fixo), 'L' (Livre) ou 'fidelidade'.
+        protocolo: True se a cota já tem lance registrado (protocolo anterior após Simular).
+        bloqueio: texto do modal exibido ao Registrar (bloqueio de assembleia), ou None.
+        """
+        self.cotas[(str(grupo), str(int(cota)), str(digito))] = {
+            "nome": nome, "status": status, "extrato": extrato, "lance": lance,
+            "protocolo": protocolo, "bloqueio": bloqueio,
+        }
+
+    def sortear(self, probabilidade, contador=None):
+        """True com a `probabilidade` dada; conta o evento em `contadores[contador]`."""
+        with self._lock:
+            ocorreu = probabilidade > 0 and self._sorteio.random() < probabilidade
+            if ocorreu and contador:
+                self.contadores[contador] += 1
+        return ocorreu
+
+    def contar(self, contador):
+        with self._lock:
+            self.contadores[contador] += 1
+
+    def dados_cota(self, grupo, cota, digito):
+        try:
+            chave = (str(grupo), str(int(cota)), str(digito))
+        except ValueError:
+            return None
+        return self.cotas.get(chave) or {
+            "nome": "CLIENTE MOCK DA SILVA", "status": "ATIVO", "extrato": "normal", "lance": "F",
+            "protocolo": False, "bloqueio": None,
+        }
+
+
+class _HandlerServopa(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    @property
+    def mock(self):
+        return self.server.mock
+
+    # --- Infraestrutura ---
+
+    def _sessao(self):
+        cookies = self.headers.get("Cookie", "")
+        for par in cookies.split(";"):
+            nome, _, valor = par.strip().partition("=")
+            if nome == "PHPSESSID":
+                return self.mock.sessoes.get(valor)
+        return None
+
+    def _responder(self, corpo, status=200, tipo="text/html; charset=utf-8", cabecalhos=None):
+        if isinstance(corpo, str):
+            corpo = corpo.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", tipo)
+        self.send_header("Content-Length", str(len(corpo)))
+        for nome, valor in (cabecalhos or {}).items():
+            self.send_header(nome, valor)
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(corpo)
+
+    def _redirecionar(self, destino, cabecalhos=None):
+        cabecalhos = dict(cabecalhos or {})
+        cabecalhos["Location"] = destino
+        self._responder("", status=302, cabecalhos=cabecalhos)
+
+    def _ler_formulario(self):
+        tamanho = int(self.headers.get("Content-Length") or 0)
+        corpo = self.rfile.read(tamanho).decode("utf-8") if tamanho else ""
+        return {k: v[0] for k, v in urllib.parse.parse_qs(corpo, keep_blank_values=True).items()}
+
+    def _pagina(self, titulo, conteudo, logado=True):
+        m = self.mock
+        m.contar("paginas")
+        if m.sortear(m.prob_captcha, "captchas"):
+            titulo, conteudo = "Verificação de segurança", (
+                '<div class="captcha"><span>Confirme que é humano</span>'
+                '<div class="g-recaptcha" data-sitekey="mock"></div></div>'
+            )
+        scripts = ""
+        if m.pace_ms > 0:
+            preso = m.sortear(m.prob_pace_preso, "pace_preso")
+            scripts += (
+                '<div class="pace pace-active"></div><script>'
+                "document.body.classList.add('pace-running');"
+                + ("" if preso else
+                   "window.addEventListener('load', () => setTimeout(() => {"
+                   "const p = document.querySelector('.pace');"
+                   "p.classList.replace('pace-active', 'pace-inactive');"
+                   f"document.body.classList.remove('pace-running'); }}, {int(m.pace_ms)}));")
+                + "</script>"
+            )
+        if m.atraso_xhr > 0:
+            scripts += "<script>window.addEventListener('load', () => fetch('/api/status'));</script>"
+        imagens = "".join(f'<img src="/static/img-{i}.png?t={time.time_ns()}" alt="">' for i in range(m.num_imagens))
+        menu = ""
+        if logado:
+            menu = (
+                '<ul class="menu"><li><a href="#" class="menu-admin" onclick="'
+                "this.nextElementSibling.classList.toggle('aberto'); return false;\">Ferramentas Admin</a>"
+                f'<ul class="submenu"><li><a href="{m.url}/vendas/buscar">Buscar</a></li></ul></li></ul>'
+                '<a href="/logout">Sair</a>'
+            )
+        return (
+            '<!DOCTYPE html><html><head><meta charset="utf-8"><title>Consórcio Servopa (mock)</title>'
+            '<link rel="stylesheet" href="/static/estilo.css"></head><body>'
+            '<aside id="main-nav"><a href="/home"><img src="/static/logo.png" alt="Consórcio Servopa"></a>'
+            f"{menu}</aside>"
+            f'<main><section class="main-view"><div><h2>{html.escape(titulo)}</h2></div>{conteudo}</section></main>'
+            f'<div class="galeria">{imagens}</div>{scripts}'
+            "</body></html>"
+        )
+
+    # --- Roteamento ---
+
+    def do_HEAD(self):
+        self.do_GET()
+
+    def do_GET(self):
+        url = urllib.parse.urlsplit(self.path)
+        query = {k: v[0] for k, v in urllib.parse.parse_qs(url.query).items()}
+        if url.path.startswith("/static/"):
+            return self._static(url.path)
+        if url.path == "/api/status":
+            time.sleep(self.mock.atraso_xhr)
+            return self._responder(json.dumps({"ok": True}), tipo="application/json")
+        time.sleep(self.mock.atraso_paginas)
+        if url.path in ("/", "/login"):
+            return self._pagina_login()
+        sessao = self._sessao()
+        if sessao is None:
+            return self._redirecionar("/")
+        if url.path == "/logout":
+            return self._redirecionar("/", {"Set-Cookie": "PHPSESSID=; Max-Age=0; Path=/"})
+        if url.path == "/home":
+            return self._responder(self._pagina("Início", "<p>Bem-vindo ao portal (mock).</p>"))
+        if url.path == "/vendas/buscar":
+            return self._pagina_buscar(sessao, {})
+        if url.path == "/vendas/extrato":
+            return self._pagina_extrato(sessao, query)
+        if url.path == "/vendas/lances":
+            return self._pagina_lances(sessao)
+        self._responder(self._pagina("Página não encontrada", ""), status=404)
+
+    def do_POST(self):
+        url = urllib.parse.urlsplit(self.path)
+        time.sleep(self.mock.atraso_paginas)
+        if url.path in ("/", "/login"):
+            return self._post_login()
+        sessao = self._sessao()
+        if sessao is None:
+            return self._redirecionar("/")
+        form = self._ler_formulario()
+        if url.path == "/vendas/buscar":
+            return self._pagina_buscar(sessao, form)
+        if url.path == "/vendas/lances":
+            if form.get("_token") != sessao["token"]:
+                return self._responder(self._pagina("Sessão expirada", ""), status=419)
+            if form.get("acao") == "simular":
+                return self._post_simular(sessao, form)
+            if form.get("acao") == "registrar":
+                return self._post_registrar(sessao, form)
+        self._responder(self._pagina("Página não encontrada", ""), status=404)
+
+    # --- Recursos estáticos (servidos com atraso, como o portal real) ---
+
+    def _static(self, caminho):
+        m = self.mock
+        if caminho == "/static/estilo.css":
+            return self._responder(_CSS, tipo="text/css")
+        if caminho.endswith(".png"):
+            time.sleep(m.atraso_recursos)
+            corpo = _PNG_1X1 + b"\0" * max(0, m.tamanho_imagem - len(_PNG_1X1))
+            return self._responder(corpo, tipo="image/png")
+        if caminho.endswith(".woff2"):
+            time.sleep(m.atraso_recursos)
+            return self._responder(b"\0" * 40 * 1024, tipo="font/woff2")
+        self._responder("", status=404, tipo="text/plain")
+
+    # --- Páginas ---
+
+    def _pagina_login(self, erro=False):
+        mensagem = '<div class="error">CPF/CNPJ ou senha inválidos!</div>' if erro else ""
+        conteudo = (
+            f"{mensagem}<form method=\"post\" action=\"/login\">"
+            '<input id="representante_cpf_cnpj" name="cpf_cnpj" type="text">'
+            '<input id="representante_senha" name="senha" type="password">'
+            '<button id="btn_representante" type="submit">Entrar</button></form>'
+        )
+        self._responder(self._pagina("Acesso do Representante", conteudo, logado=False))
+
+    def _post_login(self):
+        form = self._ler_formulario()
+        if form.get("cpf_cnpj") != CPF_CNPJ_MOCK or form.get("senha") != SENHA_MOCK:
+            return self._pagina_login(erro=True)
+        sid = uuid.uuid4().hex
+        with self.mock._lock:
+            self.mock.sessoes[sid] = {"cota": None, "token": uuid.uuid4().hex}
+        self._redirecionar("/home", {"Set-Cookie": f"PHPSESSID={sid}; Path=/"})
+
+    def _pagina_buscar(self, sessao, form):
+        grupo, cota, digito = form.get("grupo", ""), form.get("plano", ""), form.get("digito", "")
+        formulario = (
+            '<form method="post" action="/vendas/buscar">'
+            f'<input id="grupo" name="grupo" type="text" value="">'
+            f'<input id="plano" name="plano" type="text" value="">'
+            f'<input id="digito" name="digito" type="text" value="">'
+            '<button id="btn_busca_usuario" type="submit">Buscar</button></form>'
+        )
+        tabela = ""
+        if grupo:
+            if not cota and not digito:
+                # Busca só pelo grupo: todas as cotas cadastradas dele
+                encontradas = [(c, d, dados) for (g, c, d), dados in sorted(self.mock.cotas.items()) if g == grupo]
+            else:
+                dados = self.mock.dados_cota(grupo, cota, digito) if cota and digito else None
+                encontradas = [(cota, digito, dados)] if dados else []
+            linhas = []
+            for cota_linha, digito_linha, dados in encontradas:
+                if dados["status"] == "INEXISTENTE":
+                    continue
+                alvo = f"/vendas/extrato?grupo={grupo}&plano={int(cota_linha)}&digito={digito_linha}"
+                celulas = [grupo, cota_linha, digito_linha, html.escape(dados["nome"]), "-", "-", "-", dados["status"]]
+                linhas.append(
+                    f"<tr onclick=\"location.href='{alvo}'\">" + "".join(f"<td>{c}</td>" for c in celulas) + "</tr>"
+                )
+            tabela = (
+                "<table><thead><tr><th>Grupo</th><th>Cota</th><th>Dígito</th><th>Nome</th>"
+                "<th></th><th></th><th></th><th>Status</th></tr></thead>"
+                f"<tbody>{''.join(linhas)}</tbody></table>"
+            )
+        self._responder(self._pagina("Buscar", formulario + tabela))
+
+    def _pagina_extrato(self, sessao, query):
+        dados = self.mock.dados_cota(query.get("grupo"), query.get("plano", "0"), query.get("digito"))
+        if dados is None:
+            return self._redirecionar("/vendas/buscar")
+        sessao["cota"] = (query.get("grupo"), query.get("plano"), query.get("digito"))
+        titulo = "Extrato - Cancelado" if dados["extrato"] == "cancelado" else "Extrato"
+        contemplado = ""
+        if dados["extrato"] == "contemplado":
+            contemplado = '<div class="message-block error">Cota já está contemplada</div>'
+        conteudo = (
+            f'{contemplado}<div class="cliente"><span>Consorciado</span><h3>{html.escape(dados["nome"])}</h3></div>'
+        )
+        self._responder(self._pagina(titulo, conteudo))
+
+    def _pagina_lances(self, sessao):
+        if not sessao.get("cota"):
+            return self._redirecionar("/vendas/buscar")
+        grupo, cota, digito = sessao["cota"]
+        dados = self.mock.dados_cota(grupo, cota, digito)
+        abas = []
+        for rotulo, codigo in (("Fixo", "F"), ("Livre", "L")):
+            ativo = ' class="active"' if dados["lance"] == codigo else ""
+            abas.append(f'<a href="#"{ativo} data-lance="{codigo}">{rotulo}</a>')
+        if dados["lance"] == "fidelidade":
+            abas.append('<a href="#" class="active" data-lance="D">Fidelidade</a>')
+        campos_livre = "" if dados["lance"] == "L" else ' class="hidden"'
+        conteudo = (
+            f'<div class="cliente"><span>Consorciado</span><h3>{html.escape(dados["nome"])}</h3></div>'
+            f'<div class="tab-switcher">{"".join(abas)}</div>'
+            '<form method="post" action="/vendas/lances">'
+            f'<input type="hidden" name="_token" value="{sessao["token"]}">'
+            f'<input type="hidden" name="tipo_lance" value="{dados["lance"]}">'
+            f'<div{campos_livre}><input id="tx_lanliv" name="tx_lanliv" type="text">'
+            '<input id="tx_lanliv_emb" name="tx_lanliv_emb" type="text"></div>'
+            '<button id="btn_simular" type="submit" name="acao" value="simular">Simular Lance</button></form>'
+        )
+        self._responder(self._pagina("Ofertar Lance", conteudo))
+
+    def _post_simular(self, sessao, form):
+        if not sessao.get("cota"):
+            return self._redirecionar("/vendas/buscar")
+        dados = self.mock.dados_cota(*sessao["cota"])
+        cliente = f'<div class="cliente"><span>Consorciado</span><h3>{html.escape(dados["nome"])}</h3></div>'
+        if dados["protocolo"]:
+            conteudo = (
+                f'{cliente}<p>Já existe um lance registrado para esta cota.</p>'
+                '<input id="num_protocolo_ant" type="text" value="2025000123" readonly>'
+            )
+            return self._responder(self._pagina("Ofertar Lance", conteudo))
+        if dados["lance"] == "L" and not (form.get("tx_lanliv") and form.get("tx_lanliv_emb")):
+            return self._responder(self._pagina("Ofertar Lance", f'{cliente}<div class="error">Informe o percentual.</div>'))
+        ocultos = "".join(
+            f'<input type="hidden" name="{html.escape(k)}" value="{html.escape(v)}">'
+            for k, v in form.items() if k != "acao"
+        )
+        conteudo = (
+            f'{cliente}<div class="simulacao"><p>Simulação do lance concluída.</p></div>'
+            f'<form method="post" action="/vendas/lances">{ocultos}'
+            '<button type="submit" name="acao" value="registrar">Registrar</button></form>'
+        )
+        self._responder(self._pagina("Ofertar Lance", conteudo))
+
+    def _post_registrar(self, sessao, form):
+        if not sessao.get("cota"):
+            return self._redirecionar("/vendas/buscar")
+        grupo, cota, digito = sessao["cota"]
+        dados = self.mock.dados_cota(grupo, cota, digito)
+        bloqueio = dados["bloqueio"]
+        if not bloqueio and self.mock.sortear(self.mock.prob_bloqueio, "bloqueios"):
+            bloqueio = "Não é possível registrar o lance: grupo em período de assembleia."
+        if bloqueio:
+            modal = (
+                '<div class="swal2-container"><div class="swal2-popup">'
+                f'<div class="swal2-html-container">{html.escape(bloqueio)}</div>'
+                '<button class="swal2-confirm">OK</button></div></div>'
+            )
+            return self._responder(self._pagina("Ofertar Lance", modal))
+        with self.mock._lock:
+            self.mock.registros.append((grupo, cota, digito, dict(form)))
+            self.mock.contadores["registros"] += 1
+        pdf = (
+            b"%PDF-1.4\n1 0 obj << /Type /Catalog >> endobj\n"
+            + f"% Lance {grupo}/{cota}-{digito} {dados['nome']}\n".encode("latin-1", "replace")
+            + b"%%EOF\n"
+        )
+        self._responder(pdf, tipo="application/pdf", cabecalhos={
+            "Content-Disposition": f'attachment; filename="lance-{grupo}-{cota}-{digito}.pdf"',
+        })
+
+
+if __name__ == "__main__":
+    porta = int(sys.argv[1]) if len(sys.argv) > 1 else 8765
+    mock = ServopaMock(porta=porta)
+    print(f"Portal Servopa (mock) em {mock.iniciar()} - login: {CPF_CNPJ_MOCK} / {SENHA_MOCK}")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        mock.parar()
@@ -0,0 +1,194 @@
+import os
+import sys
+import time
+import errno
+import select
+import struct
+import ctypes
+import ctypes.util
+import logging
+
+"""
+Detecção de downloads finalizados por eventos do sistema de arquivos.
+
+No Linux usa o inotify (via ctypes, sem dependências extras) para ser avisado no
+exato momento em que o Firefox finaliza o arquivo. O Firefox grava o download em
+'arquivo.pdf.part' e, ao terminar, renomeia para 'arquivo.pdf' (evento IN_MOVED_TO);
+o 'arquivo.pdf' vazio criado no início do download também gera IN_CLOSE_WRITE, por
+isso um PDF só é entregue quando não existe mais o '.part' e o tamanho é maior que zero.
+
+Em outros sistemas (ex: Windows) `inotify_disponivel()` retorna False e o chamador
+deve usar a verificação por polling.
+"""
+
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_ONLYDIR = 0x01000000
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+_EVENT_HEADER = struct.Struct("iIII")
+
+_libc = None
+
+
+def _carregar_libc():
+    global _libc
+    if _libc is None:
+        nome = ctypes.util.find_library("c") or "libc.so.6"
+        libc = ctypes.CDLL(nome, use_errno=True)
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+        _libc = libc
+    return _libc
+
+
+def inotify_disponivel():
+    """Retorna True se o inotify puder ser usado neste sistema."""
+    if not sys.platform.startswith("linux"):
+        return False
+    try:
+        libc = _carregar_libc()
+        return hasattr(libc, "inotify_init1")
+    except (OSError, AttributeError):
+        return False
+
+
+class InotifyWatcher:
+    """Wrapper mínimo sobre o inotify: observa diretórios e entrega eventos (wd, mask, nome)."""
+
+    def __init__(self):
+        libc = _carregar_libc()
+        fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, f"inotify_init1 falhou: {os.strerror(err)}")
+        self.fd = fd
+        self.diretorios = {}
+
+    def adicionar(self, pasta, mascara=IN_CLOSE_WRITE | IN_MOVED_TO):
+        """Passa a observar `pasta`. Retorna o watch descriptor."""
+        wd = _libc.inotify_add_watch(self.fd, os.fsencode(pasta), mascara)
+        if wd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, f"inotify_add_watch falhou para '{pasta}': {os.strerror(err)}")
+        self.diretorios[wd] = pasta
+        return wd
+
+    def remover(self, wd):
+        if self.diretorios.pop(wd, None) is not None:
+            _libc.inotify_rm_watch(self.fd, wd)
+
+    def ler_eventos(self, timeout):
+        """Aguarda até `timeout` segundos e retorna a lista de eventos (wd, mask, nome) disponíveis."""
+        try:
+            prontos, _, _ = select.select([self.fd], [], [], max(0, timeout))
+        except InterruptedError:
+            return []
+        if not prontos:
+            return []
+        try:
+            dados = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        except OSError as e:
+            if e.errno == errno.EAGAIN:
+                return []
+            raise
+        eventos = []
+        pos = 0
+        while pos + _EVENT_HEADER.size <= len(dados):
+            wd, mask, _cookie, tamanho = _EVENT_HEADER.unpack_from(dados, pos)
+            pos += _EVENT_HEADER.size
+            nome = dados[pos:pos + tamanho].rstrip(b"\0")
+            pos += tamanho
+            eventos.append((wd, mask, os.fsdecode(nome)))
+        return eventos
+
+    def fechar(self):
+        if self.fd is not None:
+            try:
+                os.close(self.fd)
+            finally:
+                self.fd = None
+                self.diretorios.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+
+
+class MonitorPastaDownload:
+    """Observa uma pasta de downloads e entrega, em ordem de chegada, os PDFs finalizados.
+
+    ignorar: nomes que já estavam na pasta e nunca devem ser entregues.
+    """
+
+    def __init__(self, pasta, ignorar=()):
+        self.pasta = pasta
+        self.ignorar = set(ignorar)
+        self._entregues = set()
+        self._pendentes = []
+        self._watcher = InotifyWatcher()
+        try:
+            self._watcher.adicionar(pasta, IN_CLOSE_WRITE | IN_MOVED_TO)
+        except OSError:
+            self._watcher.fechar()
+            raise
+        # Varre uma vez depois de criar o watch: cobre o arquivo que terminou antes do monitor existir
+        for nome in sorted(os.listdir(pasta)):
+            self._considerar(nome)
+
+    def _finalizado(self, nome):
+        if not nome.lower().endswith(".pdf") or nome in self.ignorar or nome in self._entregues:
+            return False
+        caminho = os.path.join(self.pasta, nome)
+        if os.path.exists(caminho + ".part"):
+            return False
+        try:
+            return os.path.getsize(caminho) > 0
+        except OSError:
+            return False
+
+    def _considerar(self, nome):
+        if nome not in self._pendentes and self._finalizado(nome):
+            self._pendentes.append(nome)
+
+    def proximo_pdf(self, timeout):
+        """Retorna o nome do próximo PDF finalizado, ou None se nada chegar em `timeout` segundos."""
+        limite = time.monotonic() + timeout
+        while True:
+            while self._pendentes:
+                nome = self._pendentes.pop(0)
+                if self._finalizado(nome):
+                    self._entregues.add(nome)
+                    return nome
+            restante = limite - time.monotonic()
+            if restante <= 0:
+                return None
+            for _wd, mask, nome in self._watcher.ler_eventos(restante):
+                if mask & IN_Q_OVERFLOW:
+                    logging.warning("Fila do inotify transbordou; revarrendo a pasta de downloads.")
+                    for existente in sorted(os.listdir(self.pasta)):
+                        self._considerar(existente)
+                elif nome and not mask & IN_ISDIR:
+                    self._considerar(nome)
+
+    def fechar(self):
+        self._watcher.fechar()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
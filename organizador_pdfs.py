@@ -0,0 +1,148 @@
+import os
+import time
+import sqlite3
+import logging
+import threading
+
+from cache_extracao import CacheExtracaoPdf
+from pdf_parser import organizar_pdf, VERSAO_EXTRATOR
+from monitor_downloads import (
+    InotifyWatcher, inotify_disponivel, IN_CLOSE_WRITE, IN_MOVED_TO, IN_Q_OVERFLOW, IN_ISDIR,
+)
+
+"""
+Organizador de PDFs em segundo plano, ativo durante a execução da automação.
+
+Observa com inotify a pasta do consultor (`Lances/<consultor>`); `DOWNLOAD_DIR` e as
+subpastas `navegador-N` são dos navegadores e não são tocadas. Cada PDF novo é lido uma
+vez por uma thread, passando pelo cache de extração da pasta, e arquivado na hora com o
+nome padrão (ou vai para a quarentena, se o nome já estiver ocupado): a mesma regra de
+`verificar_e_corrigir_nomes_pdf`.
+
+Como tudo o que chegou já foi lido e está no cache, a verificação automática do fim do
+`main()` não relê nenhum PDF: só confere a listagem contra o cache.
+"""
+
+
+class OrganizadorPdfs:
+    """Arquiva os PDFs assim que chegam. `iniciar()` retorna False se o inotify não estiver disponível."""
+
+    def __init__(self, consultor_path, usar_cache=True, verificar_conteudo=False):
+        self.consultor_path = consultor_path
+        self.usar_cache = usar_cache
+        self.verificar_conteudo = verificar_conteudo
+        self.contadores = {'correto': 0, 'renomeado': 0, 'conflito': 0, 'erro': 0}
+        self._wd = None
+        self._pendentes = []
+        self._arquivados = set()  # nomes que o próprio organizador acabou de criar na pasta do consultor
+        self._parar = threading.Event()
+        self._inicio = None
+        self._thread = None
+        self._watcher = None
+        self._cache = None
+
+    def iniciar(self):
+        if self._thread is not None:
+            return True
+        if not inotify_disponivel():
+            return False
+        try:
+            self._watcher = InotifyWatcher()
+            self._wd = self._watcher.adicionar(self.consultor_path, IN_CLOSE_WRITE | IN_MOVED_TO)
+        except OSError as e:
+            logging.warning(f"Organizador de PDFs indisponível: {e}")
+            if self._watcher:
+                self._watcher.fechar()
+            return False
+        if self.usar_cache:
+            try:
+                self._cache = CacheExtracaoPdf(self.consultor_path, verificar_conteudo=self.verificar_conteudo,
+                                               versao_extrator=VERSAO_EXTRATOR)
+            except (sqlite3.Error, OSError) as e:
+                logging.warning(f"Cache de extração indisponível para o organizador ({e}); os PDFs serão lidos sem cache.")
+        self._parar.clear()
+        self._inicio = time.time()
+        self._thread = threading.Thread(target=self._executar, name="OrganizadorPdfs", daemon=True)
+        self._thread.start()
+        logging.info(f"Organizador de PDFs ativo em: {self.consultor_path}")
+        return True
+
+    def parar(self, timeout=60):
+        """Arquiva o que já chegou (eventos pendentes inclusive) e encerra. Retorna os contadores.
+
+        Se uma chamada anterior já esgotou o tempo, não espera de novo.
+        """
+        if self._thread is None:
+            return self.contadores
+        if self._parar.is_set():
+            timeout = 0
+        self._parar.set()
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            logging.warning("Organizador de PDFs não terminou a tempo; a verificação de nomes cuida do restante.")
+            return self.contadores
+        self._thread = None
+        self._watcher.fechar()
+        if self._cache:
+            try:
+                self._cache.fechar()
+            except sqlite3.Error as e:
+                logging.warning(f"Falha ao gravar o cache de extração do organizador: {e}")
+            self._cache = None
+        logging.info(f"Organizador de PDFs: {self.contadores['correto']} já com o nome certo, "
+                     f"{self.contadores['renomeado']} arquivado(s)/renomeado(s), "
+                     f"{self.contadores['conflito']} em quarentena, {self.contadores['erro']} com erro de leitura.")
+        return self.contadores
+
+    def _candidato(self, nome, apenas_novos=False):
+        if not nome.lower().endswith(".pdf") or not nome.upper().startswith("LANCE"):
+            return False
+        if nome in self._arquivados:
+            self._arquivados.discard(nome)
+            return False
+        caminho = os.path.join(self.consultor_path, nome)
+        if os.path.exists(caminho + ".part"):
+            return False  # o Firefox ainda está gravando; o rename final gera outro evento
+        try:
+            st = os.stat(caminho)
+        except OSError:
+            return False
+        # Na revarredura após um transbordo, o que já existia antes de iniciar() não é deste organizador
+        return st.st_size > 0 and not (apenas_novos and st.st_mtime < self._inicio)
+
+    def _considerar(self, nome, apenas_novos=False):
+        if nome not in self._pendentes and self._candidato(nome, apenas_novos):
+            self._pendentes.append(nome)
+
+    def _processar_pendentes(self):
+        while self._pendentes:
+            nome = self._pendentes.pop(0)
+            caminho = os.path.join(self.consultor_path, nome)
+            if not os.path.isfile(caminho):
+                continue
+            try:
+                status, destino = organizar_pdf(caminho, self.consultor_path, self._cache)
+            except OSError as e:
+                logging.error(f"Organizador de PDFs: falha ao arquivar '{nome}': {e}")
+                status, destino = 'erro', caminho
+            self.contadores[status] += 1
+            if status == 'renomeado' and os.path.dirname(destino) == self.consultor_path:
+                self._arquivados.add(os.path.basename(destino))
+
+    def _executar(self):
+        try:
+            while True:
+                parando = self._parar.is_set()
+                eventos = self._watcher.ler_eventos(0 if parando else 0.5)
+                for wd, mask, nome in eventos:
+                    if mask & IN_Q_OVERFLOW:
+                        logging.warning("Fila do inotify transbordou; conferindo a pasta do consultor.")
+                        for existente in sorted(os.listdir(self.consultor_path)):
+                            self._considerar(existente, apenas_novos=True)
+                    elif wd == self._wd and nome and not mask & IN_ISDIR:
+                        self._considerar(nome)
+                self._processar_pendentes()
+                if parando and not eventos:
+                    return
+        except Exception as e:
+            logging.error(f"Organizador de PDFs encerrado: {e}", exc_info=True)
@@ -1,12 +1,30 @@
 import re
 import os
+import mmap
+import zlib
 import shutil
+import sqlite3
 import logging
+import multiprocessing
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from pypdf import PdfReader
 
+from cache_extracao import CacheExtracaoPdf
+
 # Configuração básica de logging para este módulo
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+# Leitura rápida (ver `_extrair_info_pdf_rapido`) antes do pypdf. Lido do ambiente aqui, e não
+# no módulo de automação, porque a extração também roda nos processos do pool (spawn); os
+# valores aceitos são os mesmos do `_get_bool` de lá.
+LEITURA_RAPIDA_PDF = os.getenv("LEITURA_RAPIDA_PDF", "true").strip().lower() in ("1", "true", "sim", "yes")
+
+# Versão do que `_extrair_info_pdf` devolve, gravada no cache de extração: incrementar sempre
+# que a extração mudar de forma que um PDF possa dar outro resultado (o cache antigo é descartado)
+VERSAO_EXTRATOR = 1
+
 
 def extract_canonical_cota(text):
     """
@@ -41,9 +59,12 @@ def extract_canonical_cota(text):
     
     return (grupo, cota, digito)
 
+# Nome padrão: "LANCE- <NOME> <grupo>.<cota>-<dígito>.pdf" (o nome do cliente é opcional)
+_RE_COTA_NOME_ARQUIVO = re.compile(r'^LANCE.*?(\d{4})[.,\s]?([\d,]+)[-\s]?(\d)\.pdf$', re.IGNORECASE)
+
 def parse_cota_from_filename(filename):
     """Extrai (grupo, cota, digito) de um nome de arquivo formatado."""
-    match = re.search(r'LANCE[- ]?(\d{4})[.,\s]?([\d,]+)[-\s]?(\d)\.pdf', filename, re.IGNORECASE)
+    match = _RE_COTA_NOME_ARQUIVO.search(filename)
     if match:
         grupo = match.group(1)
         cota = match.group(2)
@@ -51,58 +72,230 @@ def parse_cota_from_filename(filename):
         return (grupo, cota, digito)
     return None
 
-def _extrair_info_pdf(caminho_pdf):
-    """Função interna para extrair nome, grupo, cota e digito de um PDF, com logging objetivo."""
+def normalizar_chave_cota(grupo, cota, digito):
+    """Chave comparável da cota: '3411.222-9' e '3411.0222-9' viram ('3411', '222', '9')."""
+    return str(grupo), str(cota).replace(",", "").lstrip("0") or "0", str(digito)
+
+class IndicePdfsLance:
+    """Índice dos PDFs de lance de uma pasta por chave normalizada de cota (consulta O(1)).
+
+    Montado uma vez por varredura da pasta (`da_pasta`); vários arquivos podem ter a mesma cota.
+    """
+
+    def __init__(self):
+        self._por_chave = {}
+        self.total_pdfs = 0
+
+    @classmethod
+    def da_pasta(cls, pasta):
+        """Varre `pasta` (os.scandir, sem subpastas) e indexa os arquivos LANCE*.pdf."""
+        indice = cls()
+        with os.scandir(pasta) as entradas:
+            for entrada in entradas:
+                nome = entrada.name
+                if nome.upper().startswith("LANCE") and nome.lower().endswith('.pdf') and entrada.is_file():
+                    indice.adicionar(nome)
+        return indice
+
+    def adicionar(self, nome_arquivo):
+        self.total_pdfs += 1
+        cota = parse_cota_from_filename(nome_arquivo)
+        if cota:
+            self._por_chave.setdefault(normalizar_chave_cota(*cota), []).append(nome_arquivo)
+
+    def arquivos(self, grupo, cota, digito):
+        """Arquivos da pasta com esta cota (lista vazia se nenhum)."""
+        return self._por_chave.get(normalizar_chave_cota(grupo, cota, digito), [])
+
+    def __contains__(self, cota):
+        return normalizar_chave_cota(*cota) in self._por_chave
+
+    def __len__(self):
+        return len(self._por_chave)
+
+# Regex para o padrão da cota: 4 dígitos (grupo) [separador] [dígitos/vírgulas] (cota) - [1 dígito] (dígito)
+_PADRAO_COTA_TEXTO = r"(\d{4})[.,\s]?([\d,]+)[-\s]?(\d)"
+
+
+def _analisar_texto_pdf(texto_limpo):
+    """Procura nome e cota no texto. Retorna (nome, grupo, cota, digito, cota_apos_nome)."""
+    nome_match = re.search(r"Consorciado\s*[:\-]?\s*([A-ZÀ-Ú\s]{5,})", texto_limpo, re.IGNORECASE)
+    nome = nome_match.group(1).strip().upper() if nome_match else None
+
+    # Priorizar busca da cota após o nome do consorciado
+    if nome:
+        match = re.search(rf"{re.escape(nome)}\s*{_PADRAO_COTA_TEXTO}", texto_limpo, re.IGNORECASE)
+        if match:
+            return (nome, *match.groups(), True)
+
+    # Se não encontrou após o nome, tentar após o label "Cota"
+    match = re.search(rf"Cota\s*{_PADRAO_COTA_TEXTO}", texto_limpo, re.IGNORECASE)
+    # Se ainda não encontrou, tentar uma busca geral pelo padrão da cota no texto
+    if not match:
+        match = re.search(_PADRAO_COTA_TEXTO, texto_limpo)
+    if match:
+        return (nome, *match.groups(), False)
+    return nome, None, None, None, False
+
+
+def ler_texto_pdf(reader):
+    """Lê as páginas em ordem e para assim que o nome e a cota logo após ele aparecem.
+
+    Retorna (texto_limpo, páginas_lidas, (nome, grupo, cota, digito)). A cota colada ao
+    nome não muda com as páginas seguintes; os outros padrões (label "Cota", busca geral)
+    podem achar algo melhor adiante, então nesse caso o PDF é lido até o fim.
+    """
+    partes = []
+    texto_limpo, dados = "", (None, None, None, None, False)
+    for pagina in reader.pages:
+        partes.append(pagina.extract_text() or "")
+        texto_limpo = re.sub(r'\s+', ' ', "".join(partes)).strip()
+        dados = _analisar_texto_pdf(texto_limpo)
+        if dados[4]:
+            break
+    return texto_limpo, len(partes), dados[:4]
+
+
+# --- Leitura rápida: texto cru do content stream da primeira página ---
+
+_RE_PAGINA = re.compile(rb"/Type\s*/Page(?![A-Za-z])")
+_RE_CABECALHO_OBJ = re.compile(rb"(\d+)\s+(\d+)\s+obj\b")
+_RE_CONTENTS = re.compile(rb"/Contents\s*(\[[^\]]*\]|\d+\s+\d+\s+R)")
+_RE_REFERENCIA = re.compile(rb"(\d+)\s+(\d+)\s+R")
+_RE_INICIO_STREAM = re.compile(rb"stream\r?\n")
+_RE_LENGTH_DIRETO = re.compile(rb"/Length\s+(\d+)(?!\s+\d+\s+R)")
+# Strings (literal/hex), delimitadores de array TJ, números (kerning) e operadores que mudam de linha
+_RE_TOKEN_TEXTO = re.compile(
+    rb"\((?:\\.|[^\\)])*\)|<[0-9A-Fa-f\s]*>|\[|\]|-?\d*\.?\d+|(?<![A-Za-z])(?:T[dDm*]|BT|ET)(?![A-Za-z])|'|\""
+)
+_ESCAPES_LITERAL = {b"n": b"\n", b"r": b"\r", b"t": b"\t", b"b": b"\b", b"f": b"\f"}
+# Deslocamento no TJ (milésimos de em) a partir do qual o pypdf também enxerga um espaço
+_KERNING_ESPACO = -200
+_MAX_CONTENT_STREAM = 4 * 1024 * 1024
+
+
+def _decodificar_literal(corpo):
+    def escape(m):
+        seq = m.group(1)
+        if seq[:1].isdigit():
+            return bytes([int(seq, 8) & 0xFF])
+        if seq in (b"\r\n", b"\n", b"\r"):
+            return b""  # continuação de linha
+        return _ESCAPES_LITERAL.get(seq, seq)
+    return re.sub(rb"\\([0-7]{1,3}|\r\n|.)", escape, corpo, flags=re.DOTALL).decode("cp1252", "replace")
+
+
+def _texto_do_content_stream(conteudo):
+    """Texto dos operadores de texto, com espaço onde há mudança de linha ou kerning largo."""
+    partes, em_array = [], False
+    for m in _RE_TOKEN_TEXTO.finditer(conteudo):
+        token = m.group()
+        if token[:1] == b"(":
+            partes.append(_decodificar_literal(token[1:-1]))
+        elif token[:1] == b"<":
+            hexa = re.sub(rb"\s", b"", token[1:-1])
+            partes.append(bytes.fromhex((hexa + b"0" * (len(hexa) % 2)).decode()).decode("cp1252", "replace"))
+        elif token == b"[":
+            em_array = True
+        elif token == b"]":
+            em_array = False
+        elif token[:1] in b"-.0123456789":
+            if em_array and float(token) <= _KERNING_ESPACO:
+                partes.append(" ")
+        else:
+            partes.append(" ")
+    return "".join(partes)
+
+
+def _stream_do_objeto(dados, numero):
+    """Bytes decodificados do stream do objeto `numero` (última definição no arquivo), ou None."""
+    inicio = -1
+    for m in re.finditer(rb"(?<!\d)%d\s+\d+\s+obj\b" % numero, dados):
+        inicio = m.end()
+    if inicio < 0:
+        return None
+    m = _RE_INICIO_STREAM.search(dados, inicio)
+    fim_obj = dados.find(b"endobj", inicio)
+    if not m or (0 <= fim_obj < m.start()):
+        return None
+    dicionario = dados[inicio:m.start()]
+    length = _RE_LENGTH_DIRETO.search(dicionario)
+    fim = m.end() + int(length.group(1)) if length else dados.find(b"endstream", m.end())
+    if fim < m.end():
+        return None
+    bruto = dados[m.end():fim]
+    if b"/Filter" not in dicionario:
+        return bruto[:_MAX_CONTENT_STREAM]
+    if re.search(rb"/Filter\s*(\[\s*)?/FlateDecode\s*\]?\s*(/|>>)", dicionario) is None:
+        return None  # outros filtros (ou cadeias de filtros) ficam com o pypdf
+    return zlib.decompressobj().decompress(bruto, _MAX_CONTENT_STREAM)
+
+
+def _extrair_info_pdf_rapido(caminho_pdf):
+    """Nome e cota direto do content stream da primeira página (sem montar o documento no pypdf).
+
+    Mapeia o arquivo, acha o primeiro objeto /Type /Page, infla só o(s) stream(s) do seu
+    /Contents e aplica os mesmos padrões de `_analisar_texto_pdf` ao texto dos operadores
+    Tj/TJ. Só responde quando encontra o nome seguido da cota; qualquer outra situação
+    (xref/objetos comprimidos, fontes com codificação própria, filtros diferentes de
+    FlateDecode, página em outra ordem...) devolve None e a leitura completa decide.
+
+    Os espaços entre palavras são aproximados (mudança de linha e kerning largo viram
+    espaço), então o nome pode sair diferente do que o pypdf monta em alguns layouts:
+    `_extrair_info_pdf` só usa este resultado para confirmar o nome atual do arquivo.
+    """
+    try:
+        with open(caminho_pdf, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as dados:
+            pagina = _RE_PAGINA.search(dados)
+            if not pagina:
+                return None
+            inicio_obj = max((m for m in _RE_CABECALHO_OBJ.finditer(dados, max(0, pagina.start() - 4096), pagina.start())),
+                             key=lambda m: m.start(), default=None)
+            fim_obj = dados.find(b"endobj", pagina.start())
+            if inicio_obj is None or fim_obj < 0:
+                return None
+            contents = _RE_CONTENTS.search(dados, inicio_obj.end(), fim_obj)
+            if not contents:
+                return None
+            texto = []
+            for ref in _RE_REFERENCIA.finditer(contents.group(1)):
+                conteudo = _stream_do_objeto(dados, int(ref.group(1)))
+                if conteudo is None:
+                    return None
+                texto.append(_texto_do_content_stream(conteudo))
+    except (OSError, ValueError, zlib.error):
+        return None
+    nome, grupo, cota, digito, cota_apos_nome = _analisar_texto_pdf(re.sub(r'\s+', ' ', "".join(texto)).strip())
+    return (nome, grupo, cota, digito) if cota_apos_nome else None
+
+
+def _extrair_info_pdf(caminho_pdf, leitura_rapida=None):
+    """Função interna para extrair nome, grupo, cota e digito de um PDF, com logging objetivo.
+
+    leitura_rapida: tenta `_extrair_info_pdf_rapido` antes do pypdf (None = LEITURA_RAPIDA_PDF).
+        O resultado rápido só vale quando confirma o nome atual do arquivo (já no padrão);
+        qualquer outro caso, inclusive todo arquivo que seria renomeado, é decidido pelo pypdf.
+    """
     try:
         filename_only = os.path.basename(caminho_pdf)
         logging.info(f"---- Analisando PDF: {filename_only} ----")
-        
+
+        if LEITURA_RAPIDA_PDF if leitura_rapida is None else leitura_rapida:
+            rapido = _extrair_info_pdf_rapido(caminho_pdf)
+            if rapido and nome_padrao_lance(*rapido) == filename_only:
+                logging.info(f"  -> Sucesso: Nome '{rapido[0]}', Grupo '{rapido[1]}', Cota '{rapido[2]}', Dígito '{rapido[3]}' encontrados (leitura rápida confirmou o nome).")
+                return (*rapido, None)
+
         reader = PdfReader(caminho_pdf)
         if not reader.pages:
             logging.warning(f"PDF '{filename_only}' corrompido ou sem páginas.")
             return None, None, None, None, "PDF corrompido ou sem páginas"
-        
-        texto = "".join(page.extract_text() or "" for page in reader.pages)
-        texto_limpo = re.sub(r'\s+', ' ', texto).strip()
-
-        nome_match = re.search(r"Consorciado\s*[:\-]?\s*([A-ZÀ-Ú\s]{5,})", texto_limpo, re.IGNORECASE)
-        nome = nome_match.group(1).strip().upper() if nome_match else None
-
-        grupo_extracted = None
-        cota_extracted = None
-        digito_extracted = None
-
-        # Regex para o padrão da cota: 4 dígitos (grupo) [separador] [dígitos/vírgulas] (cota) - [1 dígito] (dígito)
-        cota_pattern_in_text = r"(\d{4})[.,\s]?([\d,]+)[-\s]?(\d)"
-        
-        # Priorizar busca da cota após o nome do consorciado
-        if nome:
-            escaped_nome = re.escape(nome)
-            match = re.search(rf"{escaped_nome}\s*{cota_pattern_in_text}", texto_limpo, re.IGNORECASE)
-            if match:
-                grupo_extracted = match.group(1)
-                cota_extracted = match.group(2)
-                digito_extracted = match.group(3)
-        
-        # Se não encontrou após o nome, tentar após o label "Cota"
-        if not grupo_extracted:
-            match = re.search(rf"Cota\s*{cota_pattern_in_text}", texto_limpo, re.IGNORECASE)
-            if match:
-                grupo_extracted = match.group(1)
-                cota_extracted = match.group(2)
-                digito_extracted = match.group(3)
-
-        # Se ainda não encontrou, tentar uma busca geral pelo padrão da cota no texto
-        if not grupo_extracted:
-            match = re.search(cota_pattern_in_text, texto_limpo)
-            if match:
-                grupo_extracted = match.group(1)
-                cota_extracted = match.group(2)
-                digito_extracted = match.group(3)
 
+        _, paginas_lidas, (nome, grupo_extracted, cota_extracted, digito_extracted) = ler_texto_pdf(reader)
 
         if nome and grupo_extracted and cota_extracted and digito_extracted:
-            logging.info(f"  -> Sucesso: Nome '{nome}', Grupo '{grupo_extracted}', Cota '{cota_extracted}', Dígito '{digito_extracted}' encontrados.")
+            logging.info(f"  -> Sucesso: Nome '{nome}', Grupo '{grupo_extracted}', Cota '{cota_extracted}', Dígito '{digito_extracted}' encontrados"
+                         f" ({paginas_lidas} de {len(reader.pages)} página(s) lida(s)).")
             return nome, grupo_extracted, cota_extracted, digito_extracted, None
         else:
             erro_msg = f"  -> Falha: Nome ({'ENCONTRADO' if nome else 'NÃO ENCONTRADO'}) ou Cota (Grupo/Cota/Dígito {'ENCONTRADOS' if grupo_extracted else 'NÃO ENCONTRADOS'}) no PDF."
@@ -113,24 +306,160 @@ def _extrair_info_pdf(caminho_pdf):
         logging.error(f"Erro crítico ao ler PDF '{os.path.basename(caminho_pdf)}': {e}", exc_info=True)
         return None, None, None, None, f"Erro crítico de leitura do PDF: {e}"
 
-def parse_cota_from_filename(filename):
-    """Extrai (grupo, cota, digito) de um nome de arquivo formatado."""
-    match = re.search(r'LANCE[- ]?(\d{4})[.,\s]?([\d,]+)[-\s]?(\d)\.pdf', filename, re.IGNORECASE)
-    if match:
-        grupo = match.group(1)
-        cota = match.group(2)
-        digito = match.group(3)
-        return (grupo, cota, digito)
-    return None
-        
 
-def verificar_e_corrigir_nomes_pdf(consultor_path):
-    """Verifica e corrige os nomes dos arquivos PDF em uma pasta, usando uma estratégia de quarentena para conflitos."""
+# Abaixo disso por processo, abrir o pool custa mais do que ler os PDFs em sequência
+_MIN_PDFS_POR_PROCESSO = 4
+
+
+def _silenciar_logging_processo():
+    """Initializer dos processos de extração: o log por arquivo fica com o processo principal."""
+    logging.getLogger().handlers.clear()
+    logging.disable(logging.CRITICAL)
+
+
+def extrair_info_pdfs(caminhos, processos=None):
+    """Gera (caminho, resultado de `_extrair_info_pdf`) na ordem de `caminhos`.
+
+    Com `processos` > 1 a extração roda em um ProcessPoolExecutor (0/None = um por CPU)
+    e cada resultado é entregue assim que ele e todos os anteriores ficam prontos. Se o
+    pool não puder ser criado ou quebrar, o restante é lido em sequência.
+    """
+    caminhos = list(caminhos)
+    if not processos:
+        processos = os.cpu_count() or 1
+    processos = min(processos, len(caminhos) // _MIN_PDFS_POR_PROCESSO)
+    entregues = 0
+    if processos > 1:
+        logging.info(f"Lendo {len(caminhos)} PDF(s) com {processos} processo(s).")
+        try:
+            # 'spawn': a GUI e a automação chamam daqui com outras threads vivas, o que torna o fork inseguro
+            with ProcessPoolExecutor(max_workers=processos, mp_context=multiprocessing.get_context("spawn"),
+                                     initializer=_silenciar_logging_processo) as executor:
+                lote = max(1, min(32, len(caminhos) // (processos * 4)))
+                for resultado in executor.map(_extrair_info_pdf, caminhos, chunksize=lote):
+                    yield caminhos[entregues], resultado
+                    entregues += 1
+        except (OSError, BrokenProcessPool) as e:
+            logging.warning(f"Extração paralela dos PDFs indisponível ({e}); lendo os {len(caminhos) - entregues} restante(s) em sequência.")
+    for caminho in caminhos[entregues:]:
+        yield caminho, _extrair_info_pdf(caminho)
+
+
+def _abrir_cache_extracao(consultor_path, reconstruir, verificar_conteudo):
+    try:
+        cache = CacheExtracaoPdf(consultor_path, verificar_conteudo=verificar_conteudo, versao_extrator=VERSAO_EXTRATOR)
+        if reconstruir:
+            logging.info("Cache de extração descartado: todos os PDFs serão lidos de novo.")
+            cache.invalidar()
+        return cache
+    except (sqlite3.Error, OSError) as e:
+        logging.warning(f"Cache de extração indisponível em '{consultor_path}' ({e}); todos os PDFs serão lidos.")
+        return None
+
+
+def _extrair_com_cache(caminhos, cache, processos):
+    """Como `extrair_info_pdfs`, mas servindo do cache os arquivos sem alteração (mesma ordem)."""
+    if cache is None:
+        yield from extrair_info_pdfs(caminhos, processos)
+        return
+    chaves, guardados, pendentes = {}, {}, []
+    for caminho in caminhos:
+        try:
+            chaves[caminho] = cache.chave(caminho)
+            guardados[caminho] = cache.consultar(chaves[caminho])
+        except (sqlite3.Error, OSError):
+            guardados[caminho] = None
+        if guardados[caminho] is None:
+            pendentes.append(caminho)
+    extraidos = extrair_info_pdfs(pendentes, processos)
+    for caminho in caminhos:
+        if guardados[caminho] is not None:
+            yield caminho, guardados[caminho]
+            continue
+        _, info = next(extraidos)
+        if caminho in chaves:
+            try:
+                cache.registrar(chaves[caminho], info)
+            except sqlite3.Error as e:
+                logging.warning(f"Falha ao gravar '{os.path.basename(caminho)}' no cache de extração: {e}")
+        yield caminho, info
+
+
+def nome_padrao_lance(nome, grupo, cota, digito):
+    """Nome de arquivo padrão do lance, a partir dos dados lidos do PDF."""
+    nome_sanitizado = re.sub(r'[\/:*?"<>|]', '_', nome)
+    return f"LANCE- {nome_sanitizado} {grupo}.{cota}-{digito}.pdf"
+
+
+def organizar_pdf(caminho, consultor_path, cache=None):
+    """Lê um PDF e o arquiva em `consultor_path` com o nome padrão (regra da verificação de nomes).
+
+    Se o nome padrão já estiver ocupado por outro arquivo, o PDF vai para a quarentena
+    (`Conflitos`). Retorna ('correto' | 'renomeado' | 'conflito' | 'erro', caminho final).
+    """
+    (_, info), = _extrair_com_cache([caminho], cache, processos=1)
+    nome_pdf, grupo_pdf, cota_pdf, digito_pdf, erro = info
+    if erro:
+        logging.warning(f"Erro ao ler '{os.path.basename(caminho)}': {erro}")
+        return 'erro', caminho
+
+    novo_nome = nome_padrao_lance(nome_pdf, grupo_pdf, cota_pdf, digito_pdf)
+    destino = os.path.join(consultor_path, novo_nome)
+    if os.path.abspath(caminho) == os.path.abspath(destino):
+        return 'correto', caminho
+    status = 'renomeado'
+    if os.path.exists(destino):
+        logging.warning(f"CONFLITO: O destino '{novo_nome}' já existe. Movendo '{os.path.basename(caminho)}' para a pasta de quarentena.")
+        conflitos_path = os.path.join(consultor_path, "Conflitos")
+        os.makedirs(conflitos_path, exist_ok=True)
+        destino = os.path.join(conflitos_path, os.path.basename(caminho))
+        if os.path.exists(destino):
+            destino = os.path.join(conflitos_path, f"{datetime.now().strftime('%Y%m%d%H%M%S')}-{os.path.basename(caminho)}")
+        status = 'conflito'
+    shutil.move(caminho, destino)
+    if status == 'renomeado':
+        logging.info(f"ARQUIVADO: '{os.path.basename(caminho)}' -> '{os.path.basename(destino)}'")
+    if cache:
+        # Entre sistemas de arquivos o move copia: o arquivo novo tem outro inode
+        try:
+            cache.registrar(cache.chave(destino), info)
+        except (sqlite3.Error, OSError):
+            pass
+    return status, destino
+
+
+def verificar_e_corrigir_nomes_pdf(consultor_path, processos=None, usar_cache=True, reconstruir_cache=False,
+                                   verificar_conteudo=False):
+    """Verifica e corrige os nomes dos arquivos PDF em uma pasta, usando uma estratégia de quarentena para conflitos.
+
+    A leitura dos PDFs usa `processos` processos (ver `extrair_info_pdfs`); renomear e
+    resolver conflitos continua em sequência, na ordem da listagem da pasta. Com
+    `usar_cache`, PDFs já lidos e inalterados vêm do cache de extração da pasta
+    (`cache_extracao.py`), e os que já estavam com o nome certo na verificação anterior
+    e não mudaram (mesmo nome e inode/tamanho/mtime, pelo manifesto) são pulados sem
+    consulta alguma; `reconstruir_cache` descarta os dois antes de começar.
+    """
     logging.info(f"--- Iniciando verificação de nomes em: {consultor_path} ---")
     report = {
         'total_scanned': 0, 'renamed': 0, 'correct': 0, 
-        'conflicts': 0, 'errors': 0
+        'conflicts': 0, 'errors': 0, 'skipped': 0, 'cache_hits': 0, 'cache_misses': 0
     }
+    cache = _abrir_cache_extracao(consultor_path, reconstruir_cache, verificar_conteudo) if usar_cache else None
+    try:
+        _verificar_pasta(consultor_path, report, cache, processos)
+    finally:
+        if cache:
+            report['cache_hits'], report['cache_misses'] = cache.acertos, cache.falhas
+            logging.info(f"Cache de extração: {cache.acertos} PDF(s) sem alteração, {cache.falhas} lido(s).")
+            try:
+                cache.fechar()
+            except sqlite3.Error as e:
+                logging.warning(f"Falha ao gravar o cache de extração: {e}")
+    logging.info("--- Verificação de nomes finalizada ---")
+    return report
+
+
+def _verificar_pasta(consultor_path, report, cache, processos):
     conflitos_path = os.path.join(consultor_path, "Conflitos")
     arquivos_para_renomear = []
 
@@ -138,26 +467,56 @@ def verificar_e_corrigir_nomes_pdf(consultor_path):
     pdf_files = [f for f in os.listdir(consultor_path) if f.lower().endswith('.pdf') and f.upper().startswith("LANCE")]
     report['total_scanned'] = len(pdf_files)
 
+    # Manifesto da verificação anterior: mesmo nome e mesma assinatura = nada a fazer
+    # (com CACHE_EXTRACAO_HASH a assinatura não basta, então todos passam pelo cache)
+    manifesto = cache.verificados() if cache and not cache.verificar_conteudo else {}
+    verificados, assinaturas, caminhos = [], {}, []
     for filename in pdf_files:
         caminho_completo = os.path.join(consultor_path, filename)
-        nome_pdf, grupo_pdf, cota_pdf, digito_pdf, erro = _extrair_info_pdf(caminho_completo)
+        try:
+            st = os.stat(caminho_completo)
+            assinaturas[filename] = (st.st_ino, st.st_size, st.st_mtime_ns)
+        except OSError:
+            pass
+        if filename in assinaturas and manifesto.get(filename) == assinaturas[filename]:
+            report['skipped'] += 1
+            report['correct'] += 1
+            verificados.append((filename, assinaturas[filename]))
+        else:
+            caminhos.append(caminho_completo)
+    if report['skipped']:
+        logging.info(f"{report['skipped']} arquivo(s) sem alteração desde a última verificação; "
+                     f"{len(caminhos)} a verificar.")
+
+    for caminho_completo, info in _extrair_com_cache(caminhos, cache, processos):
+        filename = os.path.basename(caminho_completo)
+        nome_pdf, grupo_pdf, cota_pdf, digito_pdf, erro = info
 
         if erro:
             logging.warning(f"Erro ao ler '{filename}': {erro}")
             report['errors'] += 1
             continue
 
-        nome_sanitizado = re.sub(r'[\/:*?"<>|]', '_', nome_pdf)
-        novo_nome = f"LANCE- {nome_sanitizado} {grupo_pdf}.{cota_pdf}-{digito_pdf}.pdf"
+        novo_nome = nome_padrao_lance(nome_pdf, grupo_pdf, cota_pdf, digito_pdf)
 
         if filename == novo_nome:
             report['correct'] += 1
+            if filename in assinaturas:
+                verificados.append((filename, assinaturas[filename]))
         else:
             arquivos_para_renomear.append((caminho_completo, novo_nome))
 
+    if cache:
+        try:
+            cache.marcar_verificados(verificados)
+        except sqlite3.Error as e:
+            logging.warning(f"Falha ao gravar o manifesto da verificação: {e}")
+
     if not arquivos_para_renomear:
         logging.info("Nenhum arquivo precisa ser renomeado.")
-        return report
+        if cache and not os.path.exists(conflitos_path):
+            cache.podar()
+        return
 
     # --- DEBUG LOGS --- (Adicionado para depuração)
     logging.info("--- DEBUG: Detalhes dos arquivos para renomear ---")
@@ -189,12 +548,12 @@ def verificar_e_corrigir_nomes_pdf(consultor_path):
     # 3ª Passada: Tentar resolver quarentena
     if os.path.exists(conflitos_path):
         logging.info("--- Tentando resolver arquivos em quarentena ---")
-        for filename in os.listdir(conflitos_path):
-            caminho_quarentena = os.path.join(conflitos_path, filename)
-            nome_pdf, cota_pdf, _ = _extrair_info_pdf(caminho_quarentena)
+        quarentena = [os.path.join(conflitos_path, f) for f in os.listdir(conflitos_path)]
+        for caminho_quarentena, info in _extrair_com_cache(quarentena, cache, processos=1):
+            filename = os.path.basename(caminho_quarentena)
+            nome_pdf, grupo_pdf, cota_pdf, digito_pdf, _ = info
             if nome_pdf and cota_pdf:
-                nome_sanitizado = re.sub(r'[\/:*?"<>|]', '_', nome_pdf)
-                novo_nome_final = f"LANCE- {nome_sanitizado} {cota_pdf}.pdf"
+                novo_nome_final = nome_padrao_lance(nome_pdf, grupo_pdf, cota_pdf, digito_pdf)
                 caminho_final = os.path.join(consultor_path, novo_nome_final)
                 if not os.path.exists(caminho_final):
                     shutil.move(caminho_quarentena, caminho_final)
@@ -208,7 +567,7 @@ def verificar_e_corrigir_nomes_pdf(consultor_path):
             os.rmdir(conflitos_path)
             logging.info("Pasta de conflitos resolvida e removida.")
 
-    logging.info("--- Verificação de nomes finalizada ---")
-    return report
+    if cache:
+        cache.podar()
 
 
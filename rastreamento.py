@@ -0,0 +1,183 @@
+import os
+import json
+import time
+import logging
+import threading
+import functools
+from contextlib import contextmanager
+from datetime import datetime
+
+"""
+Rastreamento de latência por etapa (spans) da automação.
+
+Cada etapa do fluxo (login, busca, tabela de resultados, Extrato, página de lances,
+Simular, Registrar, espera do download, mover o PDF) abre um span com nome. O span
+registra início, duração, thread, cota em andamento e quantos comandos WebDriver
+foram enviados enquanto ele estava aberto (contados em `driver.execute`, inclusive
+os dos spans filhos).
+
+Por execução são gravados, na pasta `TRACE_DIR`:
+  - <consultor>-<data>.jsonl: um span por linha, gravado assim que ele termina;
+  - <consultor>-<data>.trace.json: formato Chrome Trace (abrir em chrome://tracing
+    ou https://ui.perfetto.dev), com uma linha por navegador.
+
+Fora de uma execução (sem `iniciar_execucao`) os spans não custam nada além de
+medir o tempo.
+"""
+
+_local = threading.local()
+_atual = None
+_atual_lock = threading.Lock()
+
+
+def _pilha():
+    if not hasattr(_local, "pilha"):
+        _local.pilha = []
+    return _local.pilha
+
+
+class Rastreador:
+    """Coleta os spans de uma execução e grava o JSONL/Chrome Trace."""
+
+    def __init__(self, pasta, nome):
+        os.makedirs(pasta, exist_ok=True)
+        base = os.path.join(pasta, f"{nome}-{datetime.now().strftime('%Y%m%d-%H%M%S')}")
+        self.arquivo_jsonl = f"{base}.jsonl"
+        self.arquivo_chrome = f"{base}.trace.json"
+        self.inicio_ns = time.perf_counter_ns()
+        self.spans = []
+        self._lock = threading.Lock()
+        self._jsonl = open(self.arquivo_jsonl, "w", encoding="utf-8")
+
+    def registrar(self, registro):
+        with self._lock:
+            self.spans.append(registro)
+            self._jsonl.write(json.dumps(registro, ensure_ascii=False) + "\n")
+            self._jsonl.flush()
+
+    def resumo_etapas(self):
+        """{etapa: {n, media, p50, p95, comandos}} com durações em segundos."""
+        por_etapa = {}
+        with self._lock:
+            for span in self.spans:
+                por_etapa.setdefault(span["nome"], []).append(span)
+        resumo = {}
+        for nome, spans in por_etapa.items():
+            duracoes = sorted(s["dur_ms"] / 1000 for s in spans)
+            resumo[nome] = {
+                "n": len(duracoes),
+                "media": sum(duracoes) / len(duracoes),
+                "p50": percentil(duracoes, 50),
+                "p95": percentil(duracoes, 95),
+                "comandos": sum(s["comandos"] for s in spans) / len(spans),
+            }
+        return resumo
+
+    def fechar(self):
+        """Fecha o JSONL e grava o arquivo no formato Chrome Trace."""
+        with self._lock:
+            self._jsonl.close()
+            threads = sorted({s["thread"] for s in self.spans})
+            tids = {nome: i for i, nome in enumerate(threads, start=1)}
+            eventos = [
+                {"name": "thread_name", "ph": "M", "pid": 1, "tid": tid, "args": {"name": nome}}
+                for nome, tid in tids.items()
+            ]
+            for s in self.spans:
+                eventos.append({
+                    "name": s["nome"], "ph": "X", "pid": 1, "tid": tids[s["thread"]],
+                    "ts": s["inicio_ms"] * 1000, "dur": s["dur_ms"] * 1000,
+                    "args": {k: v for k, v in s.items() if k not in ("nome", "inicio_ms", "dur_ms", "thread")},
+                })
+        with open(self.arquivo_chrome, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": eventos, "displayTimeUnit": "ms"}, f, ensure_ascii=False)
+
+
+def percentil(valores_ordenados, p):
+    """Percentil por posição mais próxima (p em 0-100) de uma lista já ordenada."""
+    if not valores_ordenados:
+        return 0.0
+    indice = max(0, min(len(valores_ordenados) - 1, round(p / 100 * len(valores_ordenados) + 0.5) - 1))
+    return valores_ordenados[indice]
+
+
+def iniciar_execucao(pasta, nome):
+    """Começa a rastrear uma execução. Retorna o Rastreador ativo."""
+    global _atual
+    rastreador = Rastreador(pasta, nome)
+    with _atual_lock:
+        _atual = rastreador
+    logging.info(f"Rastreamento de etapas em: {rastreador.arquivo_jsonl}")
+    return rastreador
+
+
+def finalizar_execucao():
+    """Encerra a execução atual, grava os arquivos e retorna o resumo por etapa (ou {})."""
+    global _atual
+    with _atual_lock:
+        rastreador, _atual = _atual, None
+    if rastreador is None:
+        return {}
+    rastreador.fechar()
+    logging.info(f"Trace da execução (Chrome Trace) salvo em: {rastreador.arquivo_chrome}")
+    return rastreador.resumo_etapas()
+
+
+def definir_cota(cota):
+    """Associa os próximos spans desta thread à cota informada (None para limpar)."""
+    _local.cota = cota
+
+
+@contextmanager
+def span(nome, **atributos):
+    """Mede um trecho do fluxo. Os atributos podem ser completados dentro do bloco via o dict retornado."""
+    registro = {"comandos": 0, **atributos, "_nome_span": nome}
+    pilha = _pilha()
+    pilha.append(registro)
+    inicio = time.perf_counter_ns()
+    try:
+        yield registro
+    except BaseException as e:
+        registro.setdefault("erro", type(e).__name__)
+        raise
+    finally:
+        fim = time.perf_counter_ns()
+        pilha.pop()
+        rastreador = _atual
+        if rastreador is not None:
+            registro.update({
+                "nome": nome,
+                "inicio_ms": round((inicio - rastreador.inicio_ns) / 1e6, 3),
+                "dur_ms": round((fim - inicio) / 1e6, 3),
+                "thread": threading.current_thread().name,
+                "cota": getattr(_local, "cota", None),
+                "pai": pilha[-1].get("_nome_span") if pilha else None,
+            })
+            rastreador.registrar({k: v for k, v in registro.items() if not k.startswith("_")})
+
+
+def etapa(nome):
+    """Decorador: a função inteira vira um span `nome`."""
+    def decorador(func):
+        @functools.wraps(func)
+        def envolvida(*args, **kwargs):
+            with span(nome):
+                return func(*args, **kwargs)
+        return envolvida
+    return decorador
+
+
+def instrumentar_driver(driver):
+    """Conta cada comando WebDriver enviado por `driver` nos spans abertos da thread."""
+    if getattr(driver, "_rastreamento_instrumentado", False):
+        return driver
+    execute_original = driver.execute
+
+    def execute(driver_command, params=None):
+        for registro in _pilha():
+            registro["comandos"] += 1
+        return execute_original(driver_command, params)
+
+    driver.execute = execute
+    driver._rastreamento_instrumentado = True
+    return driver
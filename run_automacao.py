@@ -5,7 +5,7 @@ from dotenv import load_dotenv
 # Carrega as variáveis de ambiente do arquivo .env ANTES de qualquer outra coisa.
 load_dotenv()
 
-import automacao_servopa_corrigidoen
+import automacao_servopa_corrigido
 import threading
 import sys
 import os
@@ -53,6 +53,10 @@ class AutomationApp:
         self.default_fg_color = self.root.option_get('foreground', '.')
 
         self.consultores_list = self.get_consultores()
+        # Índice de todos os Lances/*, mantido em dia pelo inotify enquanto a GUI estiver aberta
+        self.indice_global = automacao_servopa_corrigido.indice_global_lances()
+        if self.indice_global:
+            self.indice_global.iniciar_monitor()
         self.create_widgets()
         self.redirect_output()
 
@@ -98,6 +102,26 @@ class AutomationApp:
         self.set_placeholder()
         self.entry_consultor.bind("<FocusIn>", self.on_focus_in)
         self.entry_consultor.bind("<FocusOut>", self.on_focus_out)
+        self.entry_consultor.bind("<<ComboboxSelected>>", self.on_consultor_selected)
+
+        ttk.Label(input_frame, text="Navegadores simultâneos:").grid(row=1, column=0, sticky="w", padx=5, pady=5)
+        self.spin_navegadores = ttk.Spinbox(input_frame, from_=1, to=8, width=5, state="readonly")
+        self.spin_navegadores.grid(row=1, column=1, sticky="w", padx=5, pady=5)
+        self.spin_navegadores.set(automacao_servopa_corrigido.MAX_NAVEGADORES)
+
+        self.var_ignorar_cache = tk.BooleanVar(value=False)
+        self.check_ignorar_cache = ttk.Checkbutton(
+            input_frame, text="Reprocessar cotas já conhecidas como inelegíveis (ignorar cache de cotas)",
+            variable=self.var_ignorar_cache,
+        )
+        self.check_ignorar_cache.grid(row=2, column=0, columnspan=2, sticky="w", padx=5, pady=5)
+
+        self.var_reconstruir_cache_pdf = tk.BooleanVar(value=False)
+        self.check_reconstruir_cache_pdf = ttk.Checkbutton(
+            input_frame, text="Reler todos os PDFs ao verificar nomes (reconstruir cache de extração)",
+            variable=self.var_reconstruir_cache_pdf,
+        )
+        self.check_reconstruir_cache_pdf.grid(row=3, column=0, columnspan=2, sticky="w", padx=5, pady=5)
 
         lances_frame = ttk.LabelFrame(parent_tab, text="2. Lista de Cotas", padding="10")
         lances_frame.grid(row=1, column=0, sticky="nsew", padx=5, pady=5)
@@ -124,8 +148,11 @@ class AutomationApp:
         self.btn_verify = ttk.Button(control_frame, text="Verificar Nomes na Pasta", command=self.start_verification_threaded)
         self.btn_verify.grid(row=0, column=1, sticky="ew", padx=5, pady=5)
 
+        self.btn_locate = ttk.Button(control_frame, text="Localizar Lances Existentes", command=self.show_existing_lances)
+        self.btn_locate.grid(row=1, column=0, columnspan=2, sticky="ew", padx=5, pady=5)
+
         self.btn_stop = ttk.Button(control_frame, text="Finalizar Operação", command=self.stop_operation, state=tk.DISABLED)
-        self.btn_stop.grid(row=1, column=0, columnspan=2, sticky="ew", padx=5, pady=5)
+        self.btn_stop.grid(row=2, column=0, columnspan=2, sticky="ew", padx=5, pady=5)
 
         log_frame = ttk.LabelFrame(parent_tab, text="4. Logs da Operação Atual", padding="10")
         log_frame.grid(row=4, column=0, sticky="nsew", padx=5, pady=5)
@@ -315,6 +342,31 @@ class AutomationApp:
         if not self.entry_consultor.get():
             self.set_placeholder()
 
+    def on_consultor_selected(self, event=None):
+        self.update_cota_count()
+        self.offer_resume()
+
+    def offer_resume(self, event=None):
+        """Se o consultor tem uma execução interrompida, oferece carregar a lista de cotas dela."""
+        consultor_name = self.entry_consultor.get().strip()
+        if not consultor_name or self.lances_text.get("1.0", tk.END).strip():
+            return
+        try:
+            anterior = automacao_servopa_corrigido.execucao_interrompida(consultor_name)
+        except Exception as e:
+            print(f"Não foi possível ler o diário de execução de '{consultor_name}': {e}")
+            return
+        if not anterior or not anterior['entrada'].strip():
+            return
+        concluidas = sum(1 for estado, _ in anterior['estados'].values() if estado in ('sucesso', 'benigno'))
+        if messagebox.askyesno(
+            "Execução Interrompida",
+            f"A última execução de '{consultor_name}' foi interrompida ({concluidas} de {len(anterior['cotas'])} cota(s) concluídas).\n\n"
+            "Deseja carregar a lista de cotas dela? As cotas já concluídas não serão refeitas.",
+        ):
+            self.lances_text.insert("1.0", anterior['entrada'])
+            self.update_cota_count()
+
     def redirect_output(self):
         sys.stdout = TextRedirector(self.log_text)
         sys.stderr = TextRedirector(self.log_text)
@@ -331,9 +383,74 @@ class AutomationApp:
 
     def _perform_cota_count(self):
         content = self.lances_text.get("1.0", tk.END)
-        valid_cotas, _ = automacao_servopa_corrigido.parse_lances_from_string(content)
+        valid_cotas, _, _ = automacao_servopa_corrigido.parse_lances_from_string(content)
         count = len(valid_cotas)
-        self.cota_count_label.config(text=f"Total de Cotas Válidas: {count}")
+        texto = f"Total de Cotas Válidas: {count}"
+        indice = self._indice_pdfs_consultor()
+        if indice is not None and count:
+            existentes = sum(1 for c in valid_cotas if (c['grupo'], c['cota'], c['digito']) in indice)
+            if existentes:
+                texto += f" ({existentes} já com PDF na pasta do consultor)"
+        em_outras = len(self._lances_em_outras_pastas(valid_cotas))
+        if em_outras:
+            texto += f" ({em_outras} com lance na pasta de outro consultor)"
+        self.cota_count_label.config(text=texto)
+
+    def _lances_em_outras_pastas(self, cotas):
+        """[(cota_info, [(consultor, arquivo)])] das cotas com PDF na pasta de outro consultor."""
+        if not self.indice_global or not cotas:
+            return []
+        consultor_name = self.entry_consultor.get().strip()
+        try:
+            self.indice_global.atualizar()
+        except OSError:
+            return []
+        encontrados = []
+        for c in cotas:
+            arquivos = [(outro, nome) for outro, nome in self.indice_global.localizar(c['grupo'], c['cota'], c['digito'])
+                        if outro != consultor_name]
+            if arquivos:
+                encontrados.append((c, arquivos))
+        return encontrados
+
+    def show_existing_lances(self):
+        """Lista no log onde cada cota da lista já tem lance (pasta de qualquer consultor)."""
+        content = self.lances_text.get("1.0", tk.END)
+        valid_cotas, _, _ = automacao_servopa_corrigido.parse_lances_from_string(content)
+        if not valid_cotas:
+            messagebox.showwarning("Aviso", "Por favor, cole a lista de cotas na caixa de texto.")
+            return
+        if not self.indice_global:
+            messagebox.showinfo("Índice Desativado", "O índice global de lances está desativado (INDICE_GLOBAL_LANCES).")
+            return
+        try:
+            self.indice_global.atualizar()
+        except OSError as e:
+            messagebox.showwarning("Índice Indisponível", f"Não foi possível ler a pasta Lances/: {e}")
+            return
+        print("\n--- LANCES JÁ EXISTENTES ---")
+        encontrados = 0
+        for c in valid_cotas:
+            for consultor, nome in self.indice_global.localizar(c['grupo'], c['cota'], c['digito']):
+                print(f"  {c['original']} -> {self.indice_global.caminho(consultor, nome)}")
+                encontrados += 1
+        if not encontrados:
+            print("  Nenhuma cota da lista tem lance salvo em Lances/.")
+        print("----------------------------\n")
+
+    def _indice_pdfs_consultor(self):
+        """Índice dos PDFs do consultor selecionado, refeito só quando a pasta muda (mtime)."""
+        consultor_name = self.entry_consultor.get().strip()
+        if not consultor_name or consultor_name == self.placeholder_text:
+            return None
+        try:
+            mtime = os.stat(os.path.join("Lances", consultor_name)).st_mtime_ns
+        except OSError:
+            return None
+        chave = (consultor_name, mtime)
+        if getattr(self, '_indice_pdfs', (None, None))[0] != chave:
+            self._indice_pdfs = (chave, automacao_servopa_corrigido.indice_pdfs_consultor(consultor_name))
+        return self._indice_pdfs[1]
 
     def _check_thread_completion(self, formatter_func, title):
         """Função genérica para monitorar threads, formatar o resultado e exibir o popup final."""
@@ -411,11 +528,13 @@ class AutomationApp:
         self.log_text.insert(tk.END, f"Iniciando automação para o consultor: {consultor_name}...\n")
         self.log_text.config(state=tk.DISABLED)
 
+        num_navegadores = int(self.spin_navegadores.get() or 1)
         self.set_ui_state(tk.DISABLED)
         
         self.active_thread = ThreadWithReturnValue(
             target=automacao_servopa_corrigido.main, 
-            args=(consultor_name, lances_text_content, self.stop_flag)
+            args=(consultor_name, lances_text_content, self.stop_flag),
+            kwargs={'num_navegadores': num_navegadores, 'ignorar_cache_cotas': self.var_ignorar_cache.get()}
         )
         self.active_thread.start()
         
@@ -441,7 +560,8 @@ class AutomationApp:
         
         self.active_thread = ThreadWithReturnValue(
             target=automacao_servopa_corrigido.executar_verificacao_nomes, 
-            args=(consultor_name,)
+            args=(consultor_name,),
+            kwargs={'reconstruir_cache': self.var_reconstruir_cache_pdf.get()}
         )
         self.active_thread.start()
         
@@ -450,8 +570,12 @@ class AutomationApp:
     def set_ui_state(self, state):
         self.btn_start.config(state=state)
         self.btn_verify.config(state=state)
+        self.btn_locate.config(state=state)
         self.btn_stop.config(state=tk.NORMAL if state == tk.DISABLED else tk.DISABLED)
         self.entry_consultor.config(state='normal' if state == tk.NORMAL else 'disabled')
+        self.spin_navegadores.config(state='readonly' if state == tk.NORMAL else 'disabled')
+        self.check_ignorar_cache.config(state=tk.NORMAL if state == tk.NORMAL else tk.DISABLED)
+        self.check_reconstruir_cache_pdf.config(state=tk.NORMAL if state == tk.NORMAL else tk.DISABLED)
         self.lances_text.config(state=tk.NORMAL if state == tk.NORMAL else tk.DISABLED)
 
     def format_verification_summary(self, report):
@@ -469,9 +593,14 @@ class AutomationApp:
         print("------------------------------------------------------------")
         print(f"  - 📂 Arquivos Escaneados: {report.get('total_scanned', 0)}")
         print(f"  - ✅ Nomes Corretos: {report.get('correct', 0)}")
+        if report.get('skipped'):
+            print(f"  - ⏩ Pulados (já verificados e sem alteração): {report['skipped']}")
         print(f"  - ✏️ Arquivos Renomeados: {report.get('renamed', 0)}")
         print(f"  - ⚠️ Conflitos Encontrados: {report.get('conflicts', 0)}")
         print(f"  - ❌ Erros de Leitura: {report.get('errors', 0)}")
+        if report.get('cache_hits') or report.get('cache_misses'):
+            print(f"  - 💾 Cache de Extração: {report.get('cache_hits', 0)} sem alteração, "
+                  f"{report.get('cache_misses', 0)} PDF(s) lido(s)")
         print("------------------------------------------------------------\n")
 
     def format_automation_summary(self, summary):
@@ -489,13 +618,39 @@ class AutomationApp:
         print("------------------------------------------------------------")
         print(f"  - ➡️  Cotas Recebidas: {summary.get('total_cotas', 0)}")
         print(f"  - ⏭️  Cotas Puladas (já existentes): {summary.get('cotas_puladas', 0)}")
+        if summary.get('cotas_em_outra_pasta'):
+            print(f"  - 📁 Das quais em pastas de outros consultores: {summary['cotas_em_outra_pasta']}")
+        if summary.get('cotas_retomadas'):
+            print(f"  - 🔁 Cotas Retomadas (concluídas na execução interrompida): {summary['cotas_retomadas']}")
+        if summary.get('cotas_cache'):
+            print(f"  - 🗃️  Cotas Inelegíveis pelo Cache (canceladas, contempladas, etc.): {summary['cotas_cache']}")
         print(f"  - ⚙️  Cotas a Processar: {summary.get('cotas_a_processar', 0)}")
         print("\n------------------------------------------------------------")
         print(f"  - ✅ Lances com Sucesso: {summary.get('sucesso', 0)}")
         print(f"  - ℹ️  Cotas com Status Benigno: {summary.get('benigno', 0)}")
         print(f"  - ❌ Cotas com Erro Crítico: {summary.get('critico', 0)}")
+        if summary.get('retentativas'):
+            print(f"  - 🔄 Retentativas de Erros Transitórios: {summary['retentativas']}")
+        if summary.get('pendentes'):
+            print(f"  - ⏸️  Cotas Pendentes (retomadas na próxima execução): {summary['pendentes']}")
         print("------------------------------------------------------------\n")
 
+        if any(summary.get(chave) for chave in ('pdfs_renomeados', 'pdfs_conflitos', 'pdfs_erros')):
+            print("📁 Arquivos PDF (organizador e verificação final de nomes):")
+            print("------------------------------------------------------------")
+            print(f"  - ✏️  Arquivados/Renomeados: {summary.get('pdfs_renomeados', 0)}")
+            print(f"  - ⚠️ Em Quarentena (Conflitos): {summary.get('pdfs_conflitos', 0)}")
+            print(f"  - ❌ Erros de Leitura: {summary.get('pdfs_erros', 0)}")
+            print("------------------------------------------------------------\n")
+
+        etapas = summary.get('etapas')
+        if etapas:
+            print("⏱️ Tempo por Etapa (segundos):")
+            print("------------------------------------------------------------")
+            for nome, e in sorted(etapas.items(), key=lambda item: -item[1]['p50'] * item[1]['n']):
+                print(f"  - {nome:<18} n={e['n']:<4} p50={e['p50']:>6.2f}  p95={e['p95']:>6.2f}")
+            print("------------------------------------------------------------\n")
+
         total = summary.get('cotas_a_processar', 0)
         sucesso = summary.get('sucesso', 0)
         critico = summary.get('critico', 0)
@@ -0,0 +1,468 @@
+import os
+import re
+import threading
+import urllib.parse
+from html.parser import HTMLParser
+
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+except ImportError:  # Dependência opcional: sem ela o caminho HTTP fica desativado
+    requests = None
+
+from locators import ServopaLocators, ServopaGroupLocators, ServopaLanceLocators
+
+"""
+Caminho rápido por HTTP para o fluxo de uma cota (busca -> Extrato -> Simular -> Registrar -> PDF).
+
+O portal responde a formulários comuns; em vez de renderizar cada página no Firefox,
+esta sessão reaproveita os cookies do navegador já logado e faz as mesmas requisições
+com o `requests` (conexões reaproveitadas). O HTML das respostas é lido com as mesmas
+regras de `run_automation_for_cota` (mesmos ids de 'locators.py', status na mesma coluna,
+mesmos textos de Extrato/Fidelidade/protocolo/modal).
+
+Sempre que uma resposta não tiver a forma esperada ANTES do Registrar, é lançada
+`FallbackNavegador` e o chamador refaz a cota pelo navegador. Depois que o Registrar
+foi enviado nunca há fallback (evita registrar o lance duas vezes): respostas
+inesperadas viram ERRO_CRITICO.
+"""
+
+class FallbackNavegador(Exception):
+    """A resposta do portal não corresponde ao esperado; a cota deve seguir pelo navegador."""
+    pass
+
+
+def disponivel():
+    """Retorna True se o `requests` estiver instalado."""
+    return requests is not None
+
+
+# --- Árvore HTML mínima (html.parser) ---
+
+_TAGS_VAZIAS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+
+
+class _No:
+    __slots__ = ("tag", "attrs", "filhos", "pai")
+
+    def __init__(self, tag, attrs, pai=None):
+        self.tag = tag
+        self.attrs = attrs
+        self.filhos = []
+        self.pai = pai
+
+    def get(self, nome, padrao=None):
+        return self.attrs.get(nome, padrao)
+
+    def classes(self):
+        return (self.attrs.get("class") or "").split()
+
+
+class _ConstrutorArvore(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.raiz = _No("#documento", {})
+        self._atual = self.raiz
+
+    def handle_starttag(self, tag, attrs):
+        no = _No(tag, {k: (v if v is not None else "") for k, v in attrs}, self._atual)
+        self._atual.filhos.append(no)
+        if tag not in _TAGS_VAZIAS:
+            self._atual = no
+
+    def handle_startendtag(self, tag, attrs):
+        self._atual.filhos.append(_No(tag, {k: (v if v is not None else "") for k, v in attrs}, self._atual))
+
+    def handle_endtag(self, tag):
+        # Tolera HTML malformado: fecha até a tag correspondente, se ela estiver aberta
+        no = self._atual
+        while no is not None and no.tag != tag:
+            no = no.pai
+        if no is not None and no.pai is not None:
+            self._atual = no.pai
+
+    def handle_data(self, data):
+        self._atual.filhos.append(data)
+
+
+def analisar_html(html):
+    construtor = _ConstrutorArvore()
+    construtor.feed(html)
+    construtor.close()
+    return construtor.raiz
+
+
+def _descendentes(no):
+    for filho in no.filhos:
+        if isinstance(filho, _No):
+            yield filho
+            yield from _descendentes(filho)
+
+
+def _buscar(no, condicao):
+    return next((d for d in _descendentes(no) if condicao(d)), None)
+
+
+def _buscar_todos(no, condicao):
+    return [d for d in _descendentes(no) if condicao(d)]
+
+
+def _por_id(no, id_):
+    return _buscar(no, lambda d: d.get("id") == id_)
+
+
+def _texto(no):
+    """Texto normalizado (espaços colapsados), como o `texto()` dos snapshots JS."""
+    partes = []
+
+    def _coletar(n):
+        for filho in n.filhos:
+            if isinstance(filho, str):
+                partes.append(filho)
+            elif filho.tag not in ("script", "style"):
+                _coletar(filho)
+
+    _coletar(no)
+    return re.sub(r"\s+", " ", "".join(partes)).strip()
+
+
+def _oculto(no):
+    """Aproxima a visibilidade sem CSS: `hidden`, `display:none` ou classe 'hidden' no nó ou ancestrais."""
+    while no is not None:
+        if isinstance(no, _No):
+            estilo = (no.get("style") or "").replace(" ", "").lower()
+            if "hidden" in no.attrs or "display:none" in estilo or "hidden" in no.classes():
+                return True
+        no = no.pai
+    return False
+
+
+def _visivel(no):
+    return no is not None and not _oculto(no)
+
+
+def _formulario_de(no):
+    while no is not None and no.tag != "form":
+        no = no.pai
+    return no
+
+
+def _campos_formulario(form):
+    """Pares (nome, valor) que o navegador enviaria, sem os botões de envio."""
+    campos = []
+    for campo in _descendentes(form):
+        nome = campo.get("name")
+        if not nome or "disabled" in campo.attrs:
+            continue
+        if campo.tag == "input":
+            tipo = (campo.get("type") or "text").lower()
+            if tipo in ("submit", "button", "image", "reset", "file"):
+                continue
+            if tipo in ("checkbox", "radio") and "checked" not in campo.attrs:
+                continue
+            campos.append((nome, campo.get("value", "on" if tipo in ("checkbox", "radio") else "")))
+        elif campo.tag == "textarea":
+            campos.append((nome, _texto(campo)))
+        elif campo.tag == "select":
+            opcoes = _buscar_todos(campo, lambda d: d.tag == "option")
+            escolhida = next((o for o in opcoes if "selected" in o.attrs), opcoes[0] if opcoes else None)
+            if escolhida is not None:
+                campos.append((nome, escolhida.get("value", _texto(escolhida))))
+    return campos
+
+
+def _envia_formulario(no):
+    """True se clicar no elemento envia o formulário sem depender de JavaScript."""
+    tipo = (no.get("type") or "").lower()
+    return (no.tag == "button" and tipo in ("", "submit")) or (no.tag == "input" and tipo in ("submit", "image"))
+
+
+def _substituir_campo(campos, nome, valor):
+    campos = [(n, v) for n, v in campos if n != nome]
+    campos.append((nome, valor))
+    return campos
+
+
+# Alvo de navegação em onclick="location.href='...'" / window.location = '...' / location.assign('...')
+_RE_ONCLICK_URL = re.compile(r"""location(?:\.href)?\s*=\s*['"]([^'"]+)['"]|location\.(?:assign|replace)\(\s*['"]([^'"]+)['"]""")
+
+
+def url_do_onclick(onclick, url_base):
+    """URL absoluta navegada pelo `onclick` de uma linha, ou None se não for uma navegação simples."""
+    alvo = _RE_ONCLICK_URL.search(onclick or "")
+    if not alvo:
+        return None
+    return urllib.parse.urljoin(url_base, alvo.group(1) or alvo.group(2))
+
+
+# Nomes de arquivo em Content-Disposition
+_RE_CONTENT_DISPOSITION = re.compile(r"""filename\*?=(?:UTF-8'')?["']?([^"';]+)""", re.IGNORECASE)
+
+
+class SessaoHttpServopa:
+    """Sessão HTTP autenticada com os cookies do navegador, para processar cotas sem renderizar páginas.
+
+    busca_url / lances_url: SERVOPA_BUSCAR_URL e SERVOPA_LANCES_URL.
+    """
+
+    def __init__(self, cookies, busca_url, lances_url, user_agent=None, timeout=30, conexoes=4):
+        if requests is None:
+            raise RuntimeError("O pacote 'requests' não está instalado; caminho HTTP indisponível.")
+        self.busca_url = busca_url
+        self.lances_url = lances_url
+        self.timeout = timeout
+        self.sessao = requests.Session()
+        adaptador = HTTPAdapter(pool_connections=conexoes, pool_maxsize=conexoes)
+        self.sessao.mount("http://", adaptador)
+        self.sessao.mount("https://", adaptador)
+        if user_agent:
+            self.sessao.headers["User-Agent"] = user_agent
+        self.atualizar_cookies(cookies)
+
+    @classmethod
+    def do_navegador(cls, driver, busca_url, lances_url, **kwargs):
+        """Cria a sessão a partir do WebDriver logado (cookies e User-Agent do navegador)."""
+        user_agent = driver.execute_script("return navigator.userAgent")
+        return cls(driver.get_cookies(), busca_url, lances_url, user_agent=user_agent, **kwargs)
+
+    def atualizar_cookies(self, cookies):
+        """Copia para a sessão HTTP os cookies no formato de `driver.get_cookies()`."""
+        for c in cookies:
+            self.sessao.cookies.set(
+                c["name"], c["value"],
+                domain=(c.get("domain") or "").lstrip(".") or None,
+                path=c.get("path") or "/",
+            )
+
+    def cookies_para_navegador(self):
+        """Cookies atuais da sessão HTTP no formato aceito por `driver.add_cookie`."""
+        return [
+            {"name": c.name, "value": c.value, "path": c.path or "/"}
+            for c in self.sessao.cookies
+        ]
+
+    def fechar(self):
+        self.sessao.close()
+
+    # --- Requisições ---
+
+    def _requisitar(self, metodo, url, **kwargs):
+        try:
+            resposta = self.sessao.request(metodo, url, timeout=self.timeout, **kwargs)
+        except requests.RequestException as e:
+            raise FallbackNavegador(f"Falha de rede em {metodo} {url}: {e}") from e
+        if resposta.status_code >= 400:
+            raise FallbackNavegador(f"{metodo} {url} retornou HTTP {resposta.status_code}.")
+        return resposta
+
+    def _pagina(self, resposta):
+        """Analisa uma resposta HTML, recusando as que indicam sessão perdida ou CAPTCHA."""
+        if "html" not in resposta.headers.get("Content-Type", "text/html"):
+            raise FallbackNavegador(f"Resposta não-HTML de {resposta.url}: {resposta.headers.get('Content-Type')}")
+        raiz = analisar_html(resposta.text)
+        if _por_id(raiz, ServopaLocators.USERNAME_FIELD[1]) is not None:
+            raise FallbackNavegador("A sessão HTTP não está autenticada (formulário de login na resposta).")
+        if "Confirme que é humano" in resposta.text:
+            raise FallbackNavegador("CAPTCHA na resposta HTTP.")
+        return raiz
+
+    def _enviar(self, form, url_base, campos):
+        metodo = (form.get("method") or "get").upper()
+        acao = urllib.parse.urljoin(url_base, form.get("action") or url_base)
+        if metodo == "POST":
+            return self._requisitar("POST", acao, data=campos)
+        return self._requisitar("GET", acao, params=campos)
+
+    # --- Fluxo da cota ---
+
+    def processar_cota(self, cota_info, download_dir, lance_livre_percentual, lance_livre_descontar):
+        """Executa busca -> Extrato -> lances -> Simular -> Registrar para uma cota.
+
+        Retorna um dict {status, mensagem, pdf, nome_cliente}; `pdf` é o nome do arquivo
+        gravado em `download_dir` (somente em SUCESSO). Lança FallbackNavegador quando a
+        resposta foge do esperado antes do Registrar.
+        """
+        grupo, cota, digito = cota_info["grupo"], cota_info["cota"], cota_info["digito"]
+
+        # 1) Busca
+        resposta = self._requisitar("GET", self.busca_url)
+        raiz = self._pagina(resposta)
+        campo_grupo = _por_id(raiz, ServopaGroupLocators.GROUP_INPUT[1])
+        form = _formulario_de(campo_grupo) if campo_grupo is not None else None
+        if form is None:
+            raise FallbackNavegador("Formulário de busca não encontrado na resposta.")
+        campos = _campos_formulario(form)
+        for locator, valor in (
+            (ServopaGroupLocators.GROUP_INPUT, grupo),
+            (ServopaGroupLocators.COTA_INPUT, cota),
+            (ServopaGroupLocators.DIGITO_INPUT, digito),
+        ):
+            campo = _por_id(form, locator[1])
+            if campo is None or not campo.get("name"):
+                raise FallbackNavegador(f"Campo '{locator[1]}' ausente no formulário de busca.")
+            campos = _substituir_campo(campos, campo.get("name"), valor)
+        botao = _por_id(form, ServopaGroupLocators.SEARCH_GROUP_BUTTON[1])
+        if botao is not None and botao.get("name"):
+            campos.append((botao.get("name"), botao.get("value", "")))
+        resposta = self._enviar(form, resposta.url, campos)
+        raiz = self._pagina(resposta)
+
+        # 2) Tabela de resultados: primeiro <tbody>, linhas com onclick, status na mesma coluna
+        tbody = _buscar(raiz, lambda d: d.tag == "tbody")
+        if tbody is None:
+            raise FallbackNavegador("Tabela de resultados ausente na resposta da busca.")
+        linhas = _buscar_todos(tbody, lambda d: d.tag == "tr" and "onclick" in d.attrs)
+        if not linhas:
+            return {"status": "ERRO_BENIGNO", "mensagem": "Cota não encontrada na busca."}
+        linha_ativa = None
+        for linha in linhas:
+            celulas = [_texto(td) for td in _buscar_todos(linha, lambda d: d.tag == "td")]
+            col = ServopaGroupLocators.RESULT_STATUS_COL
+            if len(celulas) > col and celulas[col].upper() == "ATIVO":
+                linha_ativa = linha
+                break
+        if linha_ativa is None:
+            return {"status": "ERRO_BENIGNO", "mensagem": "Nenhuma cota com status 'ATIVO' foi encontrada."}
+        url_extrato = url_do_onclick(linha_ativa.get("onclick"), resposta.url)
+        if not url_extrato:
+            raise FallbackNavegador(f"onclick da linha não é uma navegação simples: {linha_ativa.get('onclick')!r}")
+
+        # 3) Extrato
+        resposta = self._requisitar("GET", url_extrato)
+        raiz = self._pagina(resposta)
+        section = _buscar(raiz, lambda d: d.tag == "section" and d.get("class") == "main-view")
+        header = _buscar(section, lambda d: d.tag == "h2") if section is not None else None
+        header_txt = _texto(header).upper() if header is not None else ""
+        if "EXTRATO - CANCELADO" in header_txt:
+            return {"status": "ERRO_BENIGNO", "mensagem": "Extrato da cota está cancelado."}
+        if header_txt != "EXTRATO":
+            raise FallbackNavegador(f"Header de Extrato inesperado: '{header_txt}'.")
+        contemplado = _buscar(raiz, lambda d: d.tag == "div" and "message-block" in d.classes()
+                              and "error" in d.classes() and "Cota já está contemplada" in _texto(d))
+        if _visivel(contemplado):
+            return {"status": "ERRO_BENIGNO", "mensagem": "Cota já está contemplada."}
+
+        # 4) Página de lances
+        resposta = self._requisitar("GET", self.lances_url)
+        raiz = self._pagina(resposta)
+        tab_switcher = _buscar(raiz, lambda d: "tab-switcher" in d.classes())
+        simular = _por_id(raiz, ServopaLanceLocators.SIMULAR_BUTTON[1])
+        if tab_switcher is None or simular is None:
+            raise FallbackNavegador("Página de lances sem tab-switcher ou botão Simular.")
+        abas = _buscar_todos(tab_switcher, lambda d: d.tag == "a")
+        if any(_texto(a) == "Fidelidade" and _visivel(a) for a in abas):
+            return {"status": "ERRO_BENIGNO", "mensagem": "A cota possui Lance Fidelidade e não pode ser processada."}
+        ativo = next((a for a in abas if "active" in a.classes() and _visivel(a)), None)
+        if ativo is None:
+            raise FallbackNavegador("Nenhum tab de lance ativo na resposta.")
+        is_livre = (ativo.get("data-lance", "").upper() == "L") or ("LIVRE" in _texto(ativo).upper())
+
+        form = _formulario_de(simular)
+        if form is None or not _envia_formulario(simular):
+            raise FallbackNavegador("'Simular' depende de JavaScript (não é um envio de formulário).")
+        campos = _campos_formulario(form)
+        if is_livre:
+            percentual = next((c for c in (
+                _por_id(form, ServopaLanceLocators.LANCE_LIVRE_PERCENTUAL_INPUT[1]),
+                _por_id(form, ServopaLanceLocators.LANCE_LIVRE_PERCENTUAL_INPUT_ALT[1]),
+            ) if _visivel(c) and c.get("name")), None)
+            descontar = _por_id(form, ServopaLanceLocators.LANCE_LIVRE_DESCONTAR_INPUT[1])
+            if percentual is None or not _visivel(descontar) or not descontar.get("name"):
+                raise FallbackNavegador("Campos do Lance Livre ausentes no formulário.")
+            campos = _substituir_campo(campos, percentual.get("name"), lance_livre_percentual)
+            campos = _substituir_campo(campos, descontar.get("name"), lance_livre_descontar)
+        if simular.get("name"):
+            campos.append((simular.get("name"), simular.get("value", "")))
+        nome_cliente = _nome_cliente(raiz)
+
+        # 5) Simular
+        resposta = self._enviar(form, resposta.url, campos)
+        raiz = self._pagina(resposta)
+        if _visivel(_por_id(raiz, ServopaLanceLocators.PROTOCOLO_ANTERIOR_INPUT[1])):
+            return {"status": "ERRO_BENIGNO", "mensagem": "Lance já realizado (protocolo anterior encontrado)."}
+        registrar = _buscar(raiz, lambda d: d.tag == "button" and "Registrar" in _texto(d)
+                            and _visivel(d) and _envia_formulario(d))
+        form = _formulario_de(registrar) if registrar is not None else None
+        if form is None:
+            raise FallbackNavegador("Botão 'Registrar' de formulário não encontrado após Simular.")
+        campos = _campos_formulario(form)
+        if registrar.get("name"):
+            campos.append((registrar.get("name"), registrar.get("value", "")))
+        nome_cliente = _nome_cliente(raiz) or nome_cliente
+        if not nome_cliente:
+            raise FallbackNavegador("Nome do consorciado ausente na página de lances.")
+
+        # 6) Registrar: daqui em diante não há mais fallback para o navegador
+        try:
+            resposta = self._enviar(form, resposta.url, campos)
+        except FallbackNavegador as e:
+            return {"status": "ERRO_CRITICO", "mensagem": f"Registrar via HTTP falhou: {e}"}
+        tipo = resposta.headers.get("Content-Type", "")
+        if "pdf" in tipo.lower() or resposta.content[:5] == b"%PDF-":
+            nome_pdf = _nome_arquivo_resposta(resposta) or f"lance-{grupo}-{cota}-{digito}.pdf"
+            _gravar_download(download_dir, nome_pdf, resposta.content)
+            return {"status": "SUCESSO", "mensagem": "Lance registrado e PDF salvo com sucesso.",
+                    "pdf": nome_pdf, "nome_cliente": nome_cliente}
+        modal = _buscar(analisar_html(resposta.text), lambda d: any(
+            c in d.classes() for c in ("swal2-container", "sweet-alert", "swal2-popup")))
+        if modal is not None:
+            texto_modal = _texto(_buscar(modal, lambda d: any(
+                c in d.classes() for c in ("swal2-html-container", "swal2-content"))) or modal)
+            return {"status": "ERRO_BENIGNO", "mensagem": f"Bloqueio de assembleia / modal após Registrar: {texto_modal}"}
+        return {"status": "ERRO_CRITICO",
+                "mensagem": f"Resposta inesperada ao Registrar via HTTP (Content-Type '{tipo}'); verificar o lance no portal."}
+
+
+def _nome_cliente(raiz):
+    """Espelha NOME_CLIENTE_TEXT: o primeiro <h3> irmão seguinte do <span>Consorciado</span>."""
+    span = _buscar(raiz, lambda d: d.tag == "span" and _texto(d) == "Consorciado")
+    if span is None:
+        return None
+    irmaos = span.pai.filhos
+    for irmao in irmaos[irmaos.index(span) + 1:]:
+        if isinstance(irmao, _No) and irmao.tag == "h3":
+            return _texto(irmao) or None
+    return None
+
+
+def _nome_arquivo_resposta(resposta):
+    encontrado = _RE_CONTENT_DISPOSITION.search(resposta.headers.get("Content-Disposition", ""))
+    if not encontrado:
+        return None
+    nome = os.path.basename(urllib.parse.unquote(encontrado.group(1)).strip())
+    return nome if nome.lower().endswith(".pdf") else None
+
+
+def _gravar_download(download_dir, nome, conteudo):
+    """Grava como o Firefox: primeiro em '.part', depois renomeia para o nome final."""
+    os.makedirs(download_dir, exist_ok=True)
+    final = os.path.join(download_dir, nome)
+    parcial = final + ".part"
+    with open(parcial, "wb") as f:
+        f.write(conteudo)
+    os.replace(parcial, final)
+
+
+# --- Sessões por navegador ---
+
+_SESSOES = {}
+_SESSOES_LOCK = threading.Lock()
+
+
+def sessao_do_navegador(driver, busca_url, lances_url):
+    """Sessão HTTP associada ao WebDriver (uma por driver.session_id), criada sob demanda."""
+    with _SESSOES_LOCK:
+        sessao = _SESSOES.get(driver.session_id)
+    if sessao is None:
+        sessao = SessaoHttpServopa.do_navegador(driver, busca_url, lances_url)
+        with _SESSOES_LOCK:
+            _SESSOES[driver.session_id] = sessao
+    return sessao
+
+
+def descartar_sessao(driver):
+    """Fecha a sessão HTTP associada ao driver (ex: antes de driver.quit())."""
+    with _SESSOES_LOCK:
+        sessao = _SESSOES.pop(driver.session_id, None)
+    if sessao is not None:
+        sessao.fechar()
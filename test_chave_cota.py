@@ -0,0 +1,29 @@
+"""
+Chaves de cota vindas da lista digitada: cota vazia ou com zeros à esquerda não pode
+derrubar a execução antes do `try` do `main()`.
+
+Uso: python -m pytest -q test_chave_cota.py
+"""
+
+from automacao_servopa_corrigido import parse_lances_from_string
+from cache_cotas import CacheCotas
+from diario_execucao import chave_cota
+
+
+def test_diario_cota_com_zeros_a_esquerda():
+    assert chave_cota({"grupo": "1561", "cota": "0222", "digito": "1"}) == "1561/222-1"
+    assert chave_cota({"grupo": "1561", "cota": "000", "digito": "0"}) == "1561/0-0"
+
+
+def test_diario_cota_vazia():
+    cotas, _, _ = parse_lances_from_string("1561 1")
+    assert cotas[0]["cota"] == ""
+    assert chave_cota(cotas[0]) == "1561/0-1"
+
+
+def test_cache_cotas_cota_vazia(tmp_path):
+    cache = CacheCotas(str(tmp_path / "cache.sqlite"), {"Cota Contemplada": 30})
+    cotas, _, _ = parse_lances_from_string("1561 1")
+    cache.registrar(cotas[0], "ERRO_BENIGNO", "Cota Contemplada", "Cota contemplada")
+    assert cache.conhecida_inelegivel({"grupo": "1561", "cota": "0", "digito": "1"})["categoria"] == "Cota Contemplada"
+    cache.fechar()